@@ -0,0 +1,70 @@
+"""Near-duplicate detection: throughput of each stage of a MinHash signature.
+
+Tokenizing, hashing the words, combining them into shingles and hashing those
+under every permutation are timed apart, in tokens per second, on the given
+transcript files or a synthetic transcript of --size bytes.
+
+    python benchmarks/dedup.py --size 1000000
+    python benchmarks/dedup.py transcriptions/*.txt --num-perm 64
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from domain.dedup import ChunkDeduplicator, _WORD  # noqa: E402
+
+def synthetic_transcript(size: int, seed: int) -> str:
+    rng = random.Random(seed)
+    vocabulary = [
+        ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(2, 9)))
+        for _ in range(5000)
+    ]
+    words = []
+    total = 0
+    while total < size:
+        words.append(rng.choice(vocabulary))
+        total += len(words[-1]) + 1
+    return ' '.join(words)
+
+def best_seconds(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*')
+    parser.add_argument('--size', type=int, default=1_000_000)
+    parser.add_argument('--num-perm', type=int, default=128)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    texts = {path: Path(path).read_text(encoding='utf-8') for path in args.files}
+    if not texts:
+        texts = {f"synthetic {args.size} bytes": synthetic_transcript(args.size, args.seed)}
+
+    dedup = ChunkDeduplicator(num_perm=args.num_perm)
+    for name, text in texts.items():
+        tokens = len(_WORD.findall(text.lower()))
+        stages: Dict[str, Callable[[], object]] = {
+            'tokenize': lambda: _WORD.findall(text.lower()),
+            'shingle_hashes': lambda: dedup.shingle_hashes(text),
+            'signature': lambda: dedup.signature(text),
+        }
+        print(f"\n{name}: {tokens} tokens, {args.num_perm} permutations")
+        print(f"{'stage':<16}{'seconds':>10}{'M tokens/s':>12}")
+        for stage, fn in stages.items():
+            seconds = best_seconds(fn, args.repeat)
+            print(f"{stage:<16}{seconds:>10.3f}{tokens / seconds / 1e6:>12.2f}")
+
+if __name__ == "__main__":
+    main()
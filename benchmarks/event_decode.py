@@ -0,0 +1,74 @@
+"""Decode cost per stream entry: eager dict decoding vs the lazy StreamEvent.
+
+Builds --count raw entries as XREADGROUP returns them, with a --size byte
+payload, and times decoding each of them the old way (every field decoded and
+both JSON fields parsed), lazily with only the header read (entries a prefilter
+drops), and lazily with the payload parsed (entries that are handled). Needs
+no Redis.
+
+    python benchmarks/event_decode.py --count 20000 --size 2000
+"""
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from infra.core_types import Event  # noqa: E402
+from infra.redis import decode_event, encode_event  # noqa: E402
+from infra.stream_event import StreamEvent  # noqa: E402
+
+def entries(count: int, size: int) -> List[Tuple[bytes, Dict[bytes, bytes]]]:
+    parts = max(1, size // 100)
+    result = []
+    for i in range(count):
+        event = Event(
+            id="",
+            name="transcriptions_created",
+            data=[{'title': f"part {j}", 'path': f"transcripts/{i}/{j}.txt" + "x" * 60} for j in range(parts)],
+            meta={'tenant': f"tenant-{i % 10}", 'priority': i % 3, 'deadline': "2030-01-01T00:00:00Z"}
+        )
+        fields = {key.encode(): value.encode() for key, value in encode_event(event).items()}
+        result.append((f"{1700000000000 + i}-0".encode(), fields))
+    return result
+
+def measure(name: str, decode: Callable[[bytes, Dict[bytes, bytes]], Any], raw: List[Tuple[bytes, Dict[bytes, bytes]]]) -> None:
+    started = time.perf_counter()
+    for message_id, fields in raw:
+        decode(message_id, fields)
+    seconds = time.perf_counter() - started
+
+    # Memory held by the decoded records, with the raw entries already allocated
+    tracemalloc.start()
+    kept = [decode(message_id, fields) for message_id, fields in raw]
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    print(f"{name:>16}: {seconds / len(raw) * 1e6:7.2f} us/entry, {held / len(raw):8.0f} bytes/entry held")
+
+def lazy_header(message_id: bytes, fields: Dict[bytes, bytes]) -> StreamEvent:
+    event = StreamEvent(message_id, fields)
+    event.tenant
+    return event
+
+def lazy_full(message_id: bytes, fields: Dict[bytes, bytes]) -> StreamEvent:
+    return StreamEvent(message_id, fields).decode()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=20000)
+    parser.add_argument('--size', type=int, default=2000, help="approximate payload bytes per entry")
+    args = parser.parse_args()
+
+    raw = entries(args.count, args.size)
+    print(f"{args.count} entries of {len(raw[0][1][b'data'])} payload bytes")
+    measure("eager", decode_event, raw)
+    measure("lazy, header", lazy_header, raw)
+    measure("lazy, decoded", lazy_full, raw)
+
+if __name__ == '__main__':
+    main()
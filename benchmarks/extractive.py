@@ -0,0 +1,71 @@
+"""Extractive pre-compression: compression ratio and throughput.
+
+Uses the given transcript files, or a synthetic transcript of --size bytes with
+recurring topics and filler talk when none are given.
+
+    python benchmarks/extractive.py --size 1000000 --ratio 0.4
+    python benchmarks/extractive.py transcriptions/*.txt
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from domain.extractive import ExtractiveCompressor  # noqa: E402
+
+TOPICS = [
+    "gradient descent learning rate schedule warmup decay",
+    "database index btree page split write amplification",
+    "customer retention churn cohort onboarding activation",
+    "sleep circadian rhythm melatonin light exposure",
+]
+FILLER = "so yeah you know I mean like it was kind of interesting right and then we moved on"
+
+def synthetic_transcript(size: int, seed: int) -> str:
+    rng = random.Random(seed)
+    parts: List[str] = []
+    total = 0
+    while total < size:
+        if rng.random() < 0.4:
+            words = FILLER.split()
+        else:
+            words = rng.choice(TOPICS).split() + [f"term{rng.randrange(3000)}" for _ in range(8)]
+        rng.shuffle(words)
+        sentence = ' '.join(words[:rng.randint(6, len(words))]).capitalize() + '.'
+        parts.append(sentence + ('\n\n' if rng.random() < 0.08 else ' '))
+        total += len(parts[-1])
+    return ''.join(parts)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*')
+    parser.add_argument('--size', type=int, default=1_000_000)
+    parser.add_argument('--ratio', type=float, default=0.4)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    texts = {path: Path(path).read_text(encoding='utf-8') for path in args.files}
+    if not texts:
+        texts = {f"synthetic {args.size} bytes": synthetic_transcript(args.size, args.seed)}
+
+    compressor = ExtractiveCompressor(ratio=args.ratio, min_tokens=0)
+    for name, text in texts.items():
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            _, report = compressor.compress(text)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        print(
+            f"{name}: {len(text)} bytes, {report.sentences_in} sentences -> {report.sentences_out}, "
+            f"tokens {report.tokens_in} -> {report.tokens_out} ({report.tokens_out / max(report.tokens_in, 1):.0%}), "
+            f"best {best * 1000:.0f}ms, {len(text) / best / 1e6:.1f} MB/s"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Per-tenant latency under skewed load: FIFO priority scheduling vs DRR fair queuing.
+
+One noisy tenant floods the input stream with a backlog while two quiet tenants
+send a trickle of events. Events go through InMemoryEventStore with the same
+prefetch as the service, so a scheduler only sees what the store has read
+ahead. Fair queuing is run with and without its look-ahead past the backlog.
+Handlers are simulated with sleeps, so the run takes a few seconds and needs
+no Redis or LLM.
+
+    python benchmarks/fair_queuing.py --concurrency 4 --noisy 200
+"""
+import sys
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from infra.core_types import Event  # noqa: E402
+from infra.memory import InMemoryEventStore  # noqa: E402
+from infra.scheduler import PriorityScheduler, FairScheduler, LocalTenantAccounting  # noqa: E402
+
+STREAM = "transcriptions_created"
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+async def size_of(event: Event) -> int:
+    return event.data['size']
+
+async def run(scheduler: Any, prefetch: int, args: argparse.Namespace) -> Dict[str, List[float]]:
+    rng = random.Random(args.seed)
+    store = InMemoryEventStore(STREAM, concurrency=args.concurrency, prefetch=prefetch, scheduler=scheduler)
+    latencies: Dict[str, List[float]] = {}
+    produced: Dict[str, float] = {}
+    total = args.noisy + 2 * args.quiet
+
+    async def produce(tenant: str, count: int, interval: float) -> None:
+        for _ in range(count):
+            size = rng.randint(2_000, 40_000)
+            event_id = await store.write_event(Event(id="", name=STREAM, data={'size': size}, meta={'tenant': tenant}))
+            produced[event_id] = time.time()
+            await asyncio.sleep(interval)
+
+    async def handle(event: Event) -> None:
+        # ~1 ms of simulated LLM time per KB of transcript
+        await asyncio.sleep(event.data['size'] / 1_000_000 * args.ms_per_kb)
+        latencies.setdefault(event.meta['tenant'], []).append(time.time() - produced[event.id])
+        if sum(map(len, latencies.values())) == total:
+            store.stop()
+
+    await asyncio.gather(
+        store.process_events(handle),
+        produce('noisy', args.noisy, 0),
+        produce('quiet-a', args.quiet, args.quiet_interval),
+        produce('quiet-b', args.quiet, args.quiet_interval),
+    )
+    return latencies
+
+def report(name: str, latencies: Dict[str, List[float]]) -> None:
+    print(f"\n{name}")
+    print(f"{'tenant':<10}{'events':>8}{'p50 (s)':>10}{'p95 (s)':>10}")
+    for tenant, values in sorted(latencies.items()):
+        print(f"{tenant:<10}{len(values):>8}{percentile(values, 0.5):>10.2f}{percentile(values, 0.95):>10.2f}")
+
+def fair_scheduler(weights: Dict[str, float], lookahead: int, args: argparse.Namespace) -> FairScheduler:
+    return FairScheduler(
+        weights,
+        size_estimator=size_of,
+        accounting=LocalTenantAccounting(default_concurrency=args.tenant_cap),
+        lookahead=lookahead
+    )
+
+async def main(args: argparse.Namespace) -> None:
+    weights = {STREAM: 1.0}
+    # The service's defaults: PREFETCH = CONCURRENCY, or 4x with fair queuing
+    prefetch = args.concurrency * 4
+    report("FIFO (PriorityScheduler)", await run(PriorityScheduler(weights, size_estimator=size_of), args.concurrency, args))
+    report("Fair queuing without look-ahead", await run(fair_scheduler(weights, prefetch, args), prefetch, args))
+    report(f"Fair queuing, look-ahead {args.lookahead}", await run(fair_scheduler(weights, args.lookahead, args), prefetch, args))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--noisy', type=int, default=200, help="Backlog sent by the noisy tenant")
+    parser.add_argument('--quiet', type=int, default=10, help="Events sent by each quiet tenant")
+    parser.add_argument('--quiet-interval', type=float, default=0.1)
+    parser.add_argument('--ms-per-kb', type=float, default=1.0)
+    parser.add_argument('--tenant-cap', type=int, default=None, help="Per-tenant concurrency cap")
+    parser.add_argument('--lookahead', type=int, default=1000, help="TENANT_LOOKAHEAD of the fair scheduler")
+    parser.add_argument('--seed', type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
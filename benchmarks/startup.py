@@ -0,0 +1,63 @@
+"""Cold-start cost of the summarizer: module import time and service startup.
+
+Import time is measured in fresh interpreters, net of the interpreter's own
+start, and fails the run when it exceeds --max-import-ms so CI catches an SDK
+import creeping back onto the import path. Startup time covers
+SummarizerMicroservice.create() (clients built and connection pools warmed
+concurrently) plus the wait until every dependency answers, using the usual
+REDIS_*, MINIO_* / STORAGE_BACKEND and ANTHROPIC_API_KEY settings.
+
+    python benchmarks/startup.py --repeat 5 --max-import-ms 400
+    python benchmarks/startup.py --skip-startup
+"""
+import sys
+import time
+import asyncio
+import argparse
+import subprocess
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(SRC))
+
+def interpreter_seconds(code: str) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=SRC)
+    return time.perf_counter() - started
+
+def import_seconds(repeat: int) -> float:
+    baseline = min(interpreter_seconds('pass') for _ in range(repeat))
+    return min(interpreter_seconds('import summarizer') for _ in range(repeat)) - baseline
+
+async def startup(timeout: float) -> None:
+    from summarizer import SummarizerMicroservice
+    started = time.perf_counter()
+    service = await SummarizerMicroservice.create()
+    created = time.perf_counter() - started
+    print(f"create(): {created * 1000:.0f}ms")
+    try:
+        await asyncio.wait_for(service.wait_until_ready(interval=0.5), timeout)
+        print(f"ready after {(time.perf_counter() - started) * 1000:.0f}ms")
+    except asyncio.TimeoutError:
+        status = await service.check_dependencies()
+        print(f"not ready after {timeout:.0f}s: {status}")
+    finally:
+        await service.redis.aclose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-import-ms', type=float, default=None)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--skip-startup', action='store_true')
+    args = parser.parse_args()
+
+    seconds = import_seconds(args.repeat)
+    print(f"import summarizer: {seconds * 1000:.0f}ms (best of {args.repeat}, net of interpreter start)")
+    if not args.skip_startup:
+        asyncio.run(startup(args.timeout))
+    if args.max_import_ms is not None and seconds * 1000 > args.max_import_ms:
+        sys.exit(f"Import time regressed: {seconds * 1000:.0f}ms > {args.max_import_ms:.0f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Read and write throughput of the FileStorage backends.
+
+Writes --count objects of --size bytes, then reads them back --repeat times with
+--concurrency reads in flight, the way concurrent events read their
+transcriptions. Local storage is measured with mmap reads and with copied reads.
+MinIO is measured when a server answers at MINIO_ENDPOINT, for example one
+started with `docker run -p 9000:9000 minio/minio server /data`.
+
+    python benchmarks/storage.py --size 2000000 --count 20
+    python benchmarks/storage.py --dir /mnt/nfs/bench --skip-minio
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Any, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from infra.local import LocalFileStorage  # noqa: E402
+
+async def run(name: str, storage: Any, paths: List[str], payload: bytes, repeat: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def write(path: str) -> None:
+        async with semaphore:
+            await storage.write(path, payload)
+
+    async def read(path: str) -> int:
+        async with semaphore:
+            data = await storage.read(path)
+            # Touch the content like the pipeline's utf-8 decode does
+            return len(str(data, 'utf-8'))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(write(path) for path in paths))
+    write_seconds = time.perf_counter() - started
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        total = sum(await asyncio.gather(*(read(path) for path in paths)))
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    megabytes = len(paths) * len(payload) / 1e6
+    print(
+        f"{name:>12}: write {megabytes / write_seconds:8.1f} MB/s, "
+        f"read best {megabytes / best:8.1f} MB/s ({best * 1000:.0f}ms for {total} chars)"
+    )
+
+def minio_storage() -> Any:
+    from infra.minio import MinioFileStorage
+    return MinioFileStorage(
+        endpoint=os.getenv('MINIO_ENDPOINT', 'localhost:9000'),
+        access_key=os.getenv('MINIO_ACCESS_KEY', 'minioadmin'),
+        secret_key=os.getenv('MINIO_SECRET_KEY', 'minioadmin'),
+        bucket=os.getenv('MINIO_BUCKET', 'benchmark'),
+        secure=os.getenv('MINIO_SECURE', 'False').lower() == 'true'
+    )
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=1_000_000)
+    parser.add_argument('--count', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--dir', help="Directory for local storage; a temporary one by default")
+    parser.add_argument('--skip-minio', action='store_true')
+    args = parser.parse_args()
+
+    payload = (b"transcript line with some words in it\n" * (args.size // 38 + 1))[:args.size]
+    paths = [f"bench/object-{i}.txt" for i in range(args.count)]
+    with tempfile.TemporaryDirectory(dir=args.dir) as root:
+        await run("local mmap", LocalFileStorage(root), paths, payload, args.repeat, args.concurrency)
+        await run("local copy", LocalFileStorage(root, use_mmap=False), paths, payload, args.repeat, args.concurrency)
+
+    if args.skip_minio:
+        return
+    try:
+        storage = minio_storage()
+    except Exception as e:
+        print(f"{'minio':>12}: skipped, no server ({e})")
+        return
+    await run("minio", storage, paths, payload, args.repeat, args.concurrency)
+    for path in paths:
+        await asyncio.get_running_loop().run_in_executor(None, storage.client.remove_object, storage.bucket, path)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,161 @@
+"""Re-run summaries over a range of stream history, e.g. after a prompt change.
+
+    python src/backfill.py run --name prompt-v2 --start 2024-05-01T00:00:00Z --end 2024-05-15T00:00:00Z
+    python src/backfill.py status --name prompt-v2
+    python src/backfill.py reset --name prompt-v2
+
+Events are read with XRANGE in pages, outside the consumer group, and summarized
+with the service's pipeline settings. With STREAM_SHARDS set, every shard stream
+of the input is read on the Redis that holds it. Results go to a separate stream
+(`summary_created:backfill` by default), each tagged with `meta.backfill`. A run
+is checkpointed under its name; running the same name again resumes it.
+"""
+import os
+import sys
+import copy
+import asyncio
+import argparse
+from functools import partial
+from typing import List, Optional
+from dotenv import load_dotenv
+from redis.asyncio import Redis
+from domain.constants import ServiceConfig
+from domain.handler.get_summary import get_summary
+from domain.sizing import estimate_event_size
+from infra.backfill import Backfill, BackfillProgress, StreamOutput, parse_bound
+from infra.core_types import Event
+from infra.redis_state import RedisCheckpointStore, RedisTenantAccounting
+from summarizer import SummarizerMicroservice
+
+def backfill_event(event: Event, name: str) -> Event:
+    """
+    The event as the pipeline should see it: tagged with its run and source id,
+    which carry over into the output meta, and without the deadline it had when
+    it was first produced.
+    """
+    meta = {k: v for k, v in (event.meta or {}).items() if k != 'deadline'}
+    meta['backfill'] = {'name': name, 'source_id': event.id}
+    return Event(id=event.id, name=event.name, data=event.data, meta=meta, timestamp=event.timestamp)
+
+async def status(progress: BackfillProgress) -> int:
+    state = await progress.load()
+    if not state:
+        print(f"No backfill named {progress.name}")
+        return 1
+    print(
+        f"{progress.name}: {state['stream']} [{state['start']}, {state['end']}] -> {state['output']}, "
+        f"{state.get('processed', 0)} processed, {state.get('failed', 0)} failed, "
+        f"checkpoint {state.get('last_id', 'none')}{', finished' if 'finished_at' in state else ''}"
+    )
+    for field, last_id in sorted(state.items()):
+        if field.startswith('last_id:'):
+            print(f"    {field.removeprefix('last_id:')}: checkpoint {last_id}")
+    for event_id, error in sorted((await progress.failures()).items()):
+        print(f"    {event_id}: {error}")
+    return 0
+
+async def backfill(args: argparse.Namespace) -> int:
+    service = await SummarizerMicroservice.create()
+    redis = service.redis
+    if redis is None:
+        print("Error: backfill reads from Redis; unset EVENT_TRANSPORT=memory")
+        return 1
+    try:
+        await service.wait_until_ready()
+        progress = BackfillProgress(redis, args.name, prefix=f"{ServiceConfig.NAME}:backfill")
+        state = await progress.load()
+        output = state.get('output') or args.output_stream or f"{ServiceConfig.OUTPUT_EVENT_NAME}:backfill"
+        # Same pipeline as the live workers, writing elsewhere, with step checkpoints of its own
+        deps = copy.copy(service.deps)
+        deps.event_store = StreamOutput(redis, output)
+        if deps.summary_prefix:
+            # Never next to the summaries that live events point to
+            deps.summary_prefix = f"{deps.summary_prefix}/backfill/{args.name}"
+        deps.checkpoint_store = RedisCheckpointStore(
+            redis=redis,
+            prefix=f"{ServiceConfig.NAME}:backfill:{args.name}:checkpoint"
+        )
+        runner = Backfill(
+            redis=redis,
+            progress=progress,
+            handler=lambda event: get_summary(deps, backfill_event(event, args.name)),
+            concurrency=args.concurrency,
+            # Shared by every backfill with the same budget key, apart from live tenants
+            accounting=RedisTenantAccounting(
+                redis=redis,
+                prefix=f"{ServiceConfig.NAME}:tenant",
+                default_concurrency=args.budget_concurrency,
+                default_tpm=args.tpm
+            ),
+            budget_key=args.budget_key,
+            size_estimator=partial(estimate_event_size, deps.file_storage),
+            page_size=args.page_size,
+            router=service.router
+        )
+        usage_writer = asyncio.create_task(deps.usage_totals.run()) if deps.usage_totals else None
+        try:
+            handled = await runner.run(
+                args.stream,
+                start=parse_bound(args.start, '-'),
+                end=parse_bound(args.end, '+'),
+                output=output
+            )
+        finally:
+            if usage_writer:
+                usage_writer.cancel()
+                await deps.usage_totals.flush()
+        print(f"Backfilled {handled} events of {args.name} to {output} ({runner.failed} failed)")
+        return 1 if runner.failed else 0
+    finally:
+        if service.router is not None:
+            for client in service.router.clients[1:]:
+                await client.aclose()
+        await redis.aclose()
+
+async def run(args: argparse.Namespace) -> int:
+    if args.command == 'run':
+        return await backfill(args)
+    redis = Redis(
+        host=os.getenv('REDIS_HOST', 'localhost'),
+        port=int(os.getenv('REDIS_PORT', 6379))
+    )
+    try:
+        progress = BackfillProgress(redis, args.name, prefix=f"{ServiceConfig.NAME}:backfill")
+        if args.command == 'status':
+            return await status(progress)
+        await progress.reset()
+        print(f"Reset backfill {args.name}")
+        return 0
+    finally:
+        await redis.aclose()
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Reprocess stream history into a separate output stream")
+    parser.add_argument('command', choices=['run', 'status', 'reset'])
+    parser.add_argument('--name', required=True, help="Backfill name; its checkpoint is kept under this name")
+    parser.add_argument('--stream', default=ServiceConfig.EVENT_NAME, help="Input stream to read")
+    parser.add_argument('--start', help="First stream id, epoch ms or ISO 8601 time (default: oldest)")
+    parser.add_argument('--end', help="Last stream id, epoch ms or ISO 8601 time (default: newest)")
+    parser.add_argument('--output-stream', help="Output stream (default: summary_created:backfill)")
+    parser.add_argument('--concurrency', type=int, default=2, help="Events summarized at once by this process")
+    parser.add_argument('--budget-key', default='backfill', help="Accounting key shared by backfills with one budget")
+    parser.add_argument('--budget-concurrency', type=int, help="Events in flight across all backfills on the key")
+    parser.add_argument('--tpm', type=int, help="Estimated input tokens per minute across all backfills on the key")
+    parser.add_argument('--page-size', type=int, default=100, help="Entries per XRANGE call")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point for backfills"""
+    load_dotenv()
+    args = parse_args(argv)
+    if args.command == 'run' and not os.getenv('ANTHROPIC_API_KEY'):
+        print("Error: ANTHROPIC_API_KEY environment variable not set")
+        sys.exit(1)
+    try:
+        sys.exit(asyncio.run(run(args)))
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
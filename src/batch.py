@@ -0,0 +1,255 @@
+import os
+import re
+import sys
+import json
+import glob
+import time
+import asyncio
+import hashlib
+import argparse
+from pathlib import Path
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+import anthropic
+from domain.dependencies import Dependencies
+from domain.dedup import ChunkDeduplicator
+from domain.handler.get_summary import get_summary
+from domain.micro_batcher import AnalysisMicroBatcher
+from domain.normalizer import TranscriptNormalizer
+from domain.extractive import ExtractiveCompressor
+from domain.planner import PipelinePlanner
+from domain.types import TranscriptionCreatedEvent
+from infra.core_types import FileStorage, ObjectStat
+from infra.local import LocalFileStorage
+
+def clean_text(title: str) -> str:
+    """Clean text to contain only letters and spaces."""
+    title = title.replace('-', ' ').replace('_', ' ')
+    cleaned = re.sub(r'[^a-zA-Z\s]', '', title)
+    cleaned = ' '.join(word for word in cleaned.split() if word)
+    return cleaned
+
+def extract_common_title(file_paths: List[Path]) -> str:
+    """Extract and clean common title from file paths."""
+    sample_name = file_paths[0].stem
+    if '_' in sample_name:
+        sample_name = sample_name.split('_', 2)[-1]
+    return clean_text(sample_name)
+
+def part_number(path: Path) -> int:
+    """Trailing part number of a multi-part file name, 0 if there is none"""
+    match = re.search(r'(\d+)$', path.stem)
+    return int(match.group(1)) if match else 0
+
+def collect_inputs(inputs: List[str]) -> List[Path]:
+    """Expand directories and glob patterns into a unique list of transcription files"""
+    paths: Dict[Path, None] = {}
+    for item in inputs:
+        if Path(item).is_dir():
+            matches = sorted(Path(item).glob('*.txt'))
+        elif glob.has_magic(item):
+            matches = [Path(p) for p in sorted(glob.glob(item, recursive=True))]
+        else:
+            matches = [Path(item)]
+        for path in matches:
+            if not path.is_file():
+                raise FileNotFoundError(f"Input file not found: {path}")
+            paths[path.resolve()] = None
+    return list(paths)
+
+def group_by_title(paths: List[Path]) -> Dict[str, List[Path]]:
+    """Group the parts of each multi-part transcription under their common title"""
+    groups: Dict[str, List[Path]] = {}
+    for path in paths:
+        groups.setdefault(extract_common_title([path]) or path.stem, []).append(path)
+    return {
+        title: sorted(files, key=lambda p: (part_number(p), p.name))
+        for title, files in sorted(groups.items())
+    }
+
+class TimedFileStorage:
+    """FileStorage wrapper recording how long each read took"""
+    def __init__(self, storage: FileStorage):
+        self.storage = storage
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    async def read(self, path: str) -> bytes:
+        started = time.perf_counter()
+        data = await self.storage.read(path)
+        self.timings[path] = {'bytes': len(data), 'seconds': time.perf_counter() - started}
+        return data
+
+    async def write(self, path: str, data: bytes) -> None:
+        await self.storage.write(path, data)
+
+    async def stat(self, path: str) -> ObjectStat:
+        return await self.storage.stat(path)
+
+    async def list(self, prefix: str) -> List[str]:
+        return await self.storage.list(prefix)
+
+    async def ping(self) -> None:
+        await self.storage.ping()
+
+class Manifest:
+    """Record of finished groups, so an interrupted run can be resumed"""
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            self.entries = json.loads(path.read_text(encoding='utf-8'))
+
+    @staticmethod
+    def fingerprint(files: List[Path]) -> str:
+        digest = hashlib.sha256()
+        for path in files:
+            stat = path.stat()
+            digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        return digest.hexdigest()
+
+    def is_done(self, title: str, files: List[Path]) -> bool:
+        entry = self.entries.get(title)
+        return entry is not None and entry['fingerprint'] == self.fingerprint(files)
+
+    def record(self, title: str, files: List[Path], output: str, seconds: float) -> None:
+        self.entries[title] = {
+            'fingerprint': self.fingerprint(files),
+            'files': [str(p) for p in files],
+            'output': output,
+            'seconds': round(seconds, 2),
+            'completed_at': datetime.now(timezone.utc).isoformat()
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.entries, indent=2), encoding='utf-8')
+        tmp.replace(self.path)
+
+@dataclass
+class BatchContext:
+    anthropic_client: Any
+    output: FileStorage
+    output_prefix: str
+    manifest: Manifest
+    semaphore: asyncio.Semaphore
+    total: int
+    analysis_batcher: Optional[AnalysisMicroBatcher] = None
+    normalizer: TranscriptNormalizer = field(default_factory=TranscriptNormalizer)
+    deduplicator: ChunkDeduplicator = field(default_factory=ChunkDeduplicator)
+    planner: PipelinePlanner = field(default_factory=PipelinePlanner)
+    compressor: Optional[ExtractiveCompressor] = None
+    finished: int = 0
+    failed: int = 0
+
+async def summarize_group(ctx: BatchContext, title: str, files: List[Path]) -> None:
+    async with ctx.semaphore:
+        started = time.perf_counter()
+        # Inputs are absolute paths named on the command line
+        storage = TimedFileStorage(LocalFileStorage('/'))
+        deps = Dependencies(
+            file_storage=storage,
+            anthropic_client=ctx.anthropic_client,
+            analysis_batcher=ctx.analysis_batcher,
+            deduplicator=ctx.deduplicator,
+            normalizer=ctx.normalizer,
+            planner=ctx.planner,
+            compressor=ctx.compressor
+        )
+        event = TranscriptionCreatedEvent(
+            name="transcriptions_created",
+            data=[
+                {'title': title if len(files) == 1 else f"{title} (part {i})", 'path': str(path)}
+                for i, path in enumerate(files, 1)
+            ]
+        )
+
+        try:
+            result = await get_summary(deps, event)
+            output_path = f"{ctx.output_prefix}{title}.md"
+            await ctx.output.write(output_path, result.data['summary'].encode('utf-8'))
+        except Exception as e:
+            ctx.failed += 1
+            ctx.finished += 1
+            print(f"[{ctx.finished}/{ctx.total}] {title}: FAILED - {e}")
+            return
+
+        seconds = time.perf_counter() - started
+        ctx.manifest.record(title, files, output_path, seconds)
+        ctx.finished += 1
+        print(f"[{ctx.finished}/{ctx.total}] {title}: {seconds:.1f}s -> {output_path}")
+        for path in files:
+            timing = storage.timings.get(str(path), {})
+            print(f"    {path.name}: {int(timing.get('bytes', 0))} bytes read in {timing.get('seconds', 0):.3f}s")
+
+def create_output(args: argparse.Namespace) -> FileStorage:
+    if args.minio_prefix is None:
+        return LocalFileStorage(args.output)
+    from infra.minio import MinioFileStorage
+    return MinioFileStorage(
+        endpoint=os.getenv('MINIO_ENDPOINT', 'localhost:9000'),
+        access_key=os.getenv('MINIO_ACCESS_KEY', 'minioadmin'),
+        secret_key=os.getenv('MINIO_SECRET_KEY', 'minioadmin'),
+        bucket=os.getenv('MINIO_BUCKET', 'transcriptions'),
+        secure=os.getenv('MINIO_SECURE', 'False').lower() == 'true'
+    )
+
+async def run(args: argparse.Namespace) -> int:
+    groups = group_by_title(collect_inputs(args.inputs))
+    manifest = Manifest(Path(args.manifest or Path(args.output) / 'manifest.json'))
+    pending = {
+        title: files for title, files in groups.items()
+        if args.force or not manifest.is_done(title, files)
+    }
+    print(f"Found {len(groups)} groups, {len(groups) - len(pending)} already summarized")
+    if not pending:
+        return 0
+
+    anthropic_client = anthropic.Client(api_key=os.getenv('ANTHROPIC_API_KEY'))
+    ctx = BatchContext(
+        anthropic_client=anthropic_client,
+        output=create_output(args),
+        output_prefix=args.minio_prefix or '',
+        manifest=manifest,
+        semaphore=asyncio.Semaphore(args.concurrency),
+        total=len(pending),
+        analysis_batcher=AnalysisMicroBatcher(anthropic_client) if args.batch_analysis else None,
+        compressor=ExtractiveCompressor(ratio=args.extractive_ratio) if args.extractive_ratio else None
+    )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(summarize_group(ctx, title, files) for title, files in pending.items()))
+    print(
+        f"Finished {ctx.total - ctx.failed}/{ctx.total} groups "
+        f"in {time.perf_counter() - started:.1f}s ({ctx.failed} failed)"
+    )
+    return 1 if ctx.failed else 0
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Summarize local transcription files in bulk")
+    parser.add_argument('inputs', nargs='+', help="Files, directories or glob patterns")
+    parser.add_argument('--output', default='summaries', help="Output directory (default: summaries)")
+    parser.add_argument('--minio-prefix', help="Write summaries to MinIO under this prefix instead")
+    parser.add_argument('--manifest', help="Resume manifest path (default: <output>/manifest.json)")
+    parser.add_argument('--concurrency', type=int, default=4, help="Groups processed at once")
+    parser.add_argument('--batch-analysis', action='store_true', help="Pack small chunks into shared LLM calls")
+    parser.add_argument('--extractive-ratio', type=float, help="Keep this share of sentences of long transcripts")
+    parser.add_argument('--force', action='store_true', help="Re-summarize groups found in the manifest")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point for bulk summarization"""
+    load_dotenv()
+    args = parse_args(argv)
+    if not os.getenv('ANTHROPIC_API_KEY'):
+        print("Error: ANTHROPIC_API_KEY environment variable not set")
+        sys.exit(1)
+
+    try:
+        sys.exit(asyncio.run(run(args)))
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
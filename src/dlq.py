@@ -0,0 +1,65 @@
+import os
+import sys
+import asyncio
+import argparse
+from typing import List, Optional
+from dotenv import load_dotenv
+from redis.asyncio import Redis
+from domain.constants import ServiceConfig
+from infra.dead_letter import DeadLetterQueue, format_letter
+
+async def run(args: argparse.Namespace) -> int:
+    redis = Redis(
+        host=os.getenv('REDIS_HOST', 'localhost'),
+        port=int(os.getenv('REDIS_PORT', 6379))
+    )
+    try:
+        dlq = DeadLetterQueue(redis, args.stream)
+        if args.command == 'stats':
+            counts = await dlq.summary()
+            print(f"{dlq.key}: {sum(counts.values())} dead letters")
+            for error_type, count in sorted(counts.items(), key=lambda item: -item[1]):
+                print(f"    {error_type}: {count}")
+            return 0
+
+        letters = await dlq.entries(count=args.count, error_type=args.error_type)
+        if args.ids:
+            wanted = set(args.ids)
+            letters = [letter for letter in letters if letter.id in wanted or letter.source_id in wanted]
+
+        if args.command == 'list':
+            for letter in letters:
+                print(format_letter(letter))
+            print(f"{len(letters)} dead letters")
+        elif args.command == 'redrive':
+            if args.dry_run:
+                print(f"Would redrive {len(letters)} dead letters")
+            else:
+                print(f"Redrove {await dlq.redrive(letters, target=args.target)} dead letters")
+        elif args.command == 'purge':
+            if args.dry_run:
+                print(f"Would purge {len(letters)} dead letters")
+            else:
+                print(f"Purged {await dlq.purge(letters)} dead letters")
+        return 0
+    finally:
+        await redis.aclose()
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Inspect and redrive dead-lettered events")
+    parser.add_argument('command', choices=['stats', 'list', 'redrive', 'purge'])
+    parser.add_argument('--stream', default=ServiceConfig.EVENT_NAME, help="Source stream (its DLQ is <stream>:dlq)")
+    parser.add_argument('--error-type', help="Only entries that failed with this exception type")
+    parser.add_argument('--ids', nargs='+', help="Only these DLQ or source entry ids")
+    parser.add_argument('--count', type=int, help="At most this many entries, oldest first")
+    parser.add_argument('--target', help="Redrive to this stream instead of the source stream")
+    parser.add_argument('--dry-run', action='store_true', help="Show what redrive or purge would do")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point for the dead-letter tool"""
+    load_dotenv()
+    sys.exit(asyncio.run(run(parse_args(argv))))
+
+if __name__ == "__main__":
+    main()
@@ -4,3 +4,57 @@ from dataclasses import dataclass
 class ServiceConfig:
     NAME: str = "summarizer"
     EVENT_NAME: str = "transcriptions_created"
+    OUTPUT_EVENT_NAME: str = "summary_created"
+    CLAIM_IDLE_MS: int = 5 * 60 * 1000
+    CONCURRENCY: int = 4
+    # e.g. "transcriptions_created:high=4,transcriptions_created=2,transcriptions_created:low=1"
+    PRIORITY_STREAMS: str = ""
+    TENANT_KEY: str = "tenant"
+    # Fair queuing reads up to this many events ahead to find other tenants' events behind a backlog
+    TENANT_LOOKAHEAD: int = 1000
+    ANALYSIS_BATCH_TOKENS: int = 6000
+    ANALYSIS_BATCH_LINGER_MS: int = 50
+    DEDUP_THRESHOLD: float = 0.8
+    NORMALIZE_STEPS: str = "json_header,timestamps,speaker_tags,fillers,whitespace"
+    # Share of tokens kept by extractive pre-compression; 0 disables it
+    EXTRACTIVE_RATIO: float = 0.0
+    EXTRACTIVE_MIN_TOKENS: int = 50000
+    ANALYSIS_PARALLELISM: int = 4
+    MERGE_FAN_IN: int = 8
+    RESULT_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    RESULT_CACHE_MAX_ENTRIES: int = 10000
+    # Meta field naming the set an event extends in incremental mode; the first title otherwise
+    GROUP_KEY: str = "group"
+    # What to do with events whose meta deadline passed before processing: drop or fast_track
+    DEADLINE_POLICY: str = "fast_track"
+    MAX_ATTEMPTS: int = 5
+    RETRY_BASE_DELAY_MS: int = 5000
+    # redis, or memory to run in-process with bounded queues and no Redis
+    EVENT_TRANSPORT: str = "redis"
+    MEMORY_QUEUE_SIZE: int = 1000
+    # minio, or local for a directory shared with the producers
+    STORAGE_BACKEND: str = "minio"
+    LOCAL_STORAGE_ROOT: str = "/data/transcriptions"
+    ARCHIVE_PREFIX: str = "archive"
+    ARCHIVE_INTERVAL_SECONDS: int = 60
+    # Opt-in profiling: reports kept in <NAME>:profiles, cProfile captures under PROFILE_PREFIX
+    PROFILE_TOP_SITES: int = 5
+    PROFILE_CAPTURE_EVENTS: int = 20
+    PROFILE_PREFIX: str = "profiles"
+    PROFILE_MAXLEN: int = 1000
+    USAGE_FLUSH_SECONDS: float = 5.0
+    USAGE_TTL_DAYS: int = 90
+
+@dataclass(frozen=True)
+class ModelConfig:
+    MODEL: str = "claude-3-5-sonnet-20241022"
+    # Used when an event's deadline is too tight for MODEL
+    FAST_MODEL: str = "claude-3-5-haiku-20241022"
+    FAST_MODEL_SPEEDUP: float = 2.5
+    # Part of the result memo key: bump whenever a prompt changes
+    PROMPT_VERSION: str = "1"
+    TEMPERATURE: float = 0.5
+    ANALYSIS_MAX_TOKENS: int = 2000
+    GUIDE_MAX_TOKENS: int = 4000
+    MAX_OUTPUT_TOKENS: int = 8192
+    CONTEXT_TOKENS: int = 200000
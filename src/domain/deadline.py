@@ -0,0 +1,128 @@
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from domain.constants import ModelConfig
+from infra.core_types import EventDropped
+from domain.planner import PipelinePlan, PipelinePlanner
+
+FAST_MODEL = "fast_model"
+EXTRACTIVE = "extractive"
+SKIP_GUIDE = "skip_guide"
+
+# Cumulative degradation levels, cheapest quality loss first
+LEVELS = ([], [FAST_MODEL], [FAST_MODEL, EXTRACTIVE], [FAST_MODEL, EXTRACTIVE, SKIP_GUIDE])
+
+# Share of the content kept when the extractive degradation applies
+EXTRACTIVE_RATIO = 0.4
+
+DROP = "drop"
+FAST_TRACK = "fast_track"
+
+class DeadlineExceeded(EventDropped):
+    """The event's deadline passed before processing started and the policy drops it"""
+
+def parse_deadline(meta: Any) -> Optional[float]:
+    """
+    Deadline from `meta['deadline']` as epoch seconds; ISO 8601 strings and numbers
+    are accepted. Anything else, such as a nested object, counts as no deadline.
+    """
+    if not isinstance(meta, dict) or meta.get('deadline') in (None, ''):
+        return None
+    value = meta['deadline']
+    if isinstance(value, bool):
+        return None
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        if not isinstance(value, str):
+            return None
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    # Millisecond timestamps are common in producers, as numbers or strings
+    return seconds / 1000 if seconds > 1e11 else seconds
+
+def check_expired(meta: Any, policy: str) -> None:
+    """Drop an event already past its deadline under the drop policy, before anything is read for it"""
+    if policy != DROP:
+        return
+    deadline = parse_deadline(meta)
+    if deadline is not None and deadline <= time.time():
+        raise DeadlineExceeded(f"Deadline passed {time.time() - deadline:.0f}s before processing started")
+
+def extractive_chunk_tokens(chunk_tokens: List[int], ratio: float, chunk_size: int = 4000) -> List[int]:
+    """Chunk sizes after keeping `ratio` of the content and chunking again"""
+    kept = int(sum(chunk_tokens) * ratio)
+    full, rest = divmod(kept, chunk_size)
+    return [chunk_size] * full + ([rest] if rest else []) or [0]
+
+@dataclass
+class DeadlineBudget:
+    deadline: float
+    policy: str
+    degradations: List[str] = field(default_factory=list)
+    expired: bool = False
+    predicted_seconds: float = 0.0
+    plan: Optional[PipelinePlan] = None
+
+    def remaining(self) -> float:
+        return self.deadline - time.time()
+
+    @property
+    def model(self) -> str:
+        return ModelConfig.FAST_MODEL if FAST_MODEL in self.degradations else ModelConfig.MODEL
+
+    def degrade(self, degradation: str) -> None:
+        if degradation not in self.degradations:
+            self.degradations.append(degradation)
+
+    def to_dict(self) -> Dict[str, Any]:
+        remaining = self.remaining()
+        return {
+            'deadline': self.deadline,
+            'policy': self.policy,
+            'expired_on_arrival': self.expired,
+            'predicted_seconds': round(self.predicted_seconds, 1),
+            'degradations': list(self.degradations),
+            'met': remaining >= 0,
+            'slack_seconds': round(remaining, 1),
+        }
+
+def budget_deadline(
+    planner: PipelinePlanner,
+    chunk_tokens: List[int],
+    deadline: float,
+    policy: str = FAST_TRACK,
+    extractive_ratio: float = EXTRACTIVE_RATIO,
+    fast_model_speedup: float = ModelConfig.FAST_MODEL_SPEEDUP
+) -> DeadlineBudget:
+    """
+    Pick the mildest degradation level whose predicted time fits the time left.
+    Expired events are dropped or run fully degraded, depending on the policy.
+    """
+    remaining = deadline - time.time()
+    budget = DeadlineBudget(deadline=deadline, policy=policy, expired=remaining <= 0)
+    if budget.expired and policy == DROP:
+        raise DeadlineExceeded(f"Deadline passed {-remaining:.0f}s before processing started")
+
+    levels = LEVELS[-1:] if budget.expired else LEVELS
+    for degradations in levels:
+        tokens = extractive_chunk_tokens(chunk_tokens, extractive_ratio) if EXTRACTIVE in degradations else chunk_tokens
+        plan = planner.plan(
+            tokens,
+            with_guide=SKIP_GUIDE not in degradations,
+            speedup=fast_model_speedup if FAST_MODEL in degradations else 1.0
+        )
+        budget.degradations = list(degradations)
+        budget.predicted_seconds = plan.predicted_seconds
+        budget.plan = plan
+        if plan.predicted_seconds <= remaining:
+            break
+    return budget
+
+def guide_fits(planner: PipelinePlanner, budget: DeadlineBudget, analyses: int) -> bool:
+    """Whether the guide call still fits the time left after the analysis stage"""
+    speedup = ModelConfig.FAST_MODEL_SPEEDUP if FAST_MODEL in budget.degradations else 1.0
+    return planner.guide_seconds(analyses) / speedup <= budget.remaining()
@@ -0,0 +1,142 @@
+import re
+import time
+import zlib
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from infra.core_types import BoilerplateIndex
+
+_WORD = re.compile(r"\w+")
+_SHINGLE_BASE = np.uint64(1099511628211)
+
+@dataclass
+class DedupReport:
+    chunks_in: int = 0
+    chunks_dropped: int = 0
+    boilerplate_paragraphs: int = 0
+    tokens_saved: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+class ChunkDeduplicator:
+    """
+    MinHash near-duplicate detection over word shingles. Paragraphs matching a
+    known boilerplate segment are stripped from every chunk, then chunks that
+    are near-duplicates of an earlier chunk in the same event are dropped.
+    """
+    def __init__(
+        self,
+        boilerplate_index: Optional[BoilerplateIndex] = None,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        threshold: float = 0.8,
+        index_refresh_seconds: float = 60.0,
+        seed: int = 1
+    ):
+        self.boilerplate_index = boilerplate_index
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.index_refresh_seconds = index_refresh_seconds
+        # Fixed seed keeps signatures comparable across processes and restarts
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, np.iinfo(np.uint64).max, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, np.iinfo(np.uint64).max, num_perm, dtype=np.uint64)
+        self._boilerplate = np.empty((0, num_perm), dtype=np.uint64)
+        self._boilerplate_loaded_at = float('-inf')
+
+    def _estimate_tokens(self, text: str) -> int:
+        return len(text) // 4
+
+    def shingle_hashes(self, text: str) -> np.ndarray:
+        """Hash every run of `shingle_size` consecutive words"""
+        words = _WORD.findall(text.lower())
+        if not words:
+            return np.empty(0, dtype=np.uint64)
+        # CRC32 runs in C at several million words a second, well ahead of signature();
+        # other hashes would orphan the signatures already in the boilerplate index
+        word_hashes = np.fromiter(map(zlib.crc32, map(str.encode, words)), dtype=np.uint64, count=len(words))
+        k = min(self.shingle_size, len(words))
+        # Polynomial combination of k neighbouring word hashes; uint64 wraps on overflow
+        shingles = np.zeros(len(words) - k + 1, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for offset in range(k):
+                shingles = shingles * _SHINGLE_BASE + word_hashes[offset:offset + len(shingles)]
+        return np.unique(shingles)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature, one minimum per hash permutation"""
+        shingles = self.shingle_hashes(text)
+        if shingles.size == 0:
+            return np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        # Multiply-shift hashing of every shingle under every permutation at once
+        with np.errstate(over='ignore'):
+            hashed = self._a[:, None] * shingles[None, :] + self._b[:, None]
+        return (hashed >> np.uint64(32)).min(axis=1)
+
+    def similarity(self, signature: np.ndarray, others: np.ndarray) -> np.ndarray:
+        """Estimated Jaccard similarity between one signature and each row of `others`"""
+        if others.size == 0:
+            return np.empty(0)
+        return (others == signature).mean(axis=1)
+
+    async def register_boilerplate(self, text: str) -> None:
+        """Add a known boilerplate segment (intro, ad read) to the persistent index"""
+        if self.boilerplate_index is None:
+            raise ValueError("No boilerplate index configured")
+        await self.boilerplate_index.add(self.signature(text).tobytes())
+        self._boilerplate_loaded_at = float('-inf')
+
+    async def _load_boilerplate(self) -> np.ndarray:
+        if self.boilerplate_index is None:
+            return self._boilerplate
+        now = time.monotonic()
+        if now - self._boilerplate_loaded_at >= self.index_refresh_seconds:
+            raw = await self.boilerplate_index.signatures()
+            rows = [np.frombuffer(s, dtype=np.uint64) for s in raw]
+            rows = [r for r in rows if r.size == self.num_perm]
+            self._boilerplate = np.vstack(rows) if rows else np.empty((0, self.num_perm), dtype=np.uint64)
+            self._boilerplate_loaded_at = now
+        return self._boilerplate
+
+    def _strip_boilerplate(self, chunk: str, boilerplate: np.ndarray) -> Tuple[str, int]:
+        paragraphs = chunk.split('\n\n')
+        kept = []
+        for para in paragraphs:
+            if len(_WORD.findall(para)) >= self.shingle_size and \
+                    self.similarity(self.signature(para), boilerplate).max() >= self.threshold:
+                continue
+            kept.append(para)
+        return '\n\n'.join(kept), len(paragraphs) - len(kept)
+
+    async def dedup(self, chunks: List[str]) -> Tuple[List[Optional[str]], DedupReport]:
+        """
+        Return the chunks with boilerplate removed and near-duplicates replaced
+        by None, so callers keep their original chunk positions.
+        """
+        report = DedupReport(chunks_in=len(chunks))
+        boilerplate = await self._load_boilerplate()
+        kept_signatures = np.empty((0, self.num_perm), dtype=np.uint64)
+        result: List[Optional[str]] = []
+
+        for chunk in chunks:
+            text = chunk
+            if boilerplate.size:
+                text, removed = self._strip_boilerplate(chunk, boilerplate)
+                report.boilerplate_paragraphs += removed
+
+            signature = self.signature(text)
+            if not text.strip() or (
+                kept_signatures.size and self.similarity(signature, kept_signatures).max() >= self.threshold
+            ):
+                report.chunks_dropped += 1
+                report.tokens_saved += self._estimate_tokens(chunk)
+                result.append(None)
+                continue
+
+            report.tokens_saved += self._estimate_tokens(chunk) - self._estimate_tokens(text)
+            kept_signatures = np.vstack([kept_signatures, signature])
+            result.append(text)
+
+        return result, report
@@ -1,13 +1,40 @@
-from typing import Any
-from infra.core_types import FileStorage, EventStore
+from typing import Any, Optional
+from infra.core_types import FileStorage, EventWriter, CheckpointStore, ResultCache, UsageTotals
 
 class Dependencies:
     def __init__(
         self,
         file_storage: FileStorage,
         anthropic_client: Any,
-        event_store: EventStore
+        event_store: Optional[EventWriter] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        analysis_batcher: Optional[Any] = None,
+        deduplicator: Optional[Any] = None,
+        normalizer: Optional[Any] = None,
+        planner: Optional[Any] = None,
+        result_cache: Optional[ResultCache] = None,
+        compressor: Optional[Any] = None,
+        deadline_policy: Optional[str] = None,
+        incremental: bool = False,
+        usage_totals: Optional[UsageTotals] = None,
+        summary_prefix: Optional[str] = None,
+        llm_settings: Optional[Any] = None
     ):
         self.file_storage = file_storage
         self.anthropic_client = anthropic_client
+        # Without an event store, callers take the summary event get_summary returns
         self.event_store = event_store
+        self.checkpoint_store = checkpoint_store
+        self.analysis_batcher = analysis_batcher
+        self.deduplicator = deduplicator
+        self.normalizer = normalizer
+        self.planner = planner
+        self.result_cache = result_cache
+        self.compressor = compressor
+        self.deadline_policy = deadline_policy
+        self.incremental = incremental
+        self.usage_totals = usage_totals
+        # Summaries are streamed to FileStorage under this prefix and events carry a reference
+        self.summary_prefix = summary_prefix
+        # Executor, timeout and observers of this service's LLM calls; see CallSettings
+        self.llm_settings = llm_settings
@@ -1,7 +1,26 @@
 import asyncio
-from typing import List, Dict
+import hashlib
+import json
+import time
+from typing import Any, List, Dict, Optional, Tuple
 import logging
-from domain.types import Deps, SummaryCreatedEvent, TranscriptionCreatedEvent, ClaudeMessage
+from domain.constants import ModelConfig, ServiceConfig
+from domain.llm import create_message
+from domain.memo import (
+    event_memo_key, part_memo_keys, group_memo_key, analyses_digest, encode_result, decode_result,
+    pipeline_settings, pipeline_version
+)
+from domain.normalizer import NormalizationReport
+from domain.extractive import CompressionReport, ExtractiveCompressor
+from domain.deadline import (
+    DeadlineBudget, EXTRACTIVE, EXTRACTIVE_RATIO, FAST_TRACK, SKIP_GUIDE,
+    budget_deadline, check_expired, guide_fits, parse_deadline
+)
+from domain.usage import UsageLedger, parse_token_budget, track_usage
+from domain.summary_output import SummaryAssembler, summary_guide, summary_head, summary_title
+from domain.planner import PipelinePlan, PipelinePlanner, PROMPT_OVERHEAD_TOKENS, SINGLE_SHOT, TREE_REDUCE
+from domain.types import Deps, SummaryCreatedEvent, TranscriptionCreatedEvent
+from domain.prompts import KnowledgeExtractorPromptBuilder, extract_text_from_response
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,205 +35,610 @@ async def validate_transcriptions(transcriptions: List[Dict[str, str]]) -> None:
         if not isinstance(t, dict) or 'title' not in t or 'path' not in t:
             raise ValueError("Invalid transcription format - missing title or path")
 
-def extract_text_from_response(response) -> str:
-    """Extract text from Claude API response"""
-    if not hasattr(response, 'content') or not response.content:
-        raise ValueError("Empty response from Claude API")
-    
-    # The content is a list of content blocks
-    for content_block in response.content:
-        # Content block is already an object with text attribute
-        if hasattr(content_block, 'text'):
-            return content_block.text.strip()
-    
-    raise ValueError("No valid text content in Claude API response")
-
-class KnowledgeExtractorPromptBuilder:
-    def __init__(self):
-        self._system_message = """You are an expert at extracting and structuring knowledge into universal, actionable frameworks.
-        Focus on principles and methodologies that can be applied."""
-
-        self._analysis_prompt = """Analyze this content section and create a structured knowledge framework.
-        For each major concept:
-
-        1. Core Definition
-           - What it means in principle
-           - How to recognize it
-           - Why it matters
-
-        2. Universal Application
-           - General principles
-           - Domain-agnostic methodologies
-           - Adaptation guidelines
-
-        3. Implementation Framework
-           - Detection/Assessment methods
-           - Step-by-step approach
-           - Progress measurement
-           - Common pitfalls
-
-        4. Integration Guide
-           - How it connects with other concepts
-           - Prerequisites if any
-           - Next steps
-
-        Format in Markdown with clear hierarchical structure.
-        Focus on creating a framework that could be applied."""
-        self._practical_guide_prompt = """Create an implementation guide based on the analyzed concepts.
-
-        Structure your response as follows:
-
-        # Implementation Framework
-
-        ## 1. Assessment Phase
-        - How to evaluate current state
-        - Framework for identifying gaps
-        - Measurement criteria
-
-        ## 2. Preparation Phase
-        - Universal setup steps
-        - Resource requirements
-        - Prerequisite checklist
-
-        ## 3. Implementation Phase
-        - Step-by-step methodology
-        - Progress tracking methods
-        - Adjustment triggers
-
-        ## 4. Evaluation & Iteration
-        - Success criteria
-        - Measurement framework
-        - Iteration protocol
-
-        For each section:
-        - Provide clear, actionable steps
-        - Include verification methods
-        - List potential obstacles and solutions
-        - Define success criteria
-
-        Keep all guidance applicable."""
-
-    def _estimate_tokens(self, text: str) -> int:
-        return len(text) // 4
-
-    def _chunk_content(self, content: str, max_tokens: int = 4000) -> List[str]:
-        paragraphs = content.split('\n\n')
-        chunks = []
-        current_chunk = []
-        current_tokens = 0
-        
-        for para in paragraphs:
-            para_tokens = self._estimate_tokens(para)
-            if current_tokens + para_tokens > max_tokens and current_chunk:
-                chunks.append('\n\n'.join(current_chunk))
-                current_chunk = [para]
-                current_tokens = para_tokens
+def checkpoint_key(event: TranscriptionCreatedEvent) -> Optional[str]:
+    """
+    Checkpoint key of an event: its id and a digest of its transcriptions.
+    Stream ids are unique only within one stream, so events of two priority or
+    shard streams may share an id; the digest keeps them from resuming each
+    other's steps.
+    """
+    event_id = getattr(event, 'id', None)
+    if not event_id:
+        return None
+    inputs = json.dumps([[t['title'], t['path']] for t in event.data])
+    return f"{event_id}:{hashlib.sha256(inputs.encode()).hexdigest()[:16]}"
+
+async def load_checkpoint(deps: Deps, event: TranscriptionCreatedEvent) -> Dict[str, str]:
+    """Load completed pipeline steps for a redelivered event"""
+    key = checkpoint_key(event)
+    if deps.checkpoint_store is None or key is None:
+        return {}
+    state = await deps.checkpoint_store.load(key)
+    if state:
+        logger.info(f"Resuming event {event.id} with {len(state)} completed steps")
+    return state
+
+async def save_checkpoint(deps: Deps, event: TranscriptionCreatedEvent, step: str, value: str) -> None:
+    """Persist the result of a completed pipeline step"""
+    key = checkpoint_key(event)
+    if deps.checkpoint_store is None or key is None:
+        return
+    await deps.checkpoint_store.save(key, step, value)
+
+def normalize_contents(deps: Deps, contents: List[str]) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+    """Strip transcript noise before chunking to cut token volume"""
+    if deps.normalizer is None:
+        return contents, None
+    normalized = []
+    total = NormalizationReport()
+    for content in contents:
+        text, report = deps.normalizer.normalize(content)
+        normalized.append(text)
+        total.add(report)
+    logger.info(
+        f"Normalization cut {total.bytes_in - total.bytes_out} bytes, "
+        f"~{total.tokens_in - total.tokens_out} tokens in {total.seconds:.3f}s"
+    )
+    return normalized, total.to_dict()
+
+def compress_contents(deps: Deps, contents: List[str]) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+    """Keep only the most informative sentences of very long transcripts"""
+    if deps.compressor is None:
+        return contents, None
+    compressed = []
+    total = CompressionReport()
+    for content in contents:
+        text, report = deps.compressor.compress(content)
+        compressed.append(text)
+        total.add(report)
+    if total.sentences_in:
+        logger.info(
+            f"Extractive compression kept {total.sentences_out}/{total.sentences_in} sentences, "
+            f"~{total.tokens_out}/{total.tokens_in} tokens in {total.seconds:.3f}s"
+        )
+    return compressed, total.to_dict() if total.sentences_in else None
+
+def chunk_contents(
+    prompt_builder: KnowledgeExtractorPromptBuilder,
+    contents: List[str],
+    prefix: str = "analysis"
+) -> List[Tuple[str, int, str]]:
+    """Split every content into chunks, tagged with a stable checkpoint step name"""
+    return [
+        (f"{prefix}:{content_idx}:{chunk_idx}", chunk_idx + 1, chunk)
+        for content_idx, content in enumerate(contents)
+        for chunk_idx, chunk in enumerate(prompt_builder._chunk_content(content))
+    ]
+
+def preselect_steps(
+    prompt_builder: KnowledgeExtractorPromptBuilder,
+    steps: List[Tuple[str, int, str]],
+    ratio: float
+) -> List[Tuple[str, int, str]]:
+    """Cut the chunk count by keeping only the most informative sentences of each content"""
+    compressor = ExtractiveCompressor(ratio=ratio, min_tokens=0)
+    contents: Dict[str, List[str]] = {}
+    for step, _, chunk in steps:
+        contents.setdefault(step.split(':')[1], []).append(chunk)
+    return [
+        (f"extract:{content_idx}:{chunk_idx}", chunk_idx + 1, chunk)
+        for content_idx, chunks in contents.items()
+        for chunk_idx, chunk in enumerate(
+            prompt_builder._chunk_content(compressor.compress('\n\n'.join(chunks))[0])
+        )
+    ]
+
+def apply_deadline(
+    deps: Deps,
+    event: TranscriptionCreatedEvent,
+    prompt_builder: KnowledgeExtractorPromptBuilder,
+    steps: List[Tuple[str, int, str]]
+) -> Tuple[Optional[DeadlineBudget], List[Tuple[str, int, str]]]:
+    """Budget the time left before the event's deadline, degrading the pipeline if it is short"""
+    deadline = parse_deadline(event.meta)
+    if deadline is None:
+        return None, steps
+    planner = deps.planner or PipelinePlanner()
+    budget = budget_deadline(
+        planner,
+        [prompt_builder._estimate_tokens(chunk) for _, _, chunk in steps],
+        deadline,
+        policy=deps.deadline_policy or FAST_TRACK
+    )
+    if EXTRACTIVE in budget.degradations:
+        steps = preselect_steps(prompt_builder, steps, ratio=EXTRACTIVE_RATIO)
+        # Re-plan on the chunks actually kept; the extractive level always uses the fast model
+        budget.plan = planner.plan(
+            [prompt_builder._estimate_tokens(chunk) for _, _, chunk in steps],
+            with_guide=budget.plan.with_guide,
+            speedup=ModelConfig.FAST_MODEL_SPEEDUP
+        )
+        budget.predicted_seconds = budget.plan.predicted_seconds
+    logger.info(
+        f"Deadline in {budget.remaining():.0f}s, predicted {budget.predicted_seconds:.0f}s, "
+        f"degradations: {budget.degradations or 'none'}"
+    )
+    return budget, steps
+
+async def analyze_chunks(
+    deps: Deps,
+    event: TranscriptionCreatedEvent,
+    prompt_builder: KnowledgeExtractorPromptBuilder,
+    steps: List[Tuple[str, int, str]],
+    checkpoint: Dict[str, str],
+    parallelism: int = 1,
+    model: str = ModelConfig.MODEL
+) -> List[str]:
+    """Run the analysis stage over every chunk, skipping chunks completed by a previous delivery"""
+    semaphore = asyncio.Semaphore(parallelism)
+    # The batcher always uses the default model
+    batcher = deps.analysis_batcher if model == ModelConfig.MODEL else None
+
+    async def analyze(step: str, index: int, chunk: str) -> str:
+        if step in checkpoint:
+            return checkpoint[step]
+        # The batcher sends large chunks alone, so it is bound by the plan's parallelism too
+        async with semaphore:
+            if batcher is not None:
+                analysis = await batcher.analyze(chunk)
             else:
-                current_chunk.append(para)
-                current_tokens += para_tokens
-                
-        if current_chunk:
-            chunks.append('\n\n'.join(current_chunk))
-        
-        return chunks
-
-    def create_analysis_messages(self, content: str) -> List[Dict[str, str]]:
-        chunks = self._chunk_content(content)
-        messages = []
-        
-        for i, chunk in enumerate(chunks, 1):
-            messages.extend([
-                ClaudeMessage(
-                    role="user",
-                    content=f"Content Section {i}:\n\n{chunk}\n\n{self._analysis_prompt}"
+                response = await create_message(
+                    deps.anthropic_client,
+                    stage='analysis',
+                    settings=deps.llm_settings,
+                    model=model,
+                    max_tokens=ModelConfig.ANALYSIS_MAX_TOKENS,
+                    temperature=ModelConfig.TEMPERATURE,
+                    system=prompt_builder._system_message,
+                    messages=[prompt_builder.create_analysis_message(chunk, index)]
                 )
-            ])
-        
-        return [{"role": m.role, "content": m.content} for m in messages]
-
-    def create_practical_guide_message(self, analyses: List[str]) -> Dict[str, str]:
-        combined_analyses = "\n\n---\n\n".join(f"Analysis {i+1}:\n{analysis}" 
-                                             for i, analysis in enumerate(analyses))
-        return {
-            "role": "user",
-            "content": f"Based on these analyses:\n\n{combined_analyses}\n\n{self._practical_guide_prompt}"
-        }
+                analysis = extract_text_from_response(response)
+        await save_checkpoint(deps, event, step, analysis)
+        return analysis
+
+    # Up to `parallelism` chunks are in flight, packed with other events' chunks by the batcher
+    if parallelism > 1:
+        return list(await asyncio.gather(*(analyze(*step) for step in steps)))
+    return [await analyze(*step) for step in steps]
+
+def plan_pipeline(
+    deps: Deps,
+    prompt_builder: KnowledgeExtractorPromptBuilder,
+    steps: List[Tuple[str, int, str]]
+) -> Optional[PipelinePlan]:
+    """Pick single-shot, map-reduce or tree-reduce from the token count of the kept chunks"""
+    if deps.planner is None:
+        return None
+    plan = deps.planner.plan([prompt_builder._estimate_tokens(chunk) for _, _, chunk in steps])
+    logger.info(
+        f"Planned {plan.strategy} for ~{plan.content_tokens} tokens in {plan.chunks} chunks, "
+        f"{plan.calls} calls, predicted {plan.predicted_seconds:.1f}s (options: {plan.alternatives})"
+    )
+    return plan
+
+async def write_guide(
+    deps: Deps,
+    event: TranscriptionCreatedEvent,
+    prompt_builder: KnowledgeExtractorPromptBuilder,
+    analyses: List[str],
+    checkpoint: Dict[str, str],
+    model: str = ModelConfig.MODEL
+) -> str:
+    """Generate the practical implementation guide from the analyses"""
+    if 'guide' in checkpoint:
+        return checkpoint['guide']
+    practical_response = await create_message(
+        deps.anthropic_client,
+        stage='guide',
+        settings=deps.llm_settings,
+        model=model,
+        max_tokens=ModelConfig.GUIDE_MAX_TOKENS,
+        temperature=ModelConfig.TEMPERATURE,
+        system=prompt_builder._system_message,
+        messages=[prompt_builder.create_practical_guide_message(analyses)]
+    )
+    practical_guide = extract_text_from_response(practical_response)
+    await save_checkpoint(deps, event, 'guide', practical_guide)
+    return practical_guide
+
+async def single_shot(
+    deps: Deps,
+    event: TranscriptionCreatedEvent,
+    prompt_builder: KnowledgeExtractorPromptBuilder,
+    steps: List[Tuple[str, int, str]],
+    checkpoint: Dict[str, str],
+    model: str = ModelConfig.MODEL,
+    with_guide: bool = True
+) -> Tuple[List[str], Optional[str]]:
+    """Analyze the whole content and write the guide in one call"""
+    if 'analysis:single' in checkpoint and ('guide' in checkpoint or not with_guide):
+        return [checkpoint['analysis:single']], checkpoint.get('guide') if with_guide else None
+    content = '\n\n'.join(chunk for _, _, chunk in steps)
+    response = await create_message(
+        deps.anthropic_client,
+        stage='single_shot',
+        settings=deps.llm_settings,
+        model=model,
+        max_tokens=ModelConfig.MAX_OUTPUT_TOKENS,
+        temperature=ModelConfig.TEMPERATURE,
+        system=prompt_builder._system_message,
+        messages=[
+            prompt_builder.create_single_shot_message(content) if with_guide
+            else prompt_builder.create_analysis_message(content)
+        ]
+    )
+    text = extract_text_from_response(response)
+    parts = prompt_builder.split_single_shot(text) if with_guide else {}
+    analysis = parts.get('analysis') or text
+    await save_checkpoint(deps, event, 'analysis:single', analysis)
+    if not with_guide:
+        return [analysis], None
+    if 'guide' in parts:
+        await save_checkpoint(deps, event, 'guide', parts['guide'])
+        return [analysis], parts['guide']
+    # The model skipped the guide; fall back to a separate guide call
+    return [analysis], await write_guide(deps, event, prompt_builder, [analysis], checkpoint, model)
+
+async def merge_analyses(
+    deps: Deps,
+    event: TranscriptionCreatedEvent,
+    prompt_builder: KnowledgeExtractorPromptBuilder,
+    analyses: List[str],
+    checkpoint: Dict[str, str],
+    fan_in: int,
+    parallelism: int = 1,
+    model: str = ModelConfig.MODEL,
+    known_merges: Optional[Dict[str, str]] = None,
+    merges: Optional[Dict[str, str]] = None
+) -> List[str]:
+    """
+    Merge analyses in groups of `fan_in`, level by level, until the guide input
+    is small. With `merges`, every merge of this run is recorded there by the
+    digest of its inputs, and ones found in `known_merges` are not called again.
+    """
+    semaphore = asyncio.Semaphore(parallelism)
+
+    async def merge(step: str, group: List[str]) -> str:
+        digest = analyses_digest(group) if merges is not None else None
+        if step in checkpoint:
+            merged = checkpoint[step]
+        elif known_merges and digest in known_merges:
+            merged = known_merges[digest]
+        else:
+            async with semaphore:
+                response = await create_message(
+                    deps.anthropic_client,
+                    stage='merge',
+                    settings=deps.llm_settings,
+                    model=model,
+                    max_tokens=ModelConfig.ANALYSIS_MAX_TOKENS,
+                    temperature=ModelConfig.TEMPERATURE,
+                    system=prompt_builder._system_message,
+                    messages=[prompt_builder.create_merge_message(group)]
+                )
+            merged = extract_text_from_response(response)
+            await save_checkpoint(deps, event, step, merged)
+        if merges is not None:
+            merges[digest] = merged
+        return merged
+
+    level = 0
+    while len(analyses) > fan_in:
+        analyses = list(await asyncio.gather(*(
+            merge(f"merge:{level}:{i}", analyses[i:i + fan_in])
+            for i in range(0, len(analyses), fan_in)
+        )))
+        level += 1
+    return analyses
+
+async def dedup_chunks(
+    deps: Deps,
+    steps: List[Tuple[str, int, str]]
+) -> Tuple[List[Tuple[str, int, str]], Optional[Dict[str, int]]]:
+    """Drop near-duplicate chunks and known boilerplate before analysis"""
+    if deps.deduplicator is None:
+        return steps, None
+    texts, report = await deps.deduplicator.dedup([chunk for _, _, chunk in steps])
+    kept = [
+        (step, index, text)
+        for (step, index, _), text in zip(steps, texts)
+        if text is not None
+    ]
+    if steps and not kept:
+        raise ValueError("Every chunk was dropped as duplicate or boilerplate")
+    logger.info(
+        f"Dedup dropped {report.chunks_dropped}/{report.chunks_in} chunks, "
+        f"saved ~{report.tokens_saved} tokens"
+    )
+    return kept, report.to_dict()
+
+def analysis_steps(
+    prompt_builder: KnowledgeExtractorPromptBuilder,
+    part_idx: int,
+    content: str
+) -> List[Tuple[str, int, str]]:
+    """A whole transcript part as one analysis step when it fits the context, its chunks otherwise"""
+    tokens = prompt_builder._estimate_tokens(content) + PROMPT_OVERHEAD_TOKENS + ModelConfig.ANALYSIS_MAX_TOKENS
+    if tokens <= ModelConfig.CONTEXT_TOKENS:
+        return [(f"part:{part_idx}", 1, content)]
+    return [
+        (f"part:{part_idx}:{chunk_idx}", chunk_idx + 1, chunk)
+        for chunk_idx, chunk in enumerate(prompt_builder._chunk_content(content))
+    ]
+
+async def summarize_incrementally(
+    deps: Deps,
+    event: TranscriptionCreatedEvent,
+    prompt_builder: KnowledgeExtractorPromptBuilder,
+    checkpoint: Dict[str, str]
+) -> Optional[Tuple[List[str], Optional[str], Dict[str, Any]]]:
+    """
+    Analyze only the parts no earlier event analyzed, then rerun the guide over
+    the analyses of every part. New parts go through dedup, the deadline budget
+    and the planner like a full run. The group's entry keeps the merges and the
+    guide of its last run, which are reused while their inputs are unchanged.
+    Returns None when the parts cannot be fingerprinted, leaving the event to
+    the full pipeline; otherwise the analyses, the guide and the output meta sections.
+    """
+    version = pipeline_version(pipeline_settings(deps))
+    part_keys = await part_memo_keys(deps.file_storage, event, version)
+    if part_keys is None:
+        return None
+    group_key = group_memo_key(event, version=version)
+    group, *cached = await asyncio.gather(
+        deps.result_cache.get(group_key),
+        *(deps.result_cache.get(key) for key in part_keys)
+    )
+    previous = json.loads(group) if group is not None else {}
+
+    new_parts = [i for i, value in enumerate(cached) if value is None]
+    contents_bytes = await asyncio.gather(*(deps.file_storage.read(event.data[i]['path']) for i in new_parts))
+    contents, normalization_report = normalize_contents(deps, [str(content, 'utf-8') for content in contents_bytes])
+    contents, compression_report = compress_contents(deps, contents)
+
+    steps = [step for i, content in zip(new_parts, contents) for step in analysis_steps(prompt_builder, i, content)]
+    steps, dedup_report = await dedup_chunks(deps, steps)
+    budget, plan = None, None
+    if steps:
+        # Planned on the new parts only; the strategy is always map-reduce over parts here
+        budget, steps = apply_deadline(deps, event, prompt_builder, steps)
+        plan = budget.plan if budget is not None else plan_pipeline(deps, prompt_builder, steps)
+    model = budget.model if budget is not None else ModelConfig.MODEL
+    if plan is not None:
+        parallelism, fan_in = plan.parallelism, plan.fan_in
+    elif deps.planner is not None:
+        parallelism, fan_in = deps.planner.parallelism, deps.planner.fan_in
+    else:
+        parallelism, fan_in = 1, ServiceConfig.MERGE_FAN_IN
+
+    analyses = await analyze_chunks(deps, event, prompt_builder, steps, checkpoint, parallelism, model)
+    analyzed: Dict[int, List[str]] = {i: [] for i in new_parts}
+    for (step, _, _), analysis in zip(steps, analyses):
+        # Step names are `part:<index>` or `part:<index>:<chunk>`
+        analyzed[int(step.split(':')[1])].append(analysis)
+    # Degraded analyses are not stored for later events, like degraded results in the memo
+    if not (budget is not None and budget.degradations):
+        await asyncio.gather(*(deps.result_cache.put(part_keys[i], json.dumps(analyzed[i])) for i in new_parts))
+    all_analyses = [
+        analysis
+        for i, value in enumerate(cached)
+        for analysis in (analyzed[i] if value is None else json.loads(value))
+    ]
+
+    guide_inputs = all_analyses
+    merges: Dict[str, str] = {}
+    if len(all_analyses) > fan_in:
+        guide_inputs = await merge_analyses(
+            deps, event, prompt_builder, all_analyses, checkpoint, fan_in, parallelism, model,
+            known_merges=previous.get('merges'), merges=merges
+        )
+    with_guide = plan is None or plan.with_guide
+    if budget is not None and with_guide and not guide_fits(deps.planner or PipelinePlanner(), budget, len(guide_inputs)):
+        budget.degrade(SKIP_GUIDE)
+        with_guide = False
+    guide_digest = analyses_digest(guide_inputs)
+    guide_reused = with_guide and previous.get('guide_inputs') == guide_digest
+    practical_guide = None
+    if guide_reused:
+        practical_guide = previous['guide']
+    elif with_guide:
+        practical_guide = await write_guide(deps, event, prompt_builder, guide_inputs, checkpoint, model)
+    if not (budget is not None and budget.degradations):
+        await deps.result_cache.put(group_key, json.dumps({
+            'parts': part_keys,
+            'merges': merges,
+            'guide_inputs': guide_digest,
+            'guide': practical_guide,
+        }))
+
+    previous_parts = set(previous.get('parts', []))
+    report = {
+        'parts': len(part_keys),
+        'reused': len(part_keys) - len(new_parts),
+        'analyzed': len(new_parts),
+        'extends_previous': bool(previous_parts) and previous_parts <= set(part_keys),
+        'guide_reused': guide_reused,
+    }
+    logger.info(
+        f"Incremental summary: reused {report['reused']}/{report['parts']} parts, "
+        f"analyzed {report['analyzed']}, guide {'reused' if guide_reused else 'rewritten'}"
+    )
+    sections = {
+        'incremental': report,
+        'normalization': normalization_report,
+        'compression': compression_report,
+        'dedup': dedup_report,
+        'plan': plan.to_dict() if plan is not None else None,
+        'deadline': budget.to_dict() if budget is not None else None,
+    }
+    return all_analyses, practical_guide, sections
+
+def render_summary(titles: List[str], all_analyses: List[str], practical_guide: Optional[str]) -> Dict[str, str]:
+    """Combine analyses and practical guide into the final markdown"""
+    return {
+        'title': summary_title(titles),
+        'summary': ''.join([*summary_head(all_analyses, practical_guide is not None), *summary_guide(practical_guide)])
+    }
+
+async def assemble_summary(
+    assembler: Optional[SummaryAssembler],
+    titles: List[str],
+    all_analyses: List[str],
+    practical_guide: Optional[str]
+) -> Dict[str, Any]:
+    """Event data of the summary: inline, or a reference to the object it was streamed to"""
+    if assembler is None:
+        return render_summary(titles, all_analyses, practical_guide)
+    return await assembler.finish(titles, all_analyses, practical_guide)
+
+def build_output_meta(event: TranscriptionCreatedEvent, **sections: Any) -> Any:
+    """Attach pipeline reports to the incoming meta, leaving it untouched when there are none"""
+    sections = {k: v for k, v in sections.items() if v is not None}
+    if not sections:
+        return event.meta
+    return {**(event.meta or {}), **sections}
+
+async def lookup_result(deps: Deps, event: TranscriptionCreatedEvent) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """Memo key of the event and the stored result for it, from object metadata only"""
+    if deps.result_cache is None:
+        return None, None
+    try:
+        key = await event_memo_key(deps.file_storage, event, pipeline_version(pipeline_settings(deps)))
+    except Exception as e:
+        # Let the pipeline surface missing objects with its own error
+        logger.warning(f"Could not fingerprint event inputs: {e}")
+        return None, None
+    if key is None:
+        return None, None
+    cached = await deps.result_cache.get(key)
+    return key, decode_result(cached) if cached is not None else None
+
+async def emit_summary(deps: Deps, event: TranscriptionCreatedEvent, out_event: SummaryCreatedEvent) -> SummaryCreatedEvent:
+    if deps.event_store is not None:
+        await deps.event_store.write_event(out_event)
+        logger.info(f"Written event {out_event}")
+
+    key = checkpoint_key(event)
+    if deps.checkpoint_store is not None and key is not None:
+        await deps.checkpoint_store.complete(key)
+    return out_event
 
 async def get_summary(deps: Deps, event: TranscriptionCreatedEvent) -> SummaryCreatedEvent:
+    """
+    Summarize an event, charging every LLM call to its UsageLedger. Calls that
+    could take it past `meta.token_budget` fail with TokenBudgetExceeded.
+    """
+    ledger = UsageLedger(budget=parse_token_budget(event.meta))
+    try:
+        with track_usage(ledger):
+            return await summarize(deps, event, ledger)
+    finally:
+        # Tokens spent on a failed attempt count toward the tenant's totals too
+        if deps.usage_totals is not None and ledger.calls:
+            meta = event.meta if isinstance(event.meta, dict) else {}
+            deps.usage_totals.add(str(meta.get(ServiceConfig.TENANT_KEY) or 'default'), ledger.counters())
+
+async def summarize(deps: Deps, event: TranscriptionCreatedEvent, ledger: UsageLedger) -> SummaryCreatedEvent:
+    assembler = None
     try:
         logger.info(f"Got event: {event}")
         transcriptions = event.data
         await validate_transcriptions(transcriptions)
+        check_expired(event.meta, deps.deadline_policy or FAST_TRACK)
 
-        content_tasks = [deps.file_storage.read(t['path']) for t in transcriptions]
-        contents_bytes = await asyncio.gather(*content_tasks)
-        contents = [content.decode('utf-8') for content in contents_bytes]
-        titles = [t['title'] for t in transcriptions]
+        memo_key, memo = await lookup_result(deps, event)
+        if memo is not None:
+            logger.info(f"Memo hit {memo_key}, re-emitting stored summary")
+            return await emit_summary(deps, event, SummaryCreatedEvent(
+                name="summary_created",
+                meta=build_output_meta(event, **memo['sections'], memo={'hit': True}),
+                data=memo['data']
+            ))
 
+        titles = [t['title'] for t in transcriptions]
+        if deps.summary_prefix:
+            assembler = SummaryAssembler.for_event(deps.file_storage, deps.summary_prefix, event)
         prompt_builder = KnowledgeExtractorPromptBuilder()
-        all_analyses = []
-
-        # Process each content for analysis
-        for content in contents:
-            analysis_messages = prompt_builder.create_analysis_messages(content)
-            content_analyses = []
-
-            for message in analysis_messages:
-                response = deps.anthropic_client.messages.create(
-                    model="claude-3-5-sonnet-20241022",
-                    max_tokens=2000,
-                    temperature=0.5,
-                    system=prompt_builder._system_message,
-                    messages=[message]
-                )
-                analysis = extract_text_from_response(response)
-                content_analyses.append(analysis)
-
-            all_analyses.extend(content_analyses)
-
-        # Generate practical implementation guide
-        practical_message = prompt_builder.create_practical_guide_message(all_analyses)
-        practical_response = deps.anthropic_client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=4000,
-            temperature=0.5,
-            system=prompt_builder._system_message,
-            messages=[practical_message]
-        )
-        practical_guide = extract_text_from_response(practical_response)
-
-        # Combine analyses and practical guide into final markdown
-        final_output = f"""# Content Analysis and Implementation Guide
-
-## Content Overview
-{all_analyses[0]}  # First analysis contains ToC and key concepts
-
-## Detailed Analyses
-{'---'.join(all_analyses[1:])}  # Remaining detailed analyses
-
-## Practical Implementation Guide
-{practical_guide}
-"""
-
-        # Create combined title
-        combined_title = (
-            titles[0] if len(titles) == 1 
-            else f"Knowledge Extract of {len(titles)} transcriptions: {', '.join(titles[:3])}{'...' if len(titles) > 3 else ''}"
-        )
+        checkpoint = await load_checkpoint(deps, event)
+        if deps.incremental and deps.result_cache is not None:
+            incremental = await summarize_incrementally(deps, event, prompt_builder, checkpoint)
+            if incremental is not None:
+                all_analyses, practical_guide, sections = incremental
+                data = await assemble_summary(assembler, titles, all_analyses, practical_guide)
+                if memo_key is not None and not (sections['deadline'] and sections['deadline']['degradations']):
+                    await deps.result_cache.put(memo_key, encode_result(data, sections))
+                return await emit_summary(deps, event, SummaryCreatedEvent(
+                    name="summary_created",
+                    meta=build_output_meta(event, **sections, usage=ledger.to_dict()),
+                    data=data
+                ))
 
+        content_tasks = [deps.file_storage.read(t['path']) for t in transcriptions]
+        contents_bytes = await asyncio.gather(*content_tasks)
+        # str() decodes memoryviews from mapped local files as well as bytes
+        contents = [str(content, 'utf-8') for content in contents_bytes]
+        contents, normalization_report = normalize_contents(deps, contents)
+        contents, compression_report = compress_contents(deps, contents)
+
+        steps, dedup_report = await dedup_chunks(deps, chunk_contents(prompt_builder, contents))
+        budget, steps = apply_deadline(deps, event, prompt_builder, steps)
+        plan = budget.plan if budget is not None else plan_pipeline(deps, prompt_builder, steps)
+        model = budget.model if budget is not None else ModelConfig.MODEL
+        started = time.perf_counter()
+        if plan is not None and plan.strategy == SINGLE_SHOT:
+            all_analyses, practical_guide = await single_shot(
+                deps, event, prompt_builder, steps, checkpoint, model, with_guide=plan.with_guide
+            )
+        else:
+            parallelism = plan.parallelism if plan is not None else 1
+            all_analyses = await analyze_chunks(deps, event, prompt_builder, steps, checkpoint, parallelism, model)
+            guide_inputs = all_analyses
+            if plan is not None and plan.strategy == TREE_REDUCE:
+                guide_inputs = await merge_analyses(
+                    deps, event, prompt_builder, all_analyses, checkpoint, plan.fan_in, parallelism, model
+                )
+            practical_guide = None
+            with_guide = plan is None or plan.with_guide
+            if budget is not None and with_guide and not guide_fits(deps.planner or PipelinePlanner(), budget, len(guide_inputs)):
+                # The analyses ran long; ship them without the guide rather than miss the deadline
+                budget.degrade(SKIP_GUIDE)
+                with_guide = False
+            if assembler is not None:
+                # Uploaded while the guide is being written
+                await assembler.write_head(all_analyses, with_guide)
+            if with_guide:
+                practical_guide = await write_guide(deps, event, prompt_builder, guide_inputs, checkpoint, model)
+        plan_report = None
+        if plan is not None:
+            elapsed = time.perf_counter() - started
+            # Degraded runs use another model or input size than the latency model describes
+            if deps.planner is not None and not (budget and budget.degradations):
+                deps.planner.observe(plan, elapsed)
+            plan_report = {**plan.to_dict(), 'actual_seconds': round(elapsed, 1)}
+
+        data = await assemble_summary(assembler, titles, all_analyses, practical_guide)
+        sections = {
+            'normalization': normalization_report,
+            'compression': compression_report,
+            'dedup': dedup_report,
+            'plan': plan_report,
+            'deadline': budget.to_dict() if budget is not None else None
+        }
         out_event = SummaryCreatedEvent(
             name="summary_created",
-            meta=event.meta,
-            data={
-                'title': combined_title,
-                'summary': final_output
-            }
+            # Usage is per delivery, so it is not part of the memoized sections
+            meta=build_output_meta(event, **sections, usage=ledger.to_dict()),
+            data=data
         )
 
-        await deps.event_store.write_event(out_event)
-        logger.info(f"Written event {out_event}")
-        return out_event
+        # Stored first, so a redelivery after a failed write is served from the memo.
+        # Degraded results are not memoized: a later event without a deadline deserves the full pipeline
+        if memo_key is not None and not (budget and budget.degradations):
+            await deps.result_cache.put(memo_key, encode_result(data, sections))
+        return await emit_summary(deps, event, out_event)
         
     except Exception as e:
         logger.error(f"Error in knowledge extraction: {e}")
+        if assembler is not None:
+            await assembler.abort()
         raise
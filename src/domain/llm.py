@@ -0,0 +1,99 @@
+import time
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from domain.usage import current_ledger, estimate_request_tokens, usage_tokens
+
+class CallExecutor:
+    """
+    Threads for the synchronous Messages API calls, apart from the loop's
+    default executor that file reads and DNS lookups share. Size it to the
+    HTTP connection pool: more threads would only wait for a connection, and
+    calls beyond it wait in the queue, whose depth stats() reports.
+    """
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix='llm')
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._running = 0
+
+    def _call(self, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._running += 1
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._submitted -= 1
+
+    def run(self, fn: Callable[[], Any]) -> 'asyncio.Future[Any]':
+        with self._lock:
+            self._submitted += 1
+        return asyncio.get_running_loop().run_in_executor(self._pool, self._call, fn)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'threads': self.max_workers, 'running': self._running, 'queued': self._submitted - self._running}
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
+
+@dataclass
+class CallSettings:
+    """How one service's create_message calls are run, passed in with its Deps"""
+    # Runs every call when set, else the loop's default executor
+    executor: Optional[CallExecutor] = None
+    # Upper bound on a whole call including SDK retries; the HTTP timeouts bound each phase
+    total_timeout: Optional[float] = None
+    # Callbacks receiving timing and token counts of every completed call
+    observers: List[Callable[[Dict[str, Any]], None]] = field(default_factory=list)
+
+async def create_message(client: Any, stage: Optional[str] = None, settings: Optional[CallSettings] = None, **kwargs) -> Any:
+    """
+    Call the Messages API without blocking the event loop. The call is checked
+    against and charged to the current event's UsageLedger, under `stage`.
+    Without `settings` it runs on the default executor with no overall timeout.
+    """
+    settings = settings or CallSettings()
+    ledger = current_ledger()
+    reserved = 0
+    if ledger is not None:
+        reserved = ledger.reserve(
+            stage or 'other',
+            estimate_request_tokens(kwargs.get('system'), kwargs.get('messages')),
+            kwargs.get('max_tokens') or 0
+        )
+    # anthropic.Client is synchronous, so run it on a worker thread
+    request = partial(client.messages.create, **kwargs)
+    started = time.perf_counter()
+    try:
+        pending = (
+            settings.executor.run(request) if settings.executor is not None
+            else asyncio.get_running_loop().run_in_executor(None, request)
+        )
+        # On timeout the worker thread finishes in the background, bounded by the read timeout
+        response = await (asyncio.wait_for(pending, settings.total_timeout) if settings.total_timeout else pending)
+    except BaseException:
+        if ledger is not None:
+            ledger.release(reserved)
+        raise
+    input_tokens, output_tokens = usage_tokens(response)
+    if ledger is not None:
+        ledger.record(stage or 'other', input_tokens, output_tokens, reserved)
+    if settings.observers:
+        call = {
+            'seconds': time.perf_counter() - started,
+            'model': kwargs.get('model'),
+            'stage': stage,
+            'max_tokens': kwargs.get('max_tokens'),
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+        }
+        for observer in settings.observers:
+            observer(call)
+    return response
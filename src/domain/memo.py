@@ -0,0 +1,75 @@
+import json
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Optional
+from domain.constants import ModelConfig, ServiceConfig
+from infra.core_types import FileStorage
+
+def pipeline_settings(deps: Any) -> Dict[str, Any]:
+    """Service settings that change the output of the same inputs"""
+    return {
+        'normalizer': deps.normalizer.steps if deps.normalizer is not None else None,
+        'dedup': deps.deduplicator.threshold if deps.deduplicator is not None else None,
+        'extractive': (
+            [deps.compressor.ratio, deps.compressor.min_tokens] if deps.compressor is not None else None
+        ),
+        'planner': deps.planner is not None,
+        'summary_prefix': deps.summary_prefix,
+        'incremental': deps.incremental,
+    }
+
+def pipeline_version(settings: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Everything besides the inputs that changes the output; bump PROMPT_VERSION
+    on prompt edits. `settings` (see pipeline_settings) are folded in as a
+    short digest, so entries of another configuration are never hit and
+    expire with the cache TTL.
+    """
+    version = f"{ModelConfig.PROMPT_VERSION}:{ModelConfig.MODEL}:{ModelConfig.TEMPERATURE}"
+    if settings is None:
+        return version
+    return f"{version}:{hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:12]}"
+
+async def event_memo_key(file_storage: FileStorage, event: Any, version: Optional[str] = None) -> Optional[str]:
+    """
+    Fingerprint of an event's inputs from object metadata only: the titles plus
+    the sorted (path, ETag, size) of every transcription. None when some object
+    has no ETag, since its content could then change unnoticed.
+    """
+    paths = [t['path'] for t in event.data]
+    stats = await asyncio.gather(*(file_storage.stat(path) for path in paths))
+    if any(not stat.etag for stat in stats):
+        return None
+    fingerprint = {
+        'titles': [t['title'] for t in event.data],
+        'objects': sorted((path, stat.etag, stat.size) for path, stat in zip(paths, stats)),
+    }
+    digest = hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()
+    return f"{version or pipeline_version()}:{digest}"
+
+async def part_memo_keys(file_storage: FileStorage, event: Any, version: Optional[str] = None) -> Optional[List[str]]:
+    """Fingerprint of every transcription on its own, so parts shared between events are analyzed once"""
+    paths = [t['path'] for t in event.data]
+    stats = await asyncio.gather(*(file_storage.stat(path) for path in paths))
+    if any(not stat.etag for stat in stats):
+        return None
+    return [
+        f"{version or pipeline_version()}:part:{hashlib.sha256(json.dumps([path, stat.etag, stat.size]).encode()).hexdigest()}"
+        for path, stat in zip(paths, stats)
+    ]
+
+def group_memo_key(event: Any, group_key: str = ServiceConfig.GROUP_KEY, version: Optional[str] = None) -> str:
+    """Key of the set an event belongs to: `meta[group_key]` when given, else its first title"""
+    meta = event.meta if isinstance(event.meta, dict) else {}
+    group = str(meta.get(group_key) or event.data[0]['title'])
+    return f"{version or pipeline_version()}:group:{hashlib.sha256(group.encode()).hexdigest()}"
+
+def analyses_digest(analyses: List[str]) -> str:
+    """Fingerprint of the inputs of a merge or guide call, to reuse its output across events of a group"""
+    return hashlib.sha256(json.dumps(analyses).encode()).hexdigest()[:32]
+
+def encode_result(data: Dict[str, Any], sections: Dict[str, Any]) -> str:
+    return json.dumps({'data': data, 'sections': sections})
+
+def decode_result(value: str) -> Dict[str, Any]:
+    return json.loads(value)
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+from domain.constants import ModelConfig
+from domain.llm import CallSettings, create_message
+from domain.usage import UsageLedger, current_ledger, track_usage, usage_tokens
+from domain.prompts import KnowledgeExtractorPromptBuilder, batch_fence, extract_text_from_response
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PendingChunk:
+    content: str
+    tokens: int
+    future: asyncio.Future
+    # Usage of shared calls is charged to the submitting event's ledger
+    ledger: Optional[UsageLedger] = None
+    reserved: int = 0
+
+def _shares(total: int, weights: List[int]) -> List[int]:
+    """Split `total` in proportion to `weights`, the rounding remainder going to the last"""
+    whole = sum(weights)
+    shares = [total * weight // whole if whole else total // len(weights) for weight in weights]
+    shares[-1] += total - sum(shares)
+    return shares
+
+def _release(pending: PendingChunk) -> None:
+    if pending.ledger is not None:
+        pending.ledger.release(pending.reserved)
+    pending.reserved = 0
+
+def _settle(future: asyncio.Future, result: Optional[str] = None, error: Optional[BaseException] = None) -> None:
+    # The submitting event may have been cancelled while the batch was in flight
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+class AnalysisMicroBatcher:
+    """
+    Packs analysis chunks submitted by concurrently running events into shared
+    LLM calls. A batch is sent once it reaches the token budget, the section
+    limit, or the linger time, whichever comes first. Sections missing from a
+    batched response are retried as individual calls.
+    """
+    def __init__(
+        self,
+        anthropic_client: Any,
+        prompt_builder: Optional[KnowledgeExtractorPromptBuilder] = None,
+        token_budget: int = 6000,
+        max_linger: float = 0.05,
+        max_sections: Optional[int] = None,
+        llm_settings: Optional[CallSettings] = None
+    ):
+        self.anthropic_client = anthropic_client
+        self.llm_settings = llm_settings
+        self.prompt_builder = prompt_builder or KnowledgeExtractorPromptBuilder()
+        self.token_budget = token_budget
+        self.max_linger = max_linger
+        # Every section needs its own share of the response
+        self.max_sections = max_sections or (
+            ModelConfig.MAX_OUTPUT_TOKENS // ModelConfig.ANALYSIS_MAX_TOKENS
+        )
+        self.calls = 0
+        self.chunks = 0
+        self._pending: List[PendingChunk] = []
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def analyze(self, chunk: str) -> str:
+        """Analyze one chunk, possibly sharing the call with other events"""
+        tokens = self.prompt_builder._estimate_tokens(chunk)
+        # Large chunks gain nothing from packing and would crowd out small ones
+        if tokens * 2 > self.token_budget:
+            self.chunks += 1
+            return await self._analyze_single(chunk)
+
+        ledger = current_ledger()
+        # The budget is checked now; the call happens later, outside this event's context
+        reserved = ledger.reserve('analysis', tokens, ModelConfig.ANALYSIS_MAX_TOKENS) if ledger is not None else 0
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if self._pending and self._pending_tokens + tokens > self.token_budget:
+            self._flush()
+
+        self._pending.append(PendingChunk(content=chunk, tokens=tokens, future=future, ledger=ledger, reserved=reserved))
+        self._pending_tokens += tokens
+        if len(self._pending) >= self.max_sections:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_linger, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_tokens = self._pending, [], 0
+        if not batch:
+            return
+        task = asyncio.create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _analyze_single(self, chunk: str) -> str:
+        self.calls += 1
+        response = await create_message(
+            self.anthropic_client,
+            stage='analysis',
+            settings=self.llm_settings,
+            model=ModelConfig.MODEL,
+            max_tokens=ModelConfig.ANALYSIS_MAX_TOKENS,
+            temperature=ModelConfig.TEMPERATURE,
+            system=self.prompt_builder._system_message,
+            messages=[self.prompt_builder.create_analysis_message(chunk)]
+        )
+        return extract_text_from_response(response)
+
+    async def _resolve_single(self, pending: PendingChunk) -> None:
+        # A call of its own is reserved and charged as usual, under the event's ledger
+        _release(pending)
+        try:
+            with track_usage(pending.ledger):
+                result = await self._analyze_single(pending.content)
+        except Exception as e:
+            _settle(pending.future, error=e)
+        else:
+            _settle(pending.future, result=result)
+
+    async def _run_batch(self, batch: List[PendingChunk]) -> None:
+        # The batch task inherits the context of whichever event flushed it
+        with track_usage(None):
+            await self._run_batch_calls(batch)
+
+    async def _run_batch_calls(self, batch: List[PendingChunk]) -> None:
+        self.chunks += len(batch)
+        if len(batch) == 1:
+            await self._resolve_single(batch[0])
+            return
+
+        try:
+            self.calls += 1
+            contents = [pending.content for pending in batch]
+            fence = batch_fence(contents)
+            message = self.prompt_builder.create_batched_analysis_message(contents, fence)
+            response = await create_message(
+                self.anthropic_client,
+                # Charged to the events' ledgers below; the stage names the call for observers
+                stage='analysis',
+                settings=self.llm_settings,
+                model=ModelConfig.MODEL,
+                max_tokens=min(
+                    ModelConfig.ANALYSIS_MAX_TOKENS * len(batch),
+                    ModelConfig.MAX_OUTPUT_TOKENS
+                ),
+                temperature=ModelConfig.TEMPERATURE,
+                system=self.prompt_builder._system_message,
+                messages=[message]
+            )
+            results: Dict[int, str] = self.prompt_builder.split_batched_analysis(
+                extract_text_from_response(response), fence
+            )
+        except Exception as e:
+            for pending in batch:
+                _release(pending)
+                _settle(pending.future, error=e)
+            return
+
+        # Each event pays for the shared call in proportion to its chunk
+        input_tokens, output_tokens = usage_tokens(response)
+        weights = [pending.tokens for pending in batch]
+        for pending, share_in, share_out in zip(batch, _shares(input_tokens, weights), _shares(output_tokens, weights)):
+            if pending.ledger is not None:
+                pending.ledger.record('analysis', share_in, share_out, pending.reserved)
+            pending.reserved = 0
+
+        missing = []
+        for i, pending in enumerate(batch, 1):
+            if results.get(i):
+                _settle(pending.future, result=results[i])
+            else:
+                missing.append(pending)
+
+        if missing:
+            logger.warning(f"Batched analysis missed {len(missing)} of {len(batch)} sections, retrying individually")
+            await asyncio.gather(*(self._resolve_single(pending) for pending in missing))
@@ -0,0 +1,139 @@
+import re
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Stutter removal also merges deliberate repeats ("very very", "bye bye"), so it is opt-in
+DEFAULT_STEPS = ('json_header', 'timestamps', 'speaker_tags', 'fillers', 'whitespace')
+DEFAULT_FILLERS = ('um', 'umm', 'uh', 'uhh', 'erm', 'er', 'ah', 'hmm', 'mhm', 'mm')
+
+_TIME = r'\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d{1,3})?'
+_TIME_RANGE = rf'{_TIME}(?:[ \t]*-->[ \t]*{_TIME})?'
+# Bracketed anywhere, bare only at the start of a line, so times in speech stay
+_TIMESTAMP = re.compile(
+    rf'[\[(]{_TIME_RANGE}[\])]|^[ \t]*{_TIME_RANGE}(?=\s|$)',
+    re.MULTILINE
+)
+_SPEAKER_TAG = re.compile(
+    r'^[ \t]*[\[(]?(?P<name>SPEAKER[_ ]?\d+|Speaker \d+|[A-Z][a-z]+(?: [A-Z][a-z]+){0,2})[\])]?:[ \t]*',
+    re.MULTILINE
+)
+_STUTTER = re.compile(r"\b(\w+)(?:-?[ \t]*,?[ \t]+\1\b)+", re.IGNORECASE)
+_INLINE_SPACE = re.compile(r'[ \t]+')
+_TRAILING_SPACE = re.compile(r'[ \t]+$', re.MULTILINE)
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+@dataclass
+class NormalizationReport:
+    bytes_in: int = 0
+    bytes_out: int = 0
+    tokens_in: int = 0
+    tokens_out: int = 0
+    seconds: float = 0.0
+
+    def add(self, other: 'NormalizationReport') -> None:
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        self.tokens_in += other.tokens_in
+        self.tokens_out += other.tokens_out
+        self.seconds += other.seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        report = asdict(self)
+        report['seconds'] = round(self.seconds, 4)
+        report['bytes_saved'] = self.bytes_in - self.bytes_out
+        report['tokens_saved'] = self.tokens_in - self.tokens_out
+        return report
+
+def _is_json(line: str) -> bool:
+    try:
+        return isinstance(json.loads(line), (dict, list))
+    except ValueError:
+        return False
+
+def strip_json_header(text: str) -> str:
+    """Drop leading JSON metadata lines written by the transcriber"""
+    lines = text.strip().split('\n')
+    for i, line in enumerate(lines):
+        if line.strip() and not _is_json(line):
+            return '\n'.join(lines[i:])
+    return text
+
+def strip_timestamps(text: str) -> str:
+    return _TIMESTAMP.sub('', text)
+
+def collapse_speaker_tags(text: str) -> str:
+    """
+    Keep a speaker tag only where the speaker changes. Only names tagged at
+    least twice count as speakers, so a one-off "Note:" or "Example:" stays.
+    """
+    counts = Counter(match.group('name') for match in _SPEAKER_TAG.finditer(text))
+    last_speaker = None
+
+    def replace(match: re.Match) -> str:
+        nonlocal last_speaker
+        name = match.group('name')
+        if counts[name] < 2:
+            return match.group(0)
+        if name == last_speaker:
+            return ''
+        last_speaker = name
+        return f"{name}: "
+
+    return _SPEAKER_TAG.sub(replace, text)
+
+def strip_stutters(text: str) -> str:
+    return _STUTTER.sub(r'\1', text)
+
+def collapse_whitespace(text: str) -> str:
+    """Collapse runs of spaces while keeping paragraph breaks for chunking"""
+    text = _INLINE_SPACE.sub(' ', text)
+    text = _TRAILING_SPACE.sub('', text)
+    return _BLANK_LINES.sub('\n\n', text).strip()
+
+class TranscriptNormalizer:
+    """
+    Configurable cleanup of raw transcripts before chunking. Each step is a
+    single compiled-regex pass, so the whole pipeline runs at several MB/s.
+    """
+    def __init__(
+        self,
+        steps: Optional[Iterable[str]] = None,
+        fillers: Iterable[str] = DEFAULT_FILLERS
+    ):
+        fillers_pattern = re.compile(
+            r'\b(?:' + '|'.join(re.escape(f) for f in fillers) + r')\b[,.]?[ \t]*',
+            re.IGNORECASE
+        )
+        available: Dict[str, Callable[[str], str]] = {
+            'json_header': strip_json_header,
+            'timestamps': strip_timestamps,
+            'speaker_tags': collapse_speaker_tags,
+            'fillers': lambda text: fillers_pattern.sub('', text),
+            'stutters': strip_stutters,
+            'whitespace': collapse_whitespace,
+        }
+        self.steps: List[str] = list(DEFAULT_STEPS if steps is None else steps)
+        unknown = [s for s in self.steps if s not in available]
+        if unknown:
+            raise ValueError(f"Unknown normalization steps: {', '.join(unknown)}")
+        # Run in the canonical order regardless of how they were listed
+        self._pipeline = [step for name, step in available.items() if name in self.steps]
+
+    def _estimate_tokens(self, text: str) -> int:
+        return len(text) // 4
+
+    def normalize(self, text: str) -> Tuple[str, NormalizationReport]:
+        started = time.perf_counter()
+        result = text
+        for step in self._pipeline:
+            result = step(result)
+        return result, NormalizationReport(
+            bytes_in=len(text.encode('utf-8')),
+            bytes_out=len(result.encode('utf-8')),
+            tokens_in=self._estimate_tokens(text),
+            tokens_out=self._estimate_tokens(result),
+            seconds=time.perf_counter() - started
+        )
@@ -0,0 +1,186 @@
+import math
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from domain.constants import ModelConfig, ServiceConfig
+
+logger = logging.getLogger(__name__)
+
+SINGLE_SHOT = "single_shot"
+MAP_REDUCE = "map_reduce"
+TREE_REDUCE = "tree_reduce"
+
+# Instructions, system message and section framing sent along with the content
+PROMPT_OVERHEAD_TOKENS = 1000
+
+@dataclass
+class LatencyModel:
+    """
+    Expected wall time of one LLM call: a fixed overhead plus prefill and
+    decode time. Output sizes are typical lengths rather than the max_tokens
+    caps, which responses rarely reach.
+    """
+    overhead_seconds: float = 1.5
+    input_tokens_per_second: float = 4000.0
+    output_tokens_per_second: float = 50.0
+    analysis_output_tokens: int = 1500
+    guide_output_tokens: int = 3000
+    merge_output_tokens: int = 1500
+
+    def call(self, input_tokens: int, output_tokens: int) -> float:
+        return (
+            self.overhead_seconds
+            + input_tokens / self.input_tokens_per_second
+            + output_tokens / self.output_tokens_per_second
+        )
+
+@dataclass
+class PipelinePlan:
+    strategy: str
+    content_tokens: int
+    chunks: int
+    calls: int
+    # Map-reduce and tree-reduce: analysis calls in flight at once
+    parallelism: int
+    # Tree-reduce: analyses condensed by one merge call
+    fan_in: int
+    predicted_seconds: float
+    alternatives: Dict[str, float] = field(default_factory=dict)
+    # False when the practical guide is skipped to meet a deadline
+    with_guide: bool = True
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'strategy': self.strategy,
+            'content_tokens': self.content_tokens,
+            'chunks': self.chunks,
+            'calls': self.calls,
+            'predicted_seconds': round(self.predicted_seconds, 1),
+        }
+
+class PipelinePlanner:
+    """
+    Picks how an event is summarized before any LLM call is made.
+
+    single_shot  one call analyses the whole content and writes the guide
+    map_reduce   one analysis call per chunk, then one guide call over all analyses
+    tree_reduce  as map_reduce, but analyses are merged in groups of `fan_in`
+                 until the guide input fits the context window
+
+    Each feasible strategy is costed with the latency model and the fastest one
+    wins. Observed run times scale later predictions per strategy, so the
+    model tracks the real API instead of the defaults.
+    """
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        context_tokens: int = ModelConfig.CONTEXT_TOKENS,
+        max_output_tokens: int = ModelConfig.MAX_OUTPUT_TOKENS,
+        parallelism: int = ServiceConfig.ANALYSIS_PARALLELISM,
+        fan_in: int = ServiceConfig.MERGE_FAN_IN,
+        smoothing: float = 0.2
+    ):
+        self.latency = latency or LatencyModel()
+        self.context_tokens = context_tokens
+        self.max_output_tokens = max_output_tokens
+        self.parallelism = max(1, parallelism)
+        self.fan_in = max(2, fan_in)
+        self.smoothing = smoothing
+        self.corrections: Dict[str, float] = {SINGLE_SHOT: 1.0, MAP_REDUCE: 1.0, TREE_REDUCE: 1.0}
+
+    def _fits(self, input_tokens: int, output_tokens: int) -> bool:
+        return input_tokens + PROMPT_OVERHEAD_TOKENS + output_tokens <= self.context_tokens
+
+    def _single_shot(self, content_tokens: int, with_guide: bool = True) -> Optional[float]:
+        output = self.latency.analysis_output_tokens + (self.latency.guide_output_tokens if with_guide else 0)
+        if output > self.max_output_tokens or not self._fits(content_tokens, ModelConfig.MAX_OUTPUT_TOKENS):
+            return None
+        return self.latency.call(content_tokens + PROMPT_OVERHEAD_TOKENS, output)
+
+    def _map(self, chunk_tokens: List[int]) -> float:
+        waves = math.ceil(len(chunk_tokens) / self.parallelism)
+        # Calls in a wave finish with the largest chunk of the wave
+        ordered = sorted(chunk_tokens, reverse=True)
+        return sum(
+            self.latency.call(ordered[i * self.parallelism] + PROMPT_OVERHEAD_TOKENS, self.latency.analysis_output_tokens)
+            for i in range(waves)
+        )
+
+    def guide_seconds(self, analyses: int) -> float:
+        """Expected time of the guide call over a number of analyses"""
+        return self._guide(min(analyses, self.fan_in)) * self.corrections[MAP_REDUCE]
+
+    def _guide(self, analyses: int) -> float:
+        return self.latency.call(
+            analyses * self.latency.analysis_output_tokens + PROMPT_OVERHEAD_TOKENS,
+            self.latency.guide_output_tokens
+        )
+
+    def _guide_fits(self, analyses: int) -> bool:
+        return self._fits(analyses * self.latency.analysis_output_tokens, ModelConfig.GUIDE_MAX_TOKENS)
+
+    def merge_levels(self, analyses: int) -> List[int]:
+        """Merge calls per level until at most `fan_in` analyses remain"""
+        levels = []
+        while analyses > self.fan_in:
+            analyses = math.ceil(analyses / self.fan_in)
+            levels.append(analyses)
+        return levels
+
+    def _tree_reduce(self, chunk_tokens: List[int]) -> float:
+        seconds = self._map(chunk_tokens)
+        merge_input = self.fan_in * self.latency.analysis_output_tokens + PROMPT_OVERHEAD_TOKENS
+        for calls in self.merge_levels(len(chunk_tokens)):
+            seconds += math.ceil(calls / self.parallelism) * self.latency.call(merge_input, self.latency.merge_output_tokens)
+        return seconds + self._guide(min(len(chunk_tokens), self.fan_in))
+
+    def plan(self, chunk_tokens: List[int], with_guide: bool = True, speedup: float = 1.0) -> PipelinePlan:
+        """
+        Choose a strategy for content split into chunks of the given token counts.
+        `speedup` scales predictions for a faster model than the latency model's.
+        """
+        content_tokens = sum(chunk_tokens)
+        chunks = len(chunk_tokens)
+        options: Dict[str, float] = {}
+
+        single = self._single_shot(content_tokens, with_guide)
+        if single is not None:
+            options[SINGLE_SHOT] = single * self.corrections[SINGLE_SHOT] / speedup
+        if not with_guide:
+            options[MAP_REDUCE] = self._map(chunk_tokens) * self.corrections[MAP_REDUCE] / speedup
+        elif self._guide_fits(chunks):
+            options[MAP_REDUCE] = (self._map(chunk_tokens) + self._guide(chunks)) * self.corrections[MAP_REDUCE] / speedup
+        if with_guide and chunks > self.fan_in:
+            options[TREE_REDUCE] = self._tree_reduce(chunk_tokens) * self.corrections[TREE_REDUCE] / speedup
+
+        # Nothing fits in theory: tree-reduce keeps every call bounded
+        strategy = min(options, key=options.get) if options else TREE_REDUCE
+        calls = {
+            SINGLE_SHOT: 1,
+            MAP_REDUCE: chunks + int(with_guide),
+            TREE_REDUCE: chunks + sum(self.merge_levels(chunks)) + 1,
+        }[strategy]
+        return PipelinePlan(
+            strategy=strategy,
+            content_tokens=content_tokens,
+            chunks=chunks,
+            calls=calls,
+            parallelism=self.parallelism,
+            fan_in=self.fan_in,
+            predicted_seconds=options.get(strategy, self._tree_reduce(chunk_tokens)),
+            alternatives={name: round(seconds, 1) for name, seconds in options.items()},
+            with_guide=with_guide
+        )
+
+    def observe(self, plan: PipelinePlan, actual_seconds: float) -> None:
+        """Log predicted vs actual time and fold the error into later predictions"""
+        logger.info(
+            f"Plan {plan.strategy} for {plan.content_tokens} tokens in {plan.chunks} chunks: "
+            f"predicted {plan.predicted_seconds:.1f}s, actual {actual_seconds:.1f}s"
+        )
+        if plan.predicted_seconds <= 0 or actual_seconds <= 0:
+            return
+        # Predictions already include the correction, so scale it by the remaining error
+        ratio = actual_seconds / plan.predicted_seconds
+        current = self.corrections[plan.strategy]
+        self.corrections[plan.strategy] = current * (1 - self.smoothing + self.smoothing * ratio)
@@ -0,0 +1,207 @@
+import re
+import secrets
+from typing import Dict, List
+from domain.types import ClaudeMessage
+
+def extract_text_from_response(response) -> str:
+    """Extract text from Claude API response"""
+    if not hasattr(response, 'content') or not response.content:
+        raise ValueError("Empty response from Claude API")
+    
+    # The content is a list of content blocks
+    for content_block in response.content:
+        # Content block is already an object with text attribute
+        if hasattr(content_block, 'text'):
+            return content_block.text.strip()
+    
+    raise ValueError("No valid text content in Claude API response")
+
+def batch_fence(chunks: List[str]) -> str:
+    """Random tag suffix for a batched request that none of its chunks contains"""
+    while True:
+        fence = secrets.token_hex(4)
+        if not any(fence in chunk for chunk in chunks):
+            return fence
+
+_SINGLE_SHOT_BLOCK = re.compile(r'<(analysis|guide)>(.*?)</\1>', re.DOTALL)
+
+class KnowledgeExtractorPromptBuilder:
+    def __init__(self):
+        self._system_message = """You are an expert at extracting and structuring knowledge into universal, actionable frameworks.
+        Focus on principles and methodologies that can be applied."""
+
+        self._analysis_prompt = """Analyze this content section and create a structured knowledge framework.
+        For each major concept:
+
+        1. Core Definition
+           - What it means in principle
+           - How to recognize it
+           - Why it matters
+
+        2. Universal Application
+           - General principles
+           - Domain-agnostic methodologies
+           - Adaptation guidelines
+
+        3. Implementation Framework
+           - Detection/Assessment methods
+           - Step-by-step approach
+           - Progress measurement
+           - Common pitfalls
+
+        4. Integration Guide
+           - How it connects with other concepts
+           - Prerequisites if any
+           - Next steps
+
+        Format in Markdown with clear hierarchical structure.
+        Focus on creating a framework that could be applied."""
+        self._practical_guide_prompt = """Create an implementation guide based on the analyzed concepts.
+
+        Structure your response as follows:
+
+        # Implementation Framework
+
+        ## 1. Assessment Phase
+        - How to evaluate current state
+        - Framework for identifying gaps
+        - Measurement criteria
+
+        ## 2. Preparation Phase
+        - Universal setup steps
+        - Resource requirements
+        - Prerequisite checklist
+
+        ## 3. Implementation Phase
+        - Step-by-step methodology
+        - Progress tracking methods
+        - Adjustment triggers
+
+        ## 4. Evaluation & Iteration
+        - Success criteria
+        - Measurement framework
+        - Iteration protocol
+
+        For each section:
+        - Provide clear, actionable steps
+        - Include verification methods
+        - List potential obstacles and solutions
+        - Define success criteria
+
+        Keep all guidance applicable."""
+
+    def _estimate_tokens(self, text: str) -> int:
+        return len(text) // 4
+
+    def _chunk_content(self, content: str, max_tokens: int = 4000) -> List[str]:
+        paragraphs = content.split('\n\n')
+        chunks = []
+        current_chunk = []
+        current_tokens = 0
+        
+        for para in paragraphs:
+            para_tokens = self._estimate_tokens(para)
+            if current_tokens + para_tokens > max_tokens and current_chunk:
+                chunks.append('\n\n'.join(current_chunk))
+                current_chunk = [para]
+                current_tokens = para_tokens
+            else:
+                current_chunk.append(para)
+                current_tokens += para_tokens
+                
+        if current_chunk:
+            chunks.append('\n\n'.join(current_chunk))
+        
+        return chunks
+
+    def create_analysis_message(self, chunk: str, index: int = 1) -> Dict[str, str]:
+        return {
+            "role": "user",
+            "content": f"Content Section {index}:\n\n{chunk}\n\n{self._analysis_prompt}"
+        }
+
+    def create_analysis_messages(self, content: str) -> List[Dict[str, str]]:
+        chunks = self._chunk_content(content)
+        messages = []
+        
+        for i, chunk in enumerate(chunks, 1):
+            messages.extend([
+                ClaudeMessage(
+                    role="user",
+                    content=f"Content Section {i}:\n\n{chunk}\n\n{self._analysis_prompt}"
+                )
+            ])
+        
+        return [{"role": m.role, "content": m.content} for m in messages]
+
+    def create_batched_analysis_message(self, chunks: List[str], fence: str) -> Dict[str, str]:
+        """
+        Pack unrelated chunks into one request with id-tagged sections. The tag
+        names carry `fence` (see batch_fence), so tags quoted in a transcript
+        neither close a section nor split the response.
+        """
+        sections = "\n\n".join(
+            f'<section-{fence} id="{i}">\n{chunk}\n</section-{fence}>'
+            for i, chunk in enumerate(chunks, 1)
+        )
+        return {
+            "role": "user",
+            "content": f"""The following {len(chunks)} content sections are unrelated to each other. Analyze each section independently.
+
+{sections}
+
+{self._analysis_prompt}
+
+Write one analysis per section and wrap each one in <analysis-{fence} id="N">...</analysis-{fence}> tags, where N is the id of its section.
+Do not write anything outside these tags."""
+        }
+
+    def split_batched_analysis(self, text: str, fence: str) -> Dict[int, str]:
+        """Map section ids to their analyses in a batched response"""
+        block = re.compile(rf'<analysis-{re.escape(fence)} id="(\d+)">(.*?)</analysis-{re.escape(fence)}>', re.DOTALL)
+        return {
+            int(match.group(1)): match.group(2).strip()
+            for match in block.finditer(text)
+        }
+
+    def create_single_shot_message(self, content: str) -> Dict[str, str]:
+        """Ask for the analysis and the practical guide in one response"""
+        return {
+            "role": "user",
+            "content": f"""Content:
+
+{content}
+
+First, analyze the whole content:
+{self._analysis_prompt}
+
+Then, based on that analysis:
+{self._practical_guide_prompt}
+
+Wrap the analysis in <analysis>...</analysis> tags and the guide in <guide>...</guide> tags."""
+        }
+
+    def split_single_shot(self, text: str) -> Dict[str, str]:
+        """Map 'analysis' and 'guide' to their parts of a single-shot response"""
+        return {match.group(1): match.group(2).strip() for match in _SINGLE_SHOT_BLOCK.finditer(text)}
+
+    def create_merge_message(self, analyses: List[str]) -> Dict[str, str]:
+        """Condense several analyses into one, for guides over very long content"""
+        combined = "\n\n---\n\n".join(f"Analysis {i}:\n{analysis}" for i, analysis in enumerate(analyses, 1))
+        return {
+            "role": "user",
+            "content": f"""Merge these analyses of consecutive content sections into one structured knowledge framework.
+Keep every distinct concept, method and pitfall; drop repetition.
+
+{combined}
+
+{self._analysis_prompt}"""
+        }
+
+    def create_practical_guide_message(self, analyses: List[str]) -> Dict[str, str]:
+        combined_analyses = "\n\n---\n\n".join(f"Analysis {i+1}:\n{analysis}" 
+                                             for i, analysis in enumerate(analyses))
+        return {
+            "role": "user",
+            "content": f"Based on these analyses:\n\n{combined_analyses}\n\n{self._practical_guide_prompt}"
+        }
@@ -0,0 +1,10 @@
+import asyncio
+from typing import Any
+from infra.core_types import FileStorage
+
+async def estimate_event_size(file_storage: FileStorage, event: Any) -> int:
+    """Total bytes of the transcriptions an event points to, from object metadata only"""
+    transcriptions = event.data if isinstance(event.data, list) else []
+    paths = [t['path'] for t in transcriptions if isinstance(t, dict) and 'path' in t]
+    stats = await asyncio.gather(*(file_storage.stat(path) for path in paths))
+    return sum(stat.size for stat in stats)
@@ -0,0 +1,80 @@
+import uuid
+import hashlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from infra.core_types import FileStorage
+
+def summary_title(titles: List[str]) -> str:
+    return (
+        titles[0] if len(titles) == 1
+        else f"Knowledge Extract of {len(titles)} transcriptions: {', '.join(titles[:3])}{'...' if len(titles) > 3 else ''}"
+    )
+
+def summary_head(all_analyses: List[str], with_guide: bool) -> Iterator[str]:
+    """The summary markdown up to the practical guide, piece by piece"""
+    yield "# Content Analysis and Implementation Guide\n\n" if with_guide else "# Content Analysis\n\n"
+    yield "## Content Overview\n"
+    yield all_analyses[0]
+    yield "  # First analysis contains ToC and key concepts\n\n" if with_guide else "\n\n"
+    yield "## Detailed Analyses\n"
+    for i, analysis in enumerate(all_analyses[1:]):
+        if i:
+            yield '---'
+        yield analysis
+    yield "  # Remaining detailed analyses\n\n## Practical Implementation Guide\n" if with_guide else "\n"
+
+def summary_guide(practical_guide: Optional[str]) -> Iterator[str]:
+    if practical_guide is not None:
+        yield practical_guide
+        yield "\n"
+
+class SummaryAssembler:
+    """
+    Streams the summary markdown into an object in FileStorage instead of
+    building it in memory. The head can go out as soon as the analyses are
+    done, while the guide is still being written. finish() returns the event
+    data: the title and a reference to the object with its SHA-256 digest.
+    Nothing is stored under the path unless finish() succeeds.
+    """
+    def __init__(self, file_storage: FileStorage, path: str):
+        self.path = path
+        self.writer = file_storage.open_writer(path)
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.head_written = False
+
+    @classmethod
+    def for_event(cls, file_storage: FileStorage, prefix: str, event: Any) -> 'SummaryAssembler':
+        """
+        An object per stream, event id and attempt. Ids repeat across streams,
+        and a redelivery must not rewrite the object a published event points
+        to, whose digest would then no longer match.
+        """
+        stream = getattr(event, 'stream', None) or event.name
+        event_id = getattr(event, 'id', None) or 'event'
+        return cls(file_storage, f"{prefix}/{stream}/{event_id}-{uuid.uuid4().hex[:12]}.md")
+
+    async def _write(self, pieces: Iterable[str]) -> None:
+        for piece in pieces:
+            data = piece.encode('utf-8')
+            self.digest.update(data)
+            self.size += len(data)
+            await self.writer.write(data)
+
+    async def write_head(self, all_analyses: List[str], with_guide: bool) -> None:
+        await self._write(summary_head(all_analyses, with_guide))
+        self.head_written = True
+
+    async def finish(self, titles: List[str], all_analyses: List[str], practical_guide: Optional[str]) -> Dict[str, Any]:
+        if not self.head_written:
+            await self.write_head(all_analyses, practical_guide is not None)
+        await self._write(summary_guide(practical_guide))
+        await self.writer.close()
+        return {
+            'title': summary_title(titles),
+            'summary_path': self.path,
+            'summary_sha256': self.digest.hexdigest(),
+            'summary_bytes': self.size
+        }
+
+    async def abort(self) -> None:
+        await self.writer.abort()
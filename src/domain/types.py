@@ -1,6 +1,6 @@
 from dataclasses import dataclass
-from typing import List, Protocol, Any
-from infra.core_types import EventStore, FileStorage
+from typing import List, Protocol, Any, Optional
+from infra.core_types import EventWriter, FileStorage, CheckpointStore, ResultCache, UsageTotals
 
 @dataclass
 class TranscriptionInfo:
@@ -11,6 +11,8 @@ class TranscriptionInfo:
 class TranscriptionCreatedEvent:
     name: str
     data: List[TranscriptionInfo]
+    meta: Any = None
+    id: Optional[str] = None
 
 @dataclass
 class ClaudeMessage:
@@ -20,7 +22,19 @@ class ClaudeMessage:
 class Deps(Protocol):
     file_storage: FileStorage
     anthropic_client: Any
-    event_store: EventStore
+    event_store: Optional[EventWriter]
+    checkpoint_store: Optional[CheckpointStore]
+    analysis_batcher: Optional[Any]
+    deduplicator: Optional[Any]
+    normalizer: Optional[Any]
+    planner: Optional[Any]
+    result_cache: Optional[ResultCache]
+    compressor: Optional[Any]
+    deadline_policy: Optional[str]
+    incremental: bool
+    usage_totals: Optional[UsageTotals]
+    summary_prefix: Optional[str]
+    llm_settings: Optional[Any]
 
 @dataclass
 class Summary:
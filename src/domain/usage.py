@@ -0,0 +1,119 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+class TokenBudgetExceeded(ValueError):
+    """An LLM call could take the event past the token budget in its meta"""
+
+def parse_token_budget(meta: Any, key: str = 'token_budget') -> Optional[int]:
+    """Token budget from `meta[key]`, None when the event has none"""
+    if not isinstance(meta, dict) or meta.get(key) in (None, ''):
+        return None
+    return int(meta[key])
+
+def estimate_request_tokens(system: Optional[str], messages: Optional[List[Dict[str, Any]]]) -> int:
+    """Rough input tokens of a Messages API request, at four characters per token"""
+    chars = len(system or '')
+    for message in messages or []:
+        content = message.get('content', '')
+        if isinstance(content, str):
+            chars += len(content)
+        else:
+            chars += sum(len(block.get('text', '')) for block in content if isinstance(block, dict))
+    return chars // 4
+
+def usage_tokens(response: Any) -> Tuple[int, int]:
+    """Input and output tokens from `response.usage`, 0 where the API did not report them"""
+    usage = getattr(response, 'usage', None)
+    input_tokens = getattr(usage, 'input_tokens', None)
+    output_tokens = getattr(usage, 'output_tokens', None)
+    return (
+        input_tokens if isinstance(input_tokens, int) else 0,
+        output_tokens if isinstance(output_tokens, int) else 0
+    )
+
+@dataclass
+class StageUsage:
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {'calls': self.calls, 'input_tokens': self.input_tokens, 'output_tokens': self.output_tokens}
+
+class UsageLedger:
+    """
+    Token usage of one event per pipeline stage, and its budget. Calls reserve
+    their input estimate plus max_tokens up front, so concurrent calls of the
+    same event cannot overrun the budget together; the reservation is replaced
+    by the reported usage once the call returns.
+    """
+    def __init__(self, budget: Optional[int] = None):
+        self.budget = budget
+        self.stages: Dict[str, StageUsage] = {}
+        self.reserved = 0
+
+    @property
+    def calls(self) -> int:
+        return sum(stage.calls for stage in self.stages.values())
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(stage.input_tokens + stage.output_tokens for stage in self.stages.values())
+
+    def reserve(self, stage: str, input_tokens: int, max_tokens: int) -> int:
+        """Hold the worst-case cost of a call, or raise when it does not fit the budget"""
+        tokens = input_tokens + max_tokens
+        if self.budget is not None and self.total_tokens + self.reserved + tokens > self.budget:
+            raise TokenBudgetExceeded(
+                f"{stage} call of up to {tokens} tokens exceeds the token budget: "
+                f"{self.total_tokens} used and {self.reserved} reserved of {self.budget}"
+            )
+        self.reserved += tokens
+        return tokens
+
+    def release(self, reserved: int) -> None:
+        self.reserved -= reserved
+
+    def record(self, stage: str, input_tokens: int, output_tokens: int, reserved: int = 0) -> None:
+        self.release(reserved)
+        usage = self.stages.setdefault(stage, StageUsage())
+        usage.calls += 1
+        usage.input_tokens += input_tokens
+        usage.output_tokens += output_tokens
+
+    def counters(self) -> Dict[str, int]:
+        """Flat totals for aggregation, e.g. `input_tokens` and `analysis:input_tokens`"""
+        counters = {'events': 1, 'calls': 0, 'input_tokens': 0, 'output_tokens': 0}
+        for name, usage in self.stages.items():
+            for field, value in usage.to_dict().items():
+                counters[field] += value
+                counters[f"{name}:{field}"] = value
+        return counters
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        if not self.stages and self.budget is None:
+            return None
+        return {
+            'calls': self.calls,
+            'input_tokens': sum(stage.input_tokens for stage in self.stages.values()),
+            'output_tokens': sum(stage.output_tokens for stage in self.stages.values()),
+            'budget': self.budget,
+            'stages': {name: usage.to_dict() for name, usage in self.stages.items()}
+        }
+
+# Ledger of the event whose pipeline is running; tasks started by it inherit it
+_current_ledger: ContextVar[Optional[UsageLedger]] = ContextVar('usage_ledger', default=None)
+
+def current_ledger() -> Optional[UsageLedger]:
+    return _current_ledger.get()
+
+@contextmanager
+def track_usage(ledger: Optional[UsageLedger]) -> Iterator[Optional[UsageLedger]]:
+    """Charge LLM calls made in this context, and the tasks it starts, to `ledger`"""
+    token = _current_ledger.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _current_ledger.reset(token)
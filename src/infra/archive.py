@@ -0,0 +1,207 @@
+import gzip
+import json
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from redis.asyncio import Redis
+from infra.core_types import Event, EventWriter, FileStorage
+
+logger = logging.getLogger(__name__)
+
+def parse_stream_id(stream_id: str) -> Tuple[int, int]:
+    ms, _, seq = stream_id.partition('-')
+    return int(ms), int(seq or 0)
+
+def format_stream_id(stream_id: Tuple[int, int]) -> str:
+    return f"{stream_id[0]}-{stream_id[1]}"
+
+def partition_prefix(prefix: str, stream: str, ms: int) -> str:
+    """Hourly partition holding entries produced at `ms`"""
+    produced = datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+    return f"{prefix}/{stream}/{produced:%Y/%m/%d/%H}/"
+
+def encode_batch(entries: List[Tuple[str, Dict[str, str]]]) -> bytes:
+    """Gzipped JSON lines, one stream entry per line"""
+    lines = (json.dumps({'id': entry_id, 'fields': fields}) for entry_id, fields in entries)
+    return gzip.compress('\n'.join(lines).encode('utf-8'))
+
+def decode_batch(data: bytes) -> List[Tuple[str, Dict[str, str]]]:
+    text = gzip.decompress(bytes(data)).decode('utf-8')
+    return [(row['id'], row['fields']) for row in map(json.loads, text.splitlines()) if row]
+
+class StreamArchiver:
+    """
+    Copies stream entries that fall outside the retention window to FileStorage
+    as gzipped, hourly partitioned batches, then trims them from Redis. Entries
+    still pending or not yet delivered to a consumer group are never trimmed.
+    """
+    def __init__(
+        self,
+        redis: Redis,
+        file_storage: FileStorage,
+        streams: List[str],
+        max_age_ms: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        prefix: str = "archive",
+        batch_size: int = 1000,
+        interval: float = 60.0
+    ):
+        self.redis = redis
+        self.file_storage = file_storage
+        self.streams = streams
+        self.max_age_ms = max_age_ms
+        self.max_entries = max_entries
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.interval = interval
+        self._running = False
+
+    def _progress_key(self, stream: str) -> str:
+        return f"{self.prefix}:{stream}:archived"
+
+    async def _safe_cutoff(self, stream: str) -> Optional[Tuple[int, int]]:
+        """Newest id every consumer group is done with"""
+        try:
+            groups = await self.redis.xinfo_groups(stream)
+        except Exception as e:
+            if 'no such key' in str(e).lower():
+                return None
+            raise
+
+        cutoff: Optional[Tuple[int, int]] = None
+        for group in groups:
+            group_cutoff = parse_stream_id(group['last-delivered-id'].decode())
+            if group['pending']:
+                pending = await self.redis.xpending(stream, group['name'])
+                oldest = parse_stream_id(pending['min'].decode())
+                group_cutoff = min(group_cutoff, (oldest[0], oldest[1] - 1) if oldest[1] else (oldest[0] - 1, 2 ** 63))
+            cutoff = group_cutoff if cutoff is None else min(cutoff, group_cutoff)
+        return cutoff
+
+    async def _retention_cutoff(self, stream: str) -> Optional[Tuple[int, int]]:
+        """Newest id that retention allows to leave Redis"""
+        cutoffs = []
+        if self.max_age_ms is not None:
+            cutoffs.append((int(time.time() * 1000) - self.max_age_ms, 0))
+        if self.max_entries is not None:
+            newest = await self.redis.xrevrange(stream, count=self.max_entries + 1)
+            if len(newest) > self.max_entries:
+                cutoffs.append(parse_stream_id(newest[-1][0].decode()))
+        return max(cutoffs) if cutoffs else None
+
+    async def archive_once(self, stream: str) -> int:
+        """Archive and trim one pass worth of expired entries, returning how many were moved"""
+        cutoff = await self._retention_cutoff(stream)
+        safe = await self._safe_cutoff(stream)
+        if cutoff is None:
+            return 0
+        # Streams without consumer groups (e.g. outputs) only follow retention
+        if safe is not None:
+            cutoff = min(cutoff, safe)
+
+        last = await self.redis.get(self._progress_key(stream))
+        start = f"({last.decode()}" if last else '-'
+        archived = 0
+
+        while True:
+            entries = await self.redis.xrange(stream, min=start, max=format_stream_id(cutoff), count=self.batch_size)
+            if not entries:
+                break
+            decoded = [
+                (entry_id.decode(), {k.decode(): v.decode() for k, v in fields.items()})
+                for entry_id, fields in entries
+            ]
+
+            # One object per hourly partition touched by the batch
+            partitions: Dict[str, List[Tuple[str, Dict[str, str]]]] = {}
+            for entry in decoded:
+                partitions.setdefault(partition_prefix(self.prefix, stream, parse_stream_id(entry[0])[0]), []).append(entry)
+            await asyncio.gather(*(
+                self.file_storage.write(
+                    f"{partition}{batch[0][0]}_{batch[-1][0]}.jsonl.gz",
+                    encode_batch(batch)
+                )
+                for partition, batch in partitions.items()
+            ))
+
+            last_id = decoded[-1][0]
+            await self.redis.set(self._progress_key(stream), last_id)
+            # Everything older than the first id kept goes; MINID is inclusive of what stays
+            last_ms, last_seq = parse_stream_id(last_id)
+            await self.redis.xtrim(stream, minid=f"{last_ms}-{last_seq + 1}", approximate=False)
+            archived += len(decoded)
+            start = f"({last_id}"
+            if len(entries) < self.batch_size:
+                break
+
+        if archived:
+            logger.info(f"Archived {archived} entries from {stream}")
+        return archived
+
+    async def run(self) -> None:
+        self._running = True
+        while self._running:
+            for stream in self.streams:
+                try:
+                    await self.archive_once(stream)
+                except Exception as e:
+                    # Archival is best effort; Redis keeps the entries until the next pass
+                    logger.error(f"Failed to archive {stream}: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stop(self) -> None:
+        self._running = False
+
+class ArchiveReader:
+    """
+    Replays archived stream entries from FileStorage in id order. Ranges up to
+    `max_hourly_lists` hours list their hourly partitions; longer ones list the
+    stream's whole prefix once and filter by the ids in the object names.
+    """
+    def __init__(self, file_storage: FileStorage, prefix: str = "archive", max_hourly_lists: int = 24):
+        self.file_storage = file_storage
+        self.prefix = prefix
+        self.max_hourly_lists = max_hourly_lists
+
+    async def _objects(self, stream: str, start: Tuple[int, int], end: Tuple[int, int]) -> List[str]:
+        hour = datetime.fromtimestamp(start[0] / 1000, tz=timezone.utc).replace(minute=0, second=0, microsecond=0)
+        last_hour = datetime.fromtimestamp(min(end[0], int(time.time() * 1000)) / 1000, tz=timezone.utc)
+        if last_hour - hour < timedelta(hours=self.max_hourly_lists):
+            # A short range lists its hourly partitions only
+            listed = []
+            while hour <= last_hour:
+                listed += await self.file_storage.list(partition_prefix(self.prefix, stream, int(hour.timestamp() * 1000)))
+                hour += timedelta(hours=1)
+        else:
+            listed = await self.file_storage.list(f"{self.prefix}/{stream}/")
+        paths = []
+        for path in listed:
+            first, _, last = path.rsplit('/', 1)[-1].removesuffix('.jsonl.gz').partition('_')
+            if parse_stream_id(last) >= start and parse_stream_id(first) <= end:
+                paths.append(path)
+        return sorted(paths, key=lambda p: parse_stream_id(p.rsplit('/', 1)[-1].partition('_')[0]))
+
+    async def replay(self, stream: str, start_id: str = '0-0', end_id: Optional[str] = None) -> AsyncIterator[Event]:
+        """Yield archived events with start_id <= id <= end_id"""
+        start = parse_stream_id(start_id)
+        end = parse_stream_id(end_id) if end_id else (int(time.time() * 1000), 2 ** 63)
+        for path in await self._objects(stream, start, end):
+            for entry_id, fields in decode_batch(await self.file_storage.read(path)):
+                if start <= parse_stream_id(entry_id) <= end:
+                    yield Event(
+                        id=entry_id,
+                        name=fields['name'],
+                        data=json.loads(fields['data']),
+                        meta=json.loads(fields['meta']) if 'meta' in fields else None,
+                        timestamp=fields.get('timestamp')
+                    )
+
+    async def republish(self, event_store: EventWriter, stream: str, start_id: str = '0-0', end_id: Optional[str] = None) -> int:
+        """Write archived events back through an event store, returning how many were sent"""
+        count = 0
+        async for event in self.replay(stream, start_id, end_id):
+            await event_store.write_event(event)
+            count += 1
+        return count
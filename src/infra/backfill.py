@@ -0,0 +1,239 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from redis.asyncio import Redis
+from infra.core_types import Event, EventWriter, TenantAccounting
+from infra.redis import decode_event, encode_event
+from infra.sharding import ShardRouter, is_cluster
+
+logger = logging.getLogger(__name__)
+
+def parse_bound(value: Optional[str], default: str) -> str:
+    """
+    XRANGE bound from a stream id, epoch milliseconds or an ISO 8601 time.
+    Ids without a sequence cover the whole millisecond at either end.
+    """
+    if not value:
+        return default
+    if value in ('-', '+') or value.replace('-', '', 1).isdigit():
+        return value
+    try:
+        return str(int(datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp() * 1000))
+    except ValueError:
+        raise ValueError(f"Not a stream id or ISO 8601 time: {value}")
+
+async def read_range(redis: Redis, stream: str, start: str, end: str, page_size: int = 100) -> AsyncIterator[List[Event]]:
+    """Pages of events with start <= id <= end, oldest first; a start of '(id' excludes id"""
+    while True:
+        entries = await redis.xrange(stream, min=start, max=end, count=page_size)
+        if not entries:
+            return
+        yield [decode_event(message_id, data) for message_id, data in entries]
+        if len(entries) < page_size:
+            return
+        start = f"({entries[-1][0].decode()}"
+
+class Watermark:
+    """
+    Highest id below which every dispatched event has finished. Events finish
+    out of order under concurrency, so progress may only be saved up to the
+    oldest one still running.
+    """
+    def __init__(self):
+        self._dispatched: Deque[str] = deque()
+        self._finished: Set[str] = set()
+
+    def dispatch(self, event_id: str) -> None:
+        self._dispatched.append(event_id)
+
+    def finish(self, event_id: str) -> Optional[str]:
+        """Mark an event done and return the new watermark when it moved"""
+        self._finished.add(event_id)
+        advanced = None
+        while self._dispatched and self._dispatched[0] in self._finished:
+            advanced = self._dispatched.popleft()
+            self._finished.discard(advanced)
+        return advanced
+
+class BackfillProgress:
+    """
+    Checkpoint of a named backfill in a Redis hash: the range, the last id
+    below which everything was handled, and counters. A sharded stream has a
+    last id per shard stream, under `last_id:<shard stream>`. Failed event ids
+    are kept in `<key>:failed` with their error; the name is the hash tag of both.
+    """
+    def __init__(self, redis: Redis, name: str, prefix: str = "summarizer:backfill"):
+        self.redis = redis
+        self.name = name
+        self.key = f"{prefix}:{{{name}}}"
+        self.failed_key = f"{self.key}:failed"
+
+    async def load(self) -> Dict[str, str]:
+        raw = await self.redis.hgetall(self.key)
+        return {k.decode(): v.decode() for k, v in raw.items()}
+
+    async def begin(self, stream: str, start: str, end: str, output: str) -> None:
+        await self.redis.hset(self.key, mapping={
+            'stream': stream, 'start': start, 'end': end, 'output': output, 'started_at': time.time()
+        })
+
+    @staticmethod
+    def last_id_field(shard: Optional[str] = None) -> str:
+        return f"last_id:{shard}" if shard else 'last_id'
+
+    async def record(
+        self,
+        processed: int = 0,
+        failed: int = 0,
+        last_id: Optional[str] = None,
+        shard: Optional[str] = None
+    ) -> None:
+        async with self.redis.pipeline(transaction=not is_cluster(self.redis)) as pipe:
+            if processed:
+                pipe.hincrby(self.key, 'processed', processed)
+            if failed:
+                pipe.hincrby(self.key, 'failed', failed)
+            if last_id is not None:
+                pipe.hset(self.key, self.last_id_field(shard), last_id)
+            await pipe.execute()
+
+    async def fail(self, event_id: str, error: Exception) -> None:
+        await self.redis.hset(self.failed_key, event_id, f"{type(error).__name__}: {error}")
+
+    async def failures(self) -> Dict[str, str]:
+        raw = await self.redis.hgetall(self.failed_key)
+        return {k.decode(): v.decode() for k, v in raw.items()}
+
+    async def finish(self) -> None:
+        await self.redis.hset(self.key, 'finished_at', time.time())
+
+    async def reset(self) -> None:
+        await self.redis.delete(self.key, self.failed_key)
+
+class StreamOutput(EventWriter):
+    """Writes every event to one fixed stream, whatever its name, for example a backfill's output stream"""
+    def __init__(self, redis: Redis, stream: str, maxlen: Optional[int] = None):
+        self.redis = redis
+        self.stream = stream
+        self.maxlen = maxlen
+
+    async def write_event(self, event: Event) -> str:
+        trim = {'maxlen': self.maxlen, 'approximate': True} if self.maxlen is not None else {}
+        message_id = await self.redis.xadd(self.stream, encode_event(event), **trim)
+        return message_id.decode()
+
+class Backfill:
+    """
+    Reprocesses a range of a stream through `handler`, outside the consumer
+    group, so the live consumers and their pending lists are untouched.
+
+    At most `concurrency` events run at once in this process, and each one
+    must first get a lease from `accounting` under `budget_key`. Accounting
+    shared in Redis caps the concurrency and tokens per minute of every
+    backfill using the same key, separately from live tenants. Progress is
+    checkpointed up to the watermark after each event, so an interrupted run
+    resumes where it stopped; events finished beyond the watermark are handled
+    again on resume.
+
+    With a `router`, the stream is read shard by shard, each shard stream on
+    the client that holds it, and every shard is checkpointed on its own.
+    """
+    def __init__(
+        self,
+        redis: Redis,
+        progress: BackfillProgress,
+        handler: Callable[[Event], Awaitable[Any]],
+        concurrency: int = 2,
+        accounting: Optional[TenantAccounting] = None,
+        budget_key: str = "backfill",
+        size_estimator: Optional[Callable[[Event], Awaitable[int]]] = None,
+        page_size: int = 100,
+        retry_wait: float = 1.0,
+        router: Optional[ShardRouter] = None
+    ):
+        self.redis = redis
+        self.router = router
+        self.progress = progress
+        self.handler = handler
+        self.concurrency = concurrency
+        self.accounting = accounting
+        self.budget_key = budget_key
+        self.size_estimator = size_estimator
+        self.page_size = page_size
+        self.retry_wait = retry_wait
+        self.processed = 0
+        self.failed = 0
+
+    async def _tokens(self, event: Event) -> int:
+        # Same estimate the fair scheduler charges live tenants
+        if self.size_estimator is None:
+            return 0
+        try:
+            return max(1, await self.size_estimator(event) // 4)
+        except Exception:
+            return 1
+
+    async def _acquire(self, event: Event) -> None:
+        if self.accounting is None:
+            return
+        tokens = await self._tokens(event)
+        while not await self.accounting.try_acquire(self.budget_key, event.id, tokens):
+            await asyncio.sleep(self.retry_wait)
+
+    async def _handle(self, event: Event, watermark: Watermark, slots: asyncio.Semaphore, shard: Optional[str]) -> None:
+        failed = 0
+        try:
+            await self.handler(event)
+            self.processed += 1
+        except Exception as e:
+            # A bad event is recorded and skipped; it must not stall the range
+            logger.error(f"Backfill of {event.id} failed: {e}")
+            await self.progress.fail(event.id, e)
+            self.failed += 1
+            failed = 1
+        finally:
+            if self.accounting is not None:
+                await self.accounting.release(self.budget_key, event.id)
+            slots.release()
+        await self.progress.record(processed=1 - failed, failed=failed, last_id=watermark.finish(event.id), shard=shard)
+
+    def _streams(self, stream: str) -> List[Tuple[str, Redis, Optional[str]]]:
+        """Physical streams to read, the client holding each, and its checkpoint shard"""
+        if self.router is None or stream not in self.router.sharded:
+            return [(stream, self.redis, None)]
+        return [(physical, self.router.client(physical), physical) for physical in self.router.streams(stream)]
+
+    async def run(self, stream: str, start: str = '-', end: str = '+', output: str = '') -> int:
+        """Handle every event of the range not yet checkpointed and return how many were handled"""
+        state = await self.progress.load()
+        if state:
+            # Resume over the range of the original run, after its checkpoints
+            stream, start, end = state['stream'], state['start'], state['end']
+            logger.info(f"Resuming backfill {self.progress.name} of {stream}")
+        else:
+            await self.progress.begin(stream, start, end, output)
+
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks: Set[asyncio.Task] = set()
+        for physical, redis, shard in self._streams(stream):
+            last_id = state.get(self.progress.last_id_field(shard))
+            watermark = Watermark()
+            async for page in read_range(redis, physical, f"({last_id}" if last_id else start, end, self.page_size):
+                for event in page:
+                    await slots.acquire()
+                    try:
+                        await self._acquire(event)
+                    except BaseException:
+                        slots.release()
+                        raise
+                    watermark.dispatch(event.id)
+                    task = asyncio.create_task(self._handle(event, watermark, slots, shard))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        await self.progress.finish()
+        return self.processed + self.failed
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Protocol, Any, Optional
+from typing import Protocol, Any, Optional, Dict, List
 from typing_extensions import Callable
 
 @dataclass
@@ -10,10 +10,50 @@ class Event:
     meta: Any
     timestamp: Optional[str] = None
 
+class EventDropped(Exception):
+    """Raised by a handler to acknowledge an event unhandled: it is neither retried nor dead-lettered"""
+
+@dataclass
+class ObjectStat:
+    size: int
+    etag: Optional[str] = None
+
+class ObjectWriter(Protocol):
+    """An object written in pieces; it appears at its path on close() and not at all after abort()"""
+    async def write(self, data: bytes) -> None: ...
+    async def close(self) -> None: ...
+    async def abort(self) -> None: ...
+
 class FileStorage(Protocol):
     async def read(self, path: str) -> bytes: ...
     async def write(self, path: str, data: bytes) -> None: ...
+    def open_writer(self, path: str) -> ObjectWriter: ...
+    async def stat(self, path: str) -> ObjectStat: ...
+    async def list(self, prefix: str) -> List[str]: ...
+    async def ping(self) -> None: ...
 
-class EventStore(Protocol):
+class EventWriter(Protocol):
     async def write_event(self, data: Event) -> str: ...
+
+class EventStore(EventWriter, Protocol):
     async def process_events(self, handler: Callable) -> None: ...
+
+class CheckpointStore(Protocol):
+    async def load(self, key: str) -> Dict[str, str]: ...
+    async def save(self, key: str, step: str, value: str) -> None: ...
+    async def complete(self, key: str) -> None: ...
+
+class BoilerplateIndex(Protocol):
+    async def signatures(self) -> List[bytes]: ...
+    async def add(self, signature: bytes) -> None: ...
+
+class TenantAccounting(Protocol):
+    async def try_acquire(self, tenant: str, lease_id: str, tokens: int) -> bool: ...
+    async def release(self, tenant: str, lease_id: str) -> None: ...
+
+class UsageTotals(Protocol):
+    def add(self, tenant: str, counters: Dict[str, int]) -> None: ...
+
+class ResultCache(Protocol):
+    async def get(self, key: str) -> Optional[str]: ...
+    async def put(self, key: str, value: str) -> None: ...
@@ -0,0 +1,147 @@
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple, Type
+from redis.asyncio import Redis
+from infra.sharding import is_cluster
+
+# Client errors that are still worth retrying: timeout, conflict, rate limit
+RETRYABLE_STATUS = {408, 409, 429}
+
+def dlq_stream(stream: str) -> str:
+    return f"{stream}:dlq"
+
+def retry_key(stream: str, group: str) -> str:
+    return f"{stream}:{group}:retry"
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How failed events are retried before being moved to the dead-letter stream.
+    Bad payloads (decode and validation errors) and rejected API requests are
+    fatal and dead-lettered at once; anything else is retried with exponential
+    backoff up to `max_attempts` deliveries.
+    """
+    max_attempts: int = 5
+    base_delay_ms: int = 5000
+    max_delay_ms: int = 5 * 60 * 1000
+    fatal_errors: Tuple[Type[BaseException], ...] = field(default=(ValueError, LookupError, TypeError))
+
+    def is_retryable(self, error: BaseException) -> bool:
+        if isinstance(error, self.fatal_errors):
+            return False
+        status = getattr(error, 'status_code', None)
+        if isinstance(status, int) and 400 <= status < 500 and status not in RETRYABLE_STATUS:
+            return False
+        return True
+
+    def delay_ms(self, attempts: int) -> int:
+        """Backoff before the next delivery after `attempts` failed ones"""
+        return min(self.max_delay_ms, self.base_delay_ms * 2 ** max(0, attempts - 1))
+
+def dead_letter_fields(
+    fields: Dict[bytes, bytes],
+    stream: str,
+    message_id: str,
+    error: BaseException,
+    attempts: int,
+    consumer: str
+) -> Dict[Any, Any]:
+    """Original entry fields plus the context needed to inspect and redrive it"""
+    return {
+        **fields,
+        'dlq_source_stream': stream,
+        'dlq_source_id': message_id,
+        'dlq_error_type': type(error).__name__,
+        'dlq_error': str(error)[:2000],
+        'dlq_attempts': attempts,
+        'dlq_consumer': consumer,
+        'dlq_failed_at': datetime.now(timezone.utc).isoformat()
+    }
+
+@dataclass
+class DeadLetter:
+    id: str
+    source_stream: str
+    source_id: str
+    error_type: str
+    error: str
+    attempts: int
+    failed_at: str
+    fields: Dict[str, str]
+
+class DeadLetterQueue:
+    """Inspect, redrive and purge entries of a `<stream>:dlq` stream"""
+    def __init__(self, redis: Redis, stream: str):
+        self.redis = redis
+        self.stream = stream
+        self.key = dlq_stream(stream)
+
+    @staticmethod
+    def _parse(message_id: bytes, raw: Dict[bytes, bytes]) -> DeadLetter:
+        values = {k.decode(): v.decode(errors='replace') for k, v in raw.items()}
+        return DeadLetter(
+            id=message_id.decode(),
+            source_stream=values.pop('dlq_source_stream', ''),
+            source_id=values.pop('dlq_source_id', ''),
+            error_type=values.pop('dlq_error_type', ''),
+            error=values.pop('dlq_error', ''),
+            attempts=int(values.pop('dlq_attempts', 0)),
+            failed_at=values.pop('dlq_failed_at', ''),
+            fields={k: v for k, v in values.items() if not k.startswith('dlq_')}
+        )
+
+    async def size(self) -> int:
+        return await self.redis.xlen(self.key)
+
+    async def entries(
+        self,
+        count: Optional[int] = None,
+        error_type: Optional[str] = None,
+        start: str = '-'
+    ) -> List[DeadLetter]:
+        """Dead letters oldest first, optionally only those failing with one error type"""
+        letters: List[DeadLetter] = []
+        while count is None or len(letters) < count:
+            page = await self.redis.xrange(self.key, min=start, max='+', count=500)
+            if not page:
+                break
+            for message_id, raw in page:
+                letter = self._parse(message_id, raw)
+                if error_type is None or letter.error_type == error_type:
+                    letters.append(letter)
+            start = f"({page[-1][0].decode()}"
+        return letters[:count] if count is not None else letters
+
+    async def summary(self) -> Dict[str, int]:
+        """Dead letter count per error type"""
+        counts: Dict[str, int] = {}
+        for letter in await self.entries():
+            counts[letter.error_type] = counts.get(letter.error_type, 0) + 1
+        return counts
+
+    async def redrive(self, letters: List[DeadLetter], target: Optional[str] = None) -> int:
+        """Publish dead letters back to their source stream and drop them from the DLQ"""
+        # Source streams need not share a slot with the DLQ, and Cluster pipelines cannot be transactions
+        async with self.redis.pipeline(transaction=not is_cluster(self.redis)) as pipe:
+            for letter in letters:
+                pipe.xadd(target or letter.source_stream or self.stream, letter.fields)
+                pipe.xdel(self.key, letter.id)
+            await pipe.execute()
+        return len(letters)
+
+    async def purge(self, letters: List[DeadLetter]) -> int:
+        if not letters:
+            return 0
+        return await self.redis.xdel(self.key, *[letter.id for letter in letters])
+
+def format_letter(letter: DeadLetter) -> str:
+    data = letter.fields.get('data', '')
+    try:
+        title = ', '.join(item.get('title', '?') for item in json.loads(data))
+    except (ValueError, TypeError, AttributeError):
+        title = data[:60]
+    return (
+        f"{letter.id}  {letter.source_stream}/{letter.source_id}  "
+        f"attempts={letter.attempts}  {letter.error_type}: {letter.error[:120]}  [{title}]"
+    )
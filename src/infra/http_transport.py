@@ -0,0 +1,113 @@
+import logging
+import threading
+import importlib.util
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class HttpTransportConfig:
+    """
+    Connection pool and timeouts of the shared HTTP client. Timeouts are per
+    phase: `connect` to open a connection, `read` between received bytes,
+    `write` between sent bytes and `pool` to wait for a free connection.
+    """
+    max_connections: int = 20
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+    connect_timeout: float = 5.0
+    read_timeout: float = 300.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 30.0
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+class PoolMonitor:
+    """
+    Counts requests, new connections and TLS handshakes through httpcore's
+    trace extension, and reads the live pool state of an httpx.Client. A
+    steady connection count with few new connections means keep-alive works;
+    waiting requests mean the pool limit is too low for the concurrency.
+    """
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self._lock = threading.Lock()
+        self.client: Optional[httpx.Client] = None
+
+    def _trace(self, event: str, info: Dict[str, Any]) -> None:
+        # Calls come from the worker threads the synchronous SDK runs on
+        with self._lock:
+            if event == "connection.connect_tcp.complete":
+                self.connections_opened += 1
+            elif event == "connection.start_tls.complete":
+                self.tls_handshakes += 1
+
+    def on_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self.requests += 1
+        request.extensions['trace'] = self._trace
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters so far and the current connections of the pool"""
+        connections = []
+        waiting = 0
+        pool = getattr(getattr(self.client, '_transport', None), '_pool', None)
+        if pool is not None:
+            connections = list(pool.connections)
+            # Requests queued in the pool without a connection assigned yet
+            waiting = sum(1 for request in getattr(pool, '_requests', []) if request.connection is None)
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            'requests': self.requests,
+            'connections_opened': self.connections_opened,
+            'tls_handshakes': self.tls_handshakes,
+            'connections': len(connections),
+            'idle': idle,
+            'active': len(connections) - idle,
+            'waiting': waiting,
+            'max_connections': getattr(pool, '_max_connections', None)
+        }
+
+def http2_available() -> bool:
+    return importlib.util.find_spec('h2') is not None
+
+def build_http_client(
+    config: HttpTransportConfig,
+    monitor: Optional[PoolMonitor] = None,
+    **kwargs
+) -> httpx.Client:
+    """Pooled httpx.Client for SDK clients; HTTP/2 falls back to HTTP/1.1 without the h2 package"""
+    http2 = config.http2
+    if http2 and not http2_available():
+        logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+        http2 = False
+    client = httpx.Client(
+        limits=config.limits,
+        timeout=config.timeout,
+        http2=http2,
+        event_hooks={'request': [monitor.on_request]} if monitor is not None else None,
+        **kwargs
+    )
+    if monitor is not None:
+        monitor.client = client
+    return client
@@ -0,0 +1,178 @@
+import os
+import mmap
+import uuid
+import asyncio
+from pathlib import Path
+from functools import partial
+from typing import AsyncIterator, BinaryIO, List, Optional, Union
+from infra.core_types import FileStorage, ObjectStat, ObjectWriter
+
+# Writes land in a hidden sibling first and are renamed over the target
+_TEMP_SUFFIX = ".tmp"
+
+def _is_temp(path: Path) -> bool:
+    return path.name.startswith('.') and path.name.endswith(_TEMP_SUFFIX)
+
+class LocalFileStorage(FileStorage):
+    """
+    Files under a local or shared (NFS) directory.
+
+    Reads map the file and return a memoryview over the mapping, so the
+    content is paged in by the kernel instead of copied into a bytes object.
+    Writes go to a temporary file in the target directory and are renamed over
+    the target, so readers never see a partial file and existing mappings keep
+    the previous version. Set `use_mmap=False` to read into bytes instead.
+
+    Paths come from event data, so every one must resolve under `root`;
+    absolute paths and `..` escaping it are rejected with ValueError.
+    """
+    def __init__(self, root: str = ".", use_mmap: bool = True):
+        self.root = Path(root).resolve()
+        self.use_mmap = use_mmap
+
+    def _resolve(self, path: str) -> Path:
+        resolved = (self.root / path).resolve()
+        if not resolved.is_relative_to(self.root):
+            raise ValueError(f"Path escapes the storage root: {path}")
+        return resolved
+
+    def _map(self, target: Path) -> Union[memoryview, bytes]:
+        with open(target, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Empty files cannot be mapped
+                return b''
+            # The mapping outlives the descriptor and is unmapped once the last view is released
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    async def read(self, path: str) -> Union[memoryview, bytes]:
+        """Read file from local disk asynchronously"""
+        target = self._resolve(path)
+        try:
+            loop = asyncio.get_running_loop()
+            if self.use_mmap:
+                return await loop.run_in_executor(None, self._map, target)
+            return await loop.run_in_executor(None, target.read_bytes)
+        except (OSError, ValueError) as e:
+            raise Exception(f"Failed to read local file: {e}")
+
+    async def ping(self) -> None:
+        """Check the root directory is mounted and readable"""
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, os.access, self.root, os.R_OK | os.X_OK):
+            raise Exception(f"Local storage root is not accessible: {self.root}")
+
+    async def stream(self, path: str, chunk_size: int = 1 << 20) -> AsyncIterator[bytes]:
+        """Read a file in chunks of `chunk_size` bytes without holding it all in memory"""
+        loop = asyncio.get_running_loop()
+        try:
+            f = await loop.run_in_executor(None, open, self._resolve(path), 'rb')
+        except OSError as e:
+            raise Exception(f"Failed to read local file: {e}")
+        try:
+            while True:
+                chunk = await loop.run_in_executor(None, f.read, chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            f.close()
+
+    def _write_atomic(self, target: Path, data: bytes) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp = target.with_name(f".{target.name}.{uuid.uuid4().hex}{_TEMP_SUFFIX}")
+        try:
+            with open(temp, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp, target)
+        except BaseException:
+            temp.unlink(missing_ok=True)
+            raise
+
+    async def write(self, path: str, data: bytes) -> None:
+        """Write file to local disk asynchronously"""
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._write_atomic, self._resolve(path), data)
+        except OSError as e:
+            raise Exception(f"Failed to write local file: {e}")
+
+    def open_writer(self, path: str) -> ObjectWriter:
+        """Write a file in pieces, to a temporary file renamed over the target on close"""
+        return LocalObjectWriter(self._resolve(path))
+
+    async def stat(self, path: str) -> ObjectStat:
+        """Size and a modification-based ETag of a local file"""
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, self._resolve(path).stat)
+            return ObjectStat(size=result.st_size, etag=f"{result.st_mtime_ns:x}-{result.st_size:x}")
+        except OSError as e:
+            raise Exception(f"Failed to stat local file: {e}")
+
+    async def list(self, prefix: str) -> List[str]:
+        """Paths of all files under a prefix, relative to the root"""
+        def walk() -> List[str]:
+            base = self._resolve(prefix)
+            # A prefix may end mid-name, like an object store key prefix
+            parent = base if prefix.endswith('/') or base.is_dir() else base.parent
+            if not parent.is_dir():
+                return []
+            return sorted(
+                p.relative_to(self.root).as_posix()
+                for p in parent.rglob('*')
+                if p.is_file() and not _is_temp(p) and p.relative_to(self.root).as_posix().startswith(prefix)
+            )
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, walk)
+        except OSError as e:
+            raise Exception(f"Failed to list local files: {e}")
+
+    async def delete(self, path: str) -> None:
+        """Delete file from local disk asynchronously"""
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, partial(self._resolve(path).unlink, missing_ok=True))
+        except OSError as e:
+            raise Exception(f"Failed to delete local file: {e}")
+
+class LocalObjectWriter(ObjectWriter):
+    def __init__(self, target: Path):
+        self.target = target
+        self.temp = target.with_name(f".{target.name}.{uuid.uuid4().hex}{_TEMP_SUFFIX}")
+        self._file: Optional[BinaryIO] = None
+
+    def _open(self) -> BinaryIO:
+        self.target.parent.mkdir(parents=True, exist_ok=True)
+        return open(self.temp, 'wb')
+
+    def _commit(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.temp, self.target)
+
+    async def write(self, data: bytes) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+            if self._file is None:
+                self._file = await loop.run_in_executor(None, self._open)
+            await loop.run_in_executor(None, self._file.write, data)
+        except OSError as e:
+            raise Exception(f"Failed to write local file: {e}")
+
+    async def close(self) -> None:
+        try:
+            if self._file is None:
+                self._file = self._open()
+            await asyncio.get_running_loop().run_in_executor(None, self._commit)
+        except OSError as e:
+            await self.abort()
+            raise Exception(f"Failed to write local file: {e}")
+
+    async def abort(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self.temp.unlink(missing_ok=True)
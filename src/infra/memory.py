@@ -0,0 +1,264 @@
+import json
+import time
+import asyncio
+import hashlib
+import itertools
+import logging
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+from infra.core_types import Event, EventDropped, EventStore, FileStorage, ObjectStat, ObjectWriter
+from infra.dead_letter import DeadLetter, RetryPolicy, dlq_stream
+from infra.scheduler import PriorityScheduler
+
+logger = logging.getLogger(__name__)
+
+class InMemoryFileStorage(FileStorage):
+    """FileStorage kept in a dict, for tests and load replays"""
+    def __init__(self, files: Dict[str, bytes] = None):
+        self.files: Dict[str, bytes] = {}
+        self._etags: Dict[str, str] = {}
+        for path, data in (files or {}).items():
+            self._put(path, data)
+
+    def _put(self, path: str, data: bytes) -> None:
+        self.files[path] = bytes(data)
+        self._etags[path] = hashlib.md5(data).hexdigest()
+
+    async def read(self, path: str) -> bytes:
+        try:
+            return self.files[path]
+        except KeyError:
+            raise Exception(f"Failed to read in-memory file: {path} not found")
+
+    async def write(self, path: str, data: bytes) -> None:
+        self._put(path, data)
+
+    def open_writer(self, path: str) -> ObjectWriter:
+        return InMemoryObjectWriter(self, path)
+
+    async def stat(self, path: str) -> ObjectStat:
+        if path not in self.files:
+            raise Exception(f"Failed to stat in-memory file: {path} not found")
+        return ObjectStat(size=len(self.files[path]), etag=self._etags[path])
+
+    async def list(self, prefix: str) -> List[str]:
+        return sorted(path for path in self.files if path.startswith(prefix))
+
+    async def ping(self) -> None:
+        pass
+
+    async def delete(self, path: str) -> None:
+        self.files.pop(path, None)
+        self._etags.pop(path, None)
+
+class InMemoryObjectWriter(ObjectWriter):
+    def __init__(self, storage: InMemoryFileStorage, path: str):
+        self.storage = storage
+        self.path = path
+        self.parts: List[bytes] = []
+
+    async def write(self, data: bytes) -> None:
+        self.parts.append(bytes(data))
+
+    async def close(self) -> None:
+        self.storage._put(self.path, b''.join(self.parts))
+        self.parts = []
+
+    async def abort(self) -> None:
+        self.parts = []
+
+class InMemoryEventStore(EventStore):
+    """
+    EventStore on bounded asyncio.Queues, for running the pipeline in one
+    process without Redis: batch jobs, benchmarks, and measuring how much the
+    Redis transport adds to pure pipeline cost.
+
+    The contract matches RedisEventStore. Events are dispatched through the
+    same scheduler with at most `concurrency` in flight. A delivered event
+    stays pending until its handler returns. Failures are retried with the
+    retry policy's backoff, then moved to `dead_letters`; events whose handler
+    raises EventDropped are counted in `dropped` instead. `write_event` to a
+    consumed stream waits while its queue is full, which pushes back on
+    producers. Events for streams nobody consumes here, such as the output
+    stream, are kept in `published`, capped at `maxsize` like MAXLEN
+    trimming. Nothing survives the process.
+    """
+    def __init__(
+        self,
+        event_name: str,
+        concurrency: int = 1,
+        priority_streams: Optional[Dict[str, float]] = None,
+        size_estimator: Optional[Callable[[Event], Awaitable[int]]] = None,
+        prefetch: Optional[int] = None,
+        scheduler: Optional[Any] = None,
+        maxsize: int = 1000,
+        retry_policy: Optional[RetryPolicy] = None,
+        idle_wait: float = 0.5
+    ):
+        self.concurrency = concurrency
+        self.streams = priority_streams or {event_name: 1.0}
+        self.prefetch = prefetch or concurrency
+        # Schedulers define __len__, so an empty one is falsy
+        self.scheduler = scheduler if scheduler is not None else PriorityScheduler(self.streams, size_estimator=size_estimator)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.idle_wait = idle_wait
+        self.queues: Dict[str, asyncio.Queue] = {stream: asyncio.Queue(maxsize) for stream in self.streams}
+        self.published: Dict[str, Deque[Event]] = defaultdict(lambda: deque(maxlen=maxsize))
+        self.dead_letters: Dict[str, List[DeadLetter]] = defaultdict(list)
+        # Delivered but not yet acknowledged, by event id
+        self.pending: Dict[str, Event] = {}
+        self.acked = 0
+        self.dropped = 0
+        self._attempts: Dict[str, int] = defaultdict(int)
+        self._retries: Set[asyncio.Task] = set()
+        self._seq = itertools.count()
+        self._available = asyncio.Event()
+        self._running = False
+
+    def queue_wait_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Produce-to-dispatch wait per priority stream, in seconds"""
+        return self.scheduler.queue_wait_stats()
+
+    async def write_event(self, event: Event) -> str:
+        # Stream-style ids, so the scheduler can read the produce time from them
+        event_id = f"{int(time.time() * 1000)}-{next(self._seq)}"
+        stored = Event(
+            id=event_id,
+            name=event.name,
+            meta=event.meta,
+            data=event.data,
+            timestamp=getattr(event, 'timestamp', None) or datetime.now(timezone.utc).isoformat()
+        )
+        queue = self.queues.get(event.name)
+        if queue is None:
+            self.published[event.name].append(stored)
+        else:
+            await queue.put(stored)
+            self._available.set()
+        return event_id
+
+    def __len__(self) -> int:
+        """Events not yet acknowledged or dead-lettered"""
+        return sum(q.qsize() for q in self.queues.values()) + len(self.scheduler) + len(self.pending) + len(self._retries)
+
+    async def join(self, poll: float = 0.05) -> None:
+        """Wait until every written event is acknowledged or dead-lettered"""
+        while len(self):
+            await asyncio.sleep(poll)
+
+    def stop(self) -> None:
+        self._running = False
+        self._available.set()
+
+    async def _redeliver(self, stream: str, event: Event, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self.queues[stream].put(event)
+        self._available.set()
+
+    def _dead_letter(self, stream: str, event: Event, error: BaseException, attempts: int) -> None:
+        self.dead_letters[dlq_stream(stream)].append(DeadLetter(
+            id=event.id,
+            source_stream=stream,
+            source_id=event.id,
+            error_type=type(error).__name__,
+            error=str(error),
+            attempts=attempts,
+            failed_at=datetime.now(timezone.utc).isoformat(),
+            fields={'name': event.name, 'meta': json.dumps(event.meta), 'data': json.dumps(event.data)}
+        ))
+        logger.error(f"Dead-lettered {stream}/{event.id} after {attempts} attempt(s): {type(error).__name__}: {error}")
+
+    async def _handle_event(self, handler: Any, stream: str, event: Event) -> None:
+        self.pending[event.id] = event
+        self._attempts[event.id] += 1
+        try:
+            await handler(event)
+        except EventDropped:
+            self.dropped += 1
+            self._attempts.pop(event.id, None)
+        except Exception as e:
+            attempts = self._attempts[event.id]
+            if self.retry_policy.is_retryable(e) and attempts < self.retry_policy.max_attempts:
+                delay_ms = self.retry_policy.delay_ms(attempts)
+                logger.warning(f"Retrying {stream}/{event.id} in {delay_ms}ms after attempt {attempts}: {e}")
+                task = asyncio.create_task(self._redeliver(stream, event, delay_ms / 1000))
+                self._retries.add(task)
+                task.add_done_callback(self._retries.discard)
+            else:
+                self._dead_letter(stream, event, e, attempts)
+                self._attempts.pop(event.id, None)
+        else:
+            self.acked += 1
+            self._attempts.pop(event.id, None)
+        finally:
+            self.pending.pop(event.id, None)
+            await self.scheduler.release(stream, event)
+
+    async def _fetch(self, count: int) -> int:
+        """Move queued events into the scheduler, returning how many were moved"""
+        moved = 0
+        for stream, queue in self.queues.items():
+            while moved < count and not queue.empty():
+                await self.scheduler.push(stream, queue.get_nowait())
+                moved += 1
+        return moved
+
+    async def _wait(self, in_flight: Set[asyncio.Task]) -> None:
+        """Sleep until an event is written or an in-flight event finishes"""
+        waiters = set(in_flight)
+        available = None
+        if not any(q.qsize() for q in self.queues.values()):
+            self._available.clear()
+            available = asyncio.create_task(self._available.wait())
+            waiters.add(available)
+        if waiters:
+            await asyncio.wait(waiters, timeout=self.idle_wait, return_when=asyncio.FIRST_COMPLETED)
+        else:
+            await asyncio.sleep(self.idle_wait)
+        if available is not None:
+            available.cancel()
+
+    async def process_events(self, handler: Any) -> None:
+        self._running = True
+        in_flight: Set[asyncio.Task] = set()
+
+        try:
+            while self._running:
+                free = self.concurrency - len(in_flight)
+                if free <= 0:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+                    continue
+
+                # Read until the scheduler has enough to choose from
+                room = self.scheduler.room(self.prefetch)
+                while room and await self._fetch(count=room):
+                    room = self.scheduler.room(self.prefetch)
+
+                dispatched = 0
+                while dispatched < free and len(self.scheduler):
+                    item = await self.scheduler.pop()
+                    if item is None:
+                        break
+                    stream, event = item
+                    in_flight.add(asyncio.create_task(self._handle_event(handler, stream, event)))
+                    dispatched += 1
+
+                if not dispatched:
+                    await self._wait(in_flight)
+
+                done = {task for task in in_flight if task.done()}
+                in_flight -= done
+                for task in done:
+                    task.result()
+
+            if in_flight:
+                await asyncio.gather(*in_flight)
+
+        except Exception:
+            self._running = False
+            for task in in_flight:
+                task.cancel()
+            raise
@@ -1,9 +1,14 @@
 from minio import Minio
+from minio.datatypes import Part
 from minio.error import S3Error
-from infra.core_types import FileStorage
+from infra.core_types import FileStorage, ObjectStat, ObjectWriter
 import io
 import asyncio
 from functools import partial
+from typing import List, Optional
+
+# S3's smallest part size; every part but the last must reach it
+MIN_PART_SIZE = 5 * 1024 * 1024
 
 class MinioFileStorage(FileStorage):
     def __init__(
@@ -12,7 +17,8 @@ class MinioFileStorage(FileStorage):
         access_key: str,
         secret_key: str,
         bucket: str,
-        secure: bool = True
+        secure: bool = True,
+        ensure_bucket: bool = True
     ):
         self.client = Minio(
             endpoint,
@@ -21,8 +27,15 @@ class MinioFileStorage(FileStorage):
             secure=secure
         )
         self.bucket = bucket
-        self._ensure_bucket()
-        
+        # Async callers pass False and await ping() instead of blocking here
+        if ensure_bucket:
+            self._ensure_bucket()
+
+    async def ping(self) -> None:
+        """Check MinIO is reachable, creating the bucket if needed; each concurrent ping opens a pooled connection"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._ensure_bucket)
+
     def _ensure_bucket(self) -> None:
         """Ensure bucket exists"""
         try:
@@ -81,6 +94,36 @@ class MinioFileStorage(FileStorage):
             if 'data_stream' in locals():
                 data_stream.close()
 
+    def open_writer(self, path: str, part_size: int = MIN_PART_SIZE) -> ObjectWriter:
+        """Write an object in pieces, as a multipart upload once it outgrows one part"""
+        return MinioObjectWriter(self.client, self.bucket, path, max(part_size, MIN_PART_SIZE))
+
+    async def stat(self, path: str) -> ObjectStat:
+        """Fetch object size and ETag without downloading it"""
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                None,
+                partial(self.client.stat_object, self.bucket, path)
+            )
+            return ObjectStat(size=result.size, etag=result.etag)
+        except S3Error as e:
+            raise Exception(f"Failed to stat file in MinIO: {e}")
+
+    async def list(self, prefix: str) -> List[str]:
+        """Names of all objects under a prefix"""
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None,
+                lambda: [
+                    obj.object_name
+                    for obj in self.client.list_objects(self.bucket, prefix=prefix, recursive=True)
+                ]
+            )
+        except S3Error as e:
+            raise Exception(f"Failed to list files in MinIO: {e}")
+
     async def delete(self, path: str) -> None:
         """Delete file from MinIO asynchronously"""
         try:
@@ -91,3 +134,70 @@ class MinioFileStorage(FileStorage):
             )
         except S3Error as e:
             raise Exception(f"Failed to delete file from MinIO: {e}")
+
+class MinioObjectWriter(ObjectWriter):
+    """
+    Buffers up to one part, so memory stays at `part_size` however large the
+    object grows. Objects smaller than a part are stored with a single PUT;
+    the multipart upload is only created when the first part fills up.
+    """
+    def __init__(self, client: Minio, bucket: str, path: str, part_size: int):
+        self.client = client
+        self.bucket = bucket
+        self.path = path
+        self.part_size = part_size
+        self.buffer = bytearray()
+        self.upload_id: Optional[str] = None
+        self.parts: List[Part] = []
+
+    def _upload_part(self, data: bytes) -> None:
+        # minio-py (pinned) keeps its multipart calls private; put_object cannot take pieces as they come
+        if self.upload_id is None:
+            self.upload_id = self.client._create_multipart_upload(
+                self.bucket, self.path, {'Content-Type': 'application/octet-stream'}
+            )
+        part_number = len(self.parts) + 1
+        etag = self.client._upload_part(self.bucket, self.path, data, None, self.upload_id, part_number)
+        self.parts.append(Part(part_number, etag))
+
+    def _complete(self, data: bytes) -> None:
+        if self.upload_id is None:
+            self.client.put_object(self.bucket, self.path, io.BytesIO(data), len(data))
+            return
+        if data:
+            self._upload_part(data)
+        self.client._complete_multipart_upload(self.bucket, self.path, self.upload_id, self.parts)
+
+    async def write(self, data: bytes) -> None:
+        self.buffer += data
+        loop = asyncio.get_running_loop()
+        try:
+            while len(self.buffer) >= self.part_size:
+                part = bytes(self.buffer[:self.part_size])
+                del self.buffer[:self.part_size]
+                await loop.run_in_executor(None, self._upload_part, part)
+        except S3Error as e:
+            await self.abort()
+            raise Exception(f"Failed to write file to MinIO: {e}")
+
+    async def close(self) -> None:
+        data, self.buffer = bytes(self.buffer), bytearray()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._complete, data)
+        except S3Error as e:
+            await self.abort()
+            raise Exception(f"Failed to write file to MinIO: {e}")
+
+    async def abort(self) -> None:
+        """Drop the buffer and any uploaded parts; a bucket lifecycle rule covers crashed workers"""
+        self.buffer = bytearray()
+        if self.upload_id is None:
+            return
+        upload_id, self.upload_id = self.upload_id, None
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                partial(self.client._abort_multipart_upload, self.bucket, self.path, upload_id)
+            )
+        except S3Error:
+            pass
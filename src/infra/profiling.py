@@ -0,0 +1,228 @@
+import io
+import os
+import time
+import pstats
+import socket
+import asyncio
+import cProfile
+import logging
+import marshal
+import resource
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from redis.asyncio import Redis
+from infra.core_types import Event, FileStorage
+
+logger = logging.getLogger(__name__)
+
+# Allocations made by the profiler and the import system are noise in the top sites
+_SITE_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+def rss_bytes() -> int:
+    """Current resident set size, 0 where /proc is missing"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return 0
+
+def max_rss_bytes() -> int:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class EventProfiler:
+    """
+    Opt-in profiling around an event handler.
+
+    With `track_events`, every event gets a report of its wall and CPU time,
+    RSS and RSS high-water mark, the tracemalloc peak and the allocation sites
+    that grew most since start() at the highest snapshot taken while it ran.
+    These are process-wide measures: with several events in flight they cover
+    the whole busy period, so run with CONCURRENCY=1 for exact attribution.
+
+    request_capture(n) profiles the next `n` events with cProfile, from the
+    first one's start until all of them finished, and writes the stats to
+    FileStorage as `<prefix>/<name>/<time>-<host>-<pid>.prof` (loadable with
+    pstats) and a `.txt` summary. Only the event loop thread is profiled.
+
+    wrap() adds one attribute check per event while nothing is enabled.
+    """
+    def __init__(
+        self,
+        file_storage: FileStorage,
+        track_events: bool = False,
+        top_sites: int = 5,
+        capture_events: int = 20,
+        sample_interval: float = 0.25,
+        frames: int = 1,
+        prefix: str = "profiles",
+        name: str = "summarizer",
+        report: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self.file_storage = file_storage
+        self.track_events = track_events
+        self.top_sites = top_sites
+        self.capture_events = capture_events
+        self.sample_interval = sample_interval
+        self.frames = frames
+        self.prefix = prefix
+        self.name = name
+        self.report = report or (lambda stats: logger.info(f"Event profile: {stats}"))
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._in_flight = 0
+        self._sampler: Optional[asyncio.Task] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._snapshot_bytes = 0
+        # cProfile capture of the next events; `_capture_left` of them still to start
+        self._capture: Optional[cProfile.Profile] = None
+        self._capture_left = 0
+        self._capture_running = 0
+        self._capture_ids: List[str] = []
+        self._captures: set = set()
+
+    def start(self) -> None:
+        """Start tracing allocations and take the baseline the top sites are compared to"""
+        if self.track_events:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+            self._baseline = tracemalloc.take_snapshot().filter_traces(_SITE_FILTERS)
+
+    def request_capture(self, events: Optional[int] = None) -> None:
+        """Profile the next `events` events, unless a capture is already running"""
+        if self._capture_left or self._capture is not None:
+            logger.info("A profile capture is already running")
+            return
+        self._capture_left = events or self.capture_events
+        logger.info(f"Capturing a profile of the next {self._capture_left} events")
+
+    async def listen(self, redis: Redis, channel: str) -> None:
+        """Start a capture on every message to `channel`; the payload is the event count, if any"""
+        pubsub = redis.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message['type'] != 'message':
+                    continue
+                try:
+                    self.request_capture(int(message['data']) if message['data'] else None)
+                except ValueError:
+                    logger.warning(f"Ignoring profile request {message['data']!r}: not an event count")
+        finally:
+            await pubsub.aclose()
+
+    def wrap(self, handler: Callable[[Event], Awaitable[Any]]) -> Callable[[Event], Awaitable[Any]]:
+        async def profiled(event: Event) -> Any:
+            if not self.track_events and not self._capture_left:
+                return await handler(event)
+            captured = self._begin_capture()
+            try:
+                if self.track_events:
+                    return await self._tracked(handler, event)
+                return await handler(event)
+            finally:
+                if captured:
+                    self._end_capture(event.id)
+        return profiled
+
+    async def _sample(self) -> None:
+        # Snapshots are costly, so one is taken only when traced memory grew markedly
+        while self._in_flight:
+            current, _ = tracemalloc.get_traced_memory()
+            if current > self._snapshot_bytes * 1.1:
+                self._snapshot = tracemalloc.take_snapshot()
+                self._snapshot_bytes = current
+            await asyncio.sleep(self.sample_interval)
+
+    def _sites(self) -> List[Dict[str, Any]]:
+        if self._snapshot is None or self._baseline is None:
+            return []
+        stats = self._snapshot.filter_traces(_SITE_FILTERS).compare_to(self._baseline, 'lineno')
+        return [
+            {'site': str(stat.traceback[0]), 'mb': round(stat.size_diff / 2 ** 20, 2), 'count': stat.count_diff}
+            for stat in stats[:self.top_sites]
+            if stat.size_diff > 0
+        ]
+
+    async def _tracked(self, handler: Callable[[Event], Awaitable[Any]], event: Event) -> Any:
+        concurrent = self._in_flight
+        if not concurrent:
+            # A new busy period: the peak and the snapshot start over
+            tracemalloc.reset_peak()
+            self._snapshot, self._snapshot_bytes = None, 0
+        self._in_flight += 1
+        if self._sampler is None or self._sampler.done():
+            self._sampler = asyncio.create_task(self._sample())
+        started, cpu_started, max_rss_started = time.perf_counter(), time.process_time(), max_rss_bytes()
+        error = None
+        try:
+            return await handler(event)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self._in_flight -= 1
+            _, traced_peak = tracemalloc.get_traced_memory()
+            max_rss = max_rss_bytes()
+            self.report({
+                'event_id': event.id,
+                'seconds': round(time.perf_counter() - started, 3),
+                'cpu_seconds': round(time.process_time() - cpu_started, 3),
+                'rss_mb': round(rss_bytes() / 2 ** 20, 1),
+                'max_rss_mb': round(max_rss / 2 ** 20, 1),
+                'max_rss_growth_mb': round((max_rss - max_rss_started) / 2 ** 20, 1),
+                'traced_peak_mb': round(traced_peak / 2 ** 20, 1),
+                'concurrent': concurrent,
+                'top_sites': self._sites(),
+                'error': error
+            })
+
+    def _begin_capture(self) -> bool:
+        if not self._capture_left:
+            return False
+        if self._capture is None:
+            self._capture = cProfile.Profile()
+            self._capture.enable()
+        self._capture_left -= 1
+        self._capture_running += 1
+        return True
+
+    def _end_capture(self, event_id: str) -> None:
+        self._capture_running -= 1
+        self._capture_ids.append(event_id)
+        if self._capture_left or self._capture_running:
+            return
+        profile, event_ids = self._capture, self._capture_ids
+        profile.disable()
+        self._capture, self._capture_ids = None, []
+        # Written in the background so the last captured event is not held up
+        task = asyncio.create_task(self._dump(profile, event_ids))
+        self._captures.add(task)
+        task.add_done_callback(self._captures.discard)
+
+    async def _dump(self, profile: cProfile.Profile, event_ids: List[str]) -> Optional[str]:
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        path = f"{self.prefix}/{self.name}/{stamp}-{socket.gethostname()}-{os.getpid()}"
+        text = io.StringIO()
+        text.write(f"Events: {', '.join(event_ids)}\n")
+        stats = pstats.Stats(profile, stream=text)
+        stats.sort_stats('cumulative').print_stats(50)
+        try:
+            await self.file_storage.write(f"{path}.prof", marshal.dumps(stats.stats))
+            await self.file_storage.write(f"{path}.txt", text.getvalue().encode('utf-8'))
+        except Exception as e:
+            # Profiling is best effort and must never fail the service
+            logger.error(f"Failed to store profile {path}: {e}")
+            return None
+        logger.info(f"Stored profile of {len(event_ids)} events at {path}.prof")
+        return path
+
+    async def flush(self) -> None:
+        """Wait for captures still being written"""
+        if self._captures:
+            await asyncio.gather(*self._captures, return_exceptions=True)
@@ -1,100 +1,476 @@
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 from redis.asyncio import Redis
+import os
+import time
+import socket
+import asyncio
 import json
+import logging
 from datetime import datetime, timezone
-from infra.core_types import Event, EventStore
+from infra.core_types import Event, EventDropped, EventStore
+from infra.dead_letter import RetryPolicy, dead_letter_fields, dlq_stream, retry_key
+from infra.scheduler import PriorityScheduler
+from infra.sharding import ShardAssigner, ShardRouter, group_by_slot, is_cluster
+from infra.stream_event import StreamEvent, header_fields
+
+logger = logging.getLogger(__name__)
+
+def encode_event(event: Event) -> Dict[str, str]:
+    """Stream entry fields of an event"""
+    event_data = {
+        'name': event.name,
+        'meta': json.dumps(event.meta),
+        'data': json.dumps(event.data),
+        **header_fields(event.meta)
+    }
+    # Add timestamp if not provided
+    if hasattr(event, 'timestamp') and event.timestamp:
+        event_data['timestamp'] = event.timestamp
+    else:
+        event_data['timestamp'] = datetime.now(timezone.utc).isoformat()
+    return event_data
+
+def decode_event(message_id: bytes, data: dict) -> Event:
+    """Event from a raw stream entry, as returned by XREADGROUP or XRANGE"""
+    # Decode message data
+    decoded_data = {}
+    for k, v in data.items():
+        key = k.decode()
+        value = v.decode()
+        if key == 'data' or key == 'meta':
+            decoded_data[key] = json.loads(value)
+        else:
+            decoded_data[key] = value
+
+    return Event(
+        id=message_id.decode(),
+        name=decoded_data['name'],
+        meta=decoded_data.get('meta'),
+        data=decoded_data['data']
+        # timestamp is optional
+    )
+
+class DeliveryLimitExceeded(Exception):
+    """An event kept killing or stalling its consumers until the attempt limit"""
 
 class RedisEventStore(EventStore):
     def __init__(
         self,
         redis: Redis,
         event_name: str,
-        service_name: str
+        service_name: str,
+        claim_idle_ms: Optional[int] = None,
+        concurrency: int = 1,
+        priority_streams: Optional[Dict[str, float]] = None,
+        size_estimator: Optional[Callable[[Event], Awaitable[int]]] = None,
+        prefetch: Optional[int] = None,
+        scheduler: Optional[Any] = None,
+        idle_wait: float = 0.5,
+        maxlen: Optional[int] = None,
+        max_age_ms: Optional[int] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        router: Optional[ShardRouter] = None,
+        rebalance_interval: float = 10.0,
+        prefilter: Optional[Callable[[StreamEvent], bool]] = None
     ):
-        self.redis = redis
+        self.redis = router.primary if router is not None else redis
         self.stream_name = event_name
         self.service_name = service_name
-        self.consumer_name = f"{service_name}-{id(self)}"
+        # Unique across hosts, since consumers of sharded streams coordinate by name
+        self.consumer_name = f"{service_name}-{socket.gethostname()}-{os.getpid()}-{id(self)}"
+        # Pending messages idle longer than this are taken over from dead consumers
+        self.claim_idle_ms = claim_idle_ms
+        # Number of events handled at the same time by this consumer
+        self.concurrency = concurrency
+        # Input streams and their scheduling weights
+        self.logical_streams = priority_streams or {event_name: 1.0}
+        # With a router, every input stream is split into shard streams and this
+        # consumer reads the shards assigned to it; the set changes on rebalance
+        self.router = router
+        self.assigner = None
+        self.rebalance_interval = rebalance_interval
+        self.streams = self.logical_streams
+        if router is not None:
+            self.assigner = ShardAssigner(
+                router.primary,
+                key=f"{service_name}:consumers",
+                member=self.consumer_name,
+                shards=router.shards
+            )
+            self.streams = {}
+        # Events buffered ahead of dispatch so the scheduler has a choice
+        self.prefetch = prefetch or concurrency
+        # Schedulers define __len__, so an empty one is falsy
+        self.scheduler = scheduler if scheduler is not None else PriorityScheduler(
+            router.expand(self.logical_streams) if router is not None else self.logical_streams,
+            size_estimator=size_estimator
+        )
+        self.idle_wait = idle_wait
+        # Approximate write-time retention; entries past it are dropped unarchived
+        if maxlen is not None and max_age_ms is not None:
+            raise ValueError("maxlen and max_age_ms are mutually exclusive")
+        self.maxlen = maxlen
+        self.max_age_ms = max_age_ms
+        # Failed events are retried with backoff, then moved to `<stream>:dlq`
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Entries it rejects by name or header fields are acknowledged without parsing their payload
+        self.prefilter = prefilter
+        # Ids of entries held by this consumer, in flight or buffered in the scheduler. Their
+        # idle time is reset well within `claim_idle_ms` so peers do not take them over
+        self._held: Dict[str, Set[str]] = {}
         self._running = False
         
+    def _client(self, stream: str) -> Redis:
+        """Redis holding a stream and the keys tagged with it"""
+        return self.router.client(stream) if self.router is not None else self.redis
+
     async def ensure_consumer_group(self) -> None:
-        try:
-            await self.redis.xgroup_create(
-                self.stream_name,
-                self.service_name,
-                mkstream=True,
-                id='0'
-            )
-        except Exception as e:
-            if 'BUSYGROUP' not in str(e):
-                raise
+        # Groups exist on every shard, so entries routed to unowned shards wait for their consumer
+        streams = self.router.expand(self.logical_streams) if self.router is not None else self.streams
+        for stream in streams:
+            try:
+                await self._client(stream).xgroup_create(
+                    stream,
+                    self.service_name,
+                    mkstream=True,
+                    id='0'
+                )
+            except Exception as e:
+                if 'BUSYGROUP' not in str(e):
+                    raise
 
-    async def write_event(self, event: Event) -> str:
-        event_data = {
-            'name': event.name,
-            'meta': json.dumps(event.meta),
-            'data': json.dumps(event.data)
-        }
-        # Add timestamp if not provided
-        if hasattr(event, 'timestamp') and event.timestamp:
-            event_data['timestamp'] = event.timestamp
-        else:
-            event_data['timestamp'] = datetime.now(timezone.utc).isoformat()
+    def stop(self) -> None:
+        """Finish in-flight events and return from process_events"""
+        self._running = False
+
+    def queue_wait_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Produce-to-dispatch wait per priority stream, in seconds"""
+        return self.scheduler.queue_wait_stats()
 
+    async def write_event(self, event: Event) -> str:
+        event_data = encode_event(event)
         try:
-            message_id = await self.redis.xadd(event.name, event_data)
+            trim: Dict[str, Any] = {}
+            if self.maxlen is not None:
+                trim = {'maxlen': self.maxlen, 'approximate': True}
+            elif self.max_age_ms is not None:
+                now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+                trim = {'minid': now_ms - self.max_age_ms, 'approximate': True}
+            stream = self.router.route(event.name, event) if self.router is not None else event.name
+            message_id = await self._client(stream).xadd(stream, event_data, **trim)
             return message_id.decode()
         except Exception as e:
             raise
 
+    async def claim_stale_messages(self, count: int = 10) -> list:
+        """Take over messages left pending by consumers that died mid-processing"""
+        if not self.claim_idle_ms:
+            return []
+        messages = []
+        for stream in self.streams:
+            _, claimed, *_ = await self._client(stream).xautoclaim(
+                stream,
+                self.service_name,
+                self.consumer_name,
+                min_idle_time=self.claim_idle_ms,
+                count=count
+            )
+            # Entries deleted from the stream while pending come back empty; held ones are still running here
+            held = self._held.get(stream, set())
+            claimed = [(message_id, data) for message_id, data in claimed if data and message_id.decode() not in held]
+            if not claimed:
+                continue
+            # An event that keeps taking its consumer down must not loop forever
+            deliveries = {
+                entry['message_id']: entry['times_delivered']
+                for entry in await self._client(stream).xpending_range(
+                    stream,
+                    self.service_name,
+                    min=claimed[0][0],
+                    max=claimed[-1][0],
+                    count=len(claimed),
+                    consumername=self.consumer_name
+                )
+            }
+            alive = []
+            for message_id, data in claimed:
+                attempts = deliveries.get(message_id, 1)
+                if attempts > self.retry_policy.max_attempts:
+                    await self._dead_letter(
+                        stream,
+                        message_id.decode(),
+                        DeliveryLimitExceeded(f"Delivered {attempts} times without completing"),
+                        attempts,
+                        data
+                    )
+                else:
+                    alive.append((message_id, data))
+            if alive:
+                messages.append((stream, alive))
+        return messages
+
+    async def renew_leases(self) -> int:
+        """Reset the idle time of every held entry without counting a delivery"""
+        renewed = 0
+        for stream, held in list(self._held.items()):
+            if not held:
+                continue
+            # An entry a peer took over while this consumer stalled comes back; either may ack it
+            await self._client(stream).xclaim(
+                stream,
+                self.service_name,
+                self.consumer_name,
+                min_idle_time=0,
+                message_ids=list(held),
+                justid=True
+            )
+            renewed += len(held)
+        return renewed
+
+    async def _lease_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.claim_idle_ms / 3000)
+            try:
+                await self.renew_leases()
+            except Exception as e:
+                logger.warning(f"Lease renewal failed: {e}")
+
+    async def claim_due_retries(self, count: int = 10) -> list:
+        """Take over failed messages whose retry delay has passed"""
+        messages = []
+        now_ms = int(time.time() * 1000)
+        for stream in self.streams:
+            redis = self._client(stream)
+            key = retry_key(stream, self.service_name)
+            due = await redis.zrangebyscore(key, '-inf', now_ms, start=0, num=count)
+            # Whoever removes the schedule entry owns the retry
+            mine = [message_id for message_id in due if await redis.zrem(key, message_id)]
+            if not mine:
+                continue
+            claimed = await redis.xclaim(
+                stream,
+                self.service_name,
+                self.consumer_name,
+                min_idle_time=0,
+                message_ids=mine
+            )
+            gone = [message_id for message_id, data in claimed if not data]
+            if gone:
+                await redis.xack(stream, self.service_name, *gone)
+            claimed = [(message_id, data) for message_id, data in claimed if data]
+            if claimed:
+                messages.append((stream, claimed))
+        return messages
+
+    async def _delivery_count(self, stream: str, message_id: str) -> int:
+        pending = await self._client(stream).xpending_range(
+            stream,
+            self.service_name,
+            min=message_id,
+            max=message_id,
+            count=1
+        )
+        return pending[0]['times_delivered'] if pending else 1
+
+    async def _dead_letter(
+        self,
+        stream: str,
+        message_id: str,
+        error: BaseException,
+        attempts: int,
+        fields: Optional[Dict[bytes, bytes]] = None
+    ) -> None:
+        """Move a message to the dead-letter stream and acknowledge the original"""
+        redis = self._client(stream)
+        if fields is None:
+            entries = await redis.xrange(stream, min=message_id, max=message_id, count=1)
+            fields = entries[0][1] if entries else {}
+        # The dead-letter stream and retry set share the stream's hash tag, but Cluster pipelines cannot be transactions
+        async with redis.pipeline(transaction=not is_cluster(redis)) as pipe:
+            pipe.xadd(
+                dlq_stream(stream),
+                dead_letter_fields(fields, stream, message_id, error, attempts, self.consumer_name)
+            )
+            pipe.xack(stream, self.service_name, message_id)
+            pipe.zrem(retry_key(stream, self.service_name), message_id)
+            await pipe.execute()
+        logger.error(f"Dead-lettered {stream}/{message_id} after {attempts} attempt(s): {type(error).__name__}: {error}")
+
+    async def _handle_failure(self, stream: str, event: Event, error: Exception) -> None:
+        attempts = await self._delivery_count(stream, event.id)
+        if self.retry_policy.is_retryable(error) and attempts < self.retry_policy.max_attempts:
+            delay_ms = self.retry_policy.delay_ms(attempts)
+            await self._client(stream).zadd(
+                retry_key(stream, self.service_name),
+                {event.id: int(time.time() * 1000) + delay_ms}
+            )
+            logger.warning(f"Retrying {stream}/{event.id} in {delay_ms}ms after attempt {attempts}: {error}")
+            return
+        await self._dead_letter(stream, event.id, error, attempts, getattr(event, 'fields', None))
+
+    def _decode_event(self, message_id: bytes, data: dict, stream: Optional[str] = None) -> StreamEvent:
+        return StreamEvent(message_id, data, stream)
+
+    async def _handle_event(self, handler: Any, stream: str, event: Event) -> None:
+        try:
+            try:
+                await handler(event)
+            except EventDropped as e:
+                logger.info(f"Dropped {stream}/{event.id}: {e}")
+                await self._client(stream).xack(stream, self.service_name, event.id)
+            except Exception as e:
+                # One bad event must not take the consumer down
+                await self._handle_failure(stream, event, e)
+            else:
+                await self._client(stream).xack(
+                    stream,
+                    self.service_name,
+                    event.id
+                )
+        finally:
+            self._held.get(stream, set()).discard(event.id)
+            await self.scheduler.release(stream, event)
+
+    async def _read_new(self, count: int, block: Optional[int]) -> list:
+        """XREADGROUP over the owned streams, one call per Redis or Cluster slot"""
+        if not self.streams:
+            # No shard assigned (more consumers than shards); wait for a rebalance
+            await asyncio.sleep(self.idle_wait)
+            return []
+        if self.router is not None:
+            groups = self.router.group_by_client(self.streams)
+        elif is_cluster(self.redis):
+            # Priority streams without a shared hash tag sit in different slots
+            groups = group_by_slot(self.streams)
+        else:
+            groups = [list(self.streams)]
+
+        async def read(streams: List[str], block: Optional[int]) -> list:
+            return await self._client(streams[0]).xreadgroup(
+                groupname=self.service_name,
+                consumername=self.consumer_name,
+                streams={stream: '>' for stream in streams},
+                count=count,
+                block=block
+            ) or []
+
+        if len(groups) == 1:
+            return await read(groups[0], block)
+        # Concurrent reads return together, so a short block keeps one busy shard from waiting on idle ones
+        if block is not None:
+            block = min(block, int(self.idle_wait * 1000))
+        results = await asyncio.gather(*(read(streams, block) for streams in groups))
+        return [entry for result in results for entry in result]
+
+    async def _rebalance(self) -> None:
+        gained, lost = await self.assigner.heartbeat()
+        if gained or lost:
+            self.streams = self.router.expand(self.logical_streams, self.assigner.assigned)
+
+    async def _rebalance_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.rebalance_interval)
+            try:
+                await self._rebalance()
+            except Exception as e:
+                # Keep the current shards; peers see this consumer as gone once the heartbeat ttl passes
+                logger.warning(f"Shard heartbeat failed: {e}")
+
+    async def _fetch(self, count: int, block: Optional[int]) -> int:
+        """Read new and reclaimed messages from every input stream into the scheduler, returning how many were read"""
+        messages = await self.claim_due_retries(count=count)
+        if not messages:
+            messages = await self.claim_stale_messages(count=count)
+        if not messages:
+            messages = await self._read_new(count, block)
+
+        read = 0
+        for stream, message_list in messages or []:
+            stream = stream.decode() if isinstance(stream, bytes) else stream
+            read += len(message_list)
+            held = self._held.setdefault(stream, set())
+            skipped = []
+            for message_id, data in message_list:
+                if message_id.decode() in held:
+                    # Already in flight or buffered here; a second copy would run it twice
+                    continue
+                try:
+                    event = self._decode_event(message_id, data, stream)
+                    if self.prefilter is not None and not self.prefilter(event):
+                        skipped.append(message_id)
+                        continue
+                    # Parsed before queueing, so the size estimator and handler never see a bad payload
+                    event.decode()
+                except Exception as e:
+                    # Undecodable payloads never succeed on retry
+                    await self._dead_letter(stream, message_id.decode(), e, 1, data)
+                    continue
+                held.add(event.id)
+                await self.scheduler.push(stream, event)
+            if skipped:
+                await self._client(stream).xack(stream, self.service_name, *skipped)
+        return read
+
     async def process_events(self, handler: Any) -> None:
         await self.ensure_consumer_group()
         self._running = True
+        in_flight: Set[asyncio.Task] = set()
+        rebalancer = None
+        if self.assigner is not None:
+            await self._rebalance()
+            rebalancer = asyncio.create_task(self._rebalance_loop())
+        leases = asyncio.create_task(self._lease_loop()) if self.claim_idle_ms else None
 
-        while self._running:
-            try:
-                messages = await self.redis.xreadgroup(
-                    groupname=self.service_name,
-                    consumername=self.consumer_name,
-                    streams={self.stream_name: '>'},
-                    block=5000
-                )
-                
-                if not messages:
+        try:
+            while self._running:
+                free = self.concurrency - len(in_flight)
+                if free <= 0:
+                    done, in_flight = await asyncio.wait(
+                        in_flight,
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        task.result()
                     continue
 
-                for _, message_list in messages:
-                    for message_id, data in message_list:
-                        message_id = message_id.decode()
-                        
-                        # Decode message data
-                        decoded_data = {}
-                        for k, v in data.items():
-                            key = k.decode()
-                            value = v.decode()
-                            if key == 'data' or key == 'meta':
-                                decoded_data[key] = json.loads(value)
-                            else:
-                                decoded_data[key] = value
-
-                        event = Event(
-                            id=message_id,
-                            name=decoded_data['name'],
-                            meta=decoded_data['meta'],
-                            data=decoded_data['data']
-                            # timestamp is optional
-                        )
-
-                        try:
-                            await handler(event)
-                            await self.redis.xack(
-                                self.stream_name, 
-                                self.service_name, 
-                                message_id
-                            )
-                        except Exception as e:
-                            raise
+                # Read until the scheduler has enough to choose from; only block when nothing is buffered
+                room = self.scheduler.room(self.prefetch)
+                while room and await self._fetch(count=room, block=None if len(self.scheduler) else 5000):
+                    room = self.scheduler.room(self.prefetch)
 
-            except Exception as e:
-                self._running = False
-                raise
+                dispatched = 0
+                while dispatched < free and len(self.scheduler):
+                    item = await self.scheduler.pop()
+                    if item is None:
+                        break
+                    stream, event = item
+                    in_flight.add(asyncio.create_task(self._handle_event(handler, stream, event)))
+                    dispatched += 1
+
+                if not dispatched and len(self.scheduler):
+                    # Everything buffered is held back by the scheduler; wait for capacity
+                    if in_flight:
+                        await asyncio.wait(in_flight, timeout=self.idle_wait, return_when=asyncio.FIRST_COMPLETED)
+                    else:
+                        await asyncio.sleep(self.idle_wait)
+
+                # Handler errors are retried or dead-lettered; only Redis failures get here
+                done = {task for task in in_flight if task.done()}
+                in_flight -= done
+                for task in done:
+                    task.result()
+
+            if in_flight:
+                await asyncio.gather(*in_flight)
+
+        except Exception as e:
+            self._running = False
+            for task in in_flight:
+                task.cancel()
+            raise
+        finally:
+            if leases is not None:
+                leases.cancel()
+            if rebalancer is not None:
+                rebalancer.cancel()
+                await self.assigner.leave()
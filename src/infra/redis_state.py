@@ -0,0 +1,242 @@
+import time
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from redis.asyncio import Redis
+from infra.core_types import CheckpointStore, BoilerplateIndex, TenantAccounting, ResultCache, UsageTotals
+from infra.sharding import is_cluster
+
+logger = logging.getLogger(__name__)
+
+class RedisCheckpointStore(CheckpointStore):
+    """
+    Per-event pipeline state kept in a Redis hash: one field per completed step.
+    In-progress state lives for `ttl` seconds so abandoned events clean themselves
+    up; after success the hash is shortened to `completed_ttl`.
+    """
+    def __init__(
+        self,
+        redis: Redis,
+        prefix: str = "summarizer:checkpoint",
+        ttl: int = 24 * 60 * 60,
+        completed_ttl: int = 5 * 60
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl = ttl
+        self.completed_ttl = completed_ttl
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def load(self, key: str) -> Dict[str, str]:
+        raw = await self.redis.hgetall(self._key(key))
+        return {k.decode(): v.decode() for k, v in raw.items()}
+
+    async def save(self, key: str, step: str, value: str) -> None:
+        async with self.redis.pipeline(transaction=not is_cluster(self.redis)) as pipe:
+            pipe.hset(self._key(key), step, value)
+            pipe.expire(self._key(key), self.ttl)
+            await pipe.execute()
+
+    async def complete(self, key: str) -> None:
+        await self.redis.expire(self._key(key), self.completed_ttl)
+
+class RedisBoilerplateIndex(BoilerplateIndex):
+    """MinHash signatures of known boilerplate segments, kept in a Redis set"""
+    def __init__(self, redis: Redis, key: str = "summarizer:boilerplate"):
+        self.redis = redis
+        self.key = key
+
+    async def signatures(self) -> List[bytes]:
+        return list(await self.redis.smembers(self.key))
+
+    async def add(self, signature: bytes) -> None:
+        await self.redis.sadd(self.key, signature)
+
+class RedisResultCache(ResultCache):
+    """
+    Finished results by memo key. Entries expire after `ttl` seconds and at most
+    `max_entries` are kept, least recently used first out, tracked in a zset.
+    The prefix is the hash tag, so in Redis Cluster the entries and their index
+    share a slot and can be written together.
+    """
+    def __init__(
+        self,
+        redis: Redis,
+        prefix: str = "summarizer:result",
+        ttl: int = 7 * 24 * 60 * 60,
+        max_entries: int = 10000
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.index = f"{{{prefix}}}:index"
+
+    def _key(self, key: str) -> str:
+        return f"{{{self.prefix}}}:{key}"
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.redis.get(self._key(key))
+        if value is None:
+            return None
+        # A hit keeps the entry warm for LRU eviction; the TTL still bounds its age
+        await self.redis.zadd(self.index, {key: time.time()})
+        return value.decode()
+
+    async def put(self, key: str, value: str) -> None:
+        async with self.redis.pipeline(transaction=not is_cluster(self.redis)) as pipe:
+            pipe.set(self._key(key), value, ex=self.ttl)
+            pipe.zadd(self.index, {key: time.time()})
+            pipe.zremrangebyscore(self.index, '-inf', time.time() - self.ttl)
+            pipe.zcard(self.index)
+            *_, size = await pipe.execute()
+        if size > self.max_entries:
+            evicted = await self.redis.zpopmin(self.index, size - self.max_entries)
+            if evicted:
+                await self.redis.delete(*[self._key(member.decode()) for member, _ in evicted])
+
+    async def invalidate(self, keep_version: Optional[str] = None) -> int:
+        """Drop every entry, or every entry keyed under another pipeline version"""
+        members = [m.decode() for m in await self.redis.zrange(self.index, 0, -1)]
+        if keep_version is not None:
+            members = [m for m in members if not m.startswith(f"{keep_version}:")]
+        if not members:
+            return 0
+        async with self.redis.pipeline(transaction=not is_cluster(self.redis)) as pipe:
+            pipe.delete(*[self._key(m) for m in members])
+            pipe.zrem(self.index, *members)
+            await pipe.execute()
+        return len(members)
+
+# KEYS: in-flight lease zset, tokens-this-minute counter
+# ARGV: now, lease ttl, concurrency cap (-1 = none), lease id, tokens, tpm quota (-1 = none)
+_ACQUIRE_TENANT_SLOT = """
+local now = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - ttl)
+local cap = tonumber(ARGV[3])
+if cap >= 0 and redis.call('ZCARD', KEYS[1]) >= cap then
+    return 0
+end
+local quota = tonumber(ARGV[6])
+local used = tonumber(redis.call('GET', KEYS[2]) or '0')
+local tokens = tonumber(ARGV[5])
+if quota >= 0 and used > 0 and used + tokens > quota then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('EXPIRE', KEYS[1], ttl)
+redis.call('INCRBY', KEYS[2], tokens)
+redis.call('EXPIRE', KEYS[2], 120)
+return 1
+"""
+
+class RedisTenantAccounting(TenantAccounting):
+    """
+    Per-tenant concurrency caps and token-per-minute quotas shared by every
+    worker. In-flight jobs are leases in a sorted set, so a crashed worker's
+    slots free themselves after `lease_seconds`.
+    """
+    def __init__(
+        self,
+        redis: Redis,
+        prefix: str = "summarizer:tenant",
+        concurrency_caps: Optional[Dict[str, int]] = None,
+        default_concurrency: Optional[int] = None,
+        tpm_quotas: Optional[Dict[str, int]] = None,
+        default_tpm: Optional[int] = None,
+        lease_seconds: int = 60 * 60
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.concurrency_caps = concurrency_caps or {}
+        self.default_concurrency = default_concurrency
+        self.tpm_quotas = tpm_quotas or {}
+        self.default_tpm = default_tpm
+        self.lease_seconds = lease_seconds
+        self._acquire = redis.register_script(_ACQUIRE_TENANT_SLOT)
+
+    def _inflight_key(self, tenant: str) -> str:
+        # The tenant is the hash tag, so in Redis Cluster the script's keys share a slot
+        return f"{self.prefix}:{{{tenant}}}:inflight"
+
+    async def try_acquire(self, tenant: str, lease_id: str, tokens: int) -> bool:
+        now = time.time()
+        cap = self.concurrency_caps.get(tenant, self.default_concurrency)
+        quota = self.tpm_quotas.get(tenant, self.default_tpm)
+        acquired = await self._acquire(
+            keys=[
+                self._inflight_key(tenant),
+                f"{self.prefix}:{{{tenant}}}:tpm:{int(now // 60)}"
+            ],
+            args=[now, self.lease_seconds, -1 if cap is None else cap, lease_id, tokens, -1 if quota is None else quota]
+        )
+        return bool(acquired)
+
+    async def release(self, tenant: str, lease_id: str) -> None:
+        await self.redis.zrem(self._inflight_key(tenant), lease_id)
+
+class RedisUsageTotals(UsageTotals):
+    """
+    Running token totals per tenant and UTC day, in `<prefix>:<YYYY-MM-DD>:<tenant>`
+    hashes. add() only sums counters in memory; flush() writes them every
+    `interval` seconds as one pipelined HINCRBY per field, so the per-call cost
+    is independent of Redis latency. Day hashes expire after `ttl` seconds.
+    """
+    def __init__(
+        self,
+        redis: Redis,
+        prefix: str = "summarizer:usage",
+        interval: float = 5.0,
+        ttl: int = 90 * 24 * 60 * 60
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.interval = interval
+        self.ttl = ttl
+        self._pending: Dict[str, Counter] = {}
+
+    def key(self, tenant: str, day: Optional[str] = None) -> str:
+        day = day or f"{datetime.now(timezone.utc):%Y-%m-%d}"
+        return f"{self.prefix}:{day}:{tenant}"
+
+    def add(self, tenant: str, counters: Dict[str, int]) -> None:
+        self._pending.setdefault(self.key(tenant), Counter()).update(counters)
+
+    async def flush(self) -> int:
+        """Write the buffered counters and return how many hashes were updated"""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            # Not a transaction: tenant hashes may live in different Cluster slots
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, counters in pending.items():
+                    for field, value in counters.items():
+                        if value:
+                            pipe.hincrby(key, field, value)
+                    pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except Exception:
+            # Keep the counts for the next flush rather than lose them
+            for key, counters in pending.items():
+                self._pending.setdefault(key, Counter()).update(counters)
+            raise
+        return len(pending)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush token usage: {e}")
+
+    async def totals(self, tenant: str, day: str) -> Dict[str, int]:
+        """Totals of a tenant on a day given as YYYY-MM-DD"""
+        raw = await self.redis.hgetall(self.key(tenant, day))
+        return {k.decode(): int(v) for k, v in raw.items()}
@@ -0,0 +1,288 @@
+import time
+import itertools
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+from infra.core_types import Event, TenantAccounting
+from infra.stream_event import event_header
+
+def message_timestamp(message_id: str) -> float:
+    """Producer time of a stream entry, in seconds, taken from its id"""
+    return int(message_id.split('-', 1)[0]) / 1000
+
+class QueueWaitTracker:
+    """Recent produce-to-dispatch waits per stream"""
+    def __init__(self, streams: Iterable[str], window: int = 1000):
+        self.window = window
+        self._waits: Dict[str, Deque[float]] = {s: deque(maxlen=window) for s in streams}
+
+    def record(self, stream: str, seconds: float) -> None:
+        self._waits.setdefault(stream, deque(maxlen=self.window)).append(seconds)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Wait statistics per stream over the recent window, in seconds"""
+        stats = {}
+        for stream, waits in self._waits.items():
+            if not waits:
+                stats[stream] = {'count': 0}
+                continue
+            ordered = sorted(waits)
+            stats[stream] = {
+                'count': len(ordered),
+                'mean': sum(ordered) / len(ordered),
+                'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                'max': ordered[-1],
+            }
+        return stats
+
+@dataclass
+class ScheduledEvent:
+    stream: str
+    event: Event
+    weight: float
+    size: int
+    produced_at: float
+    seq: int = field(default=0)
+
+class PriorityScheduler:
+    """
+    Chooses which buffered event to dispatch next across several input streams.
+
+    An event's score is its stream weight divided by its relative size, so short
+    jobs on important streams go first. The score grows linearly with the time
+    the event has been waiting (one extra weight unit per `aging_seconds`),
+    which keeps large or low-priority jobs from starving.
+    """
+    def __init__(
+        self,
+        weights: Dict[str, float],
+        size_estimator: Optional[Callable[[Event], Awaitable[int]]] = None,
+        aging_seconds: float = 300.0,
+        reference_size: int = 1_000_000,
+        window: int = 1000
+    ):
+        self.weights = weights
+        self.size_estimator = size_estimator
+        self.aging_seconds = aging_seconds
+        self.reference_size = reference_size
+        self._buffer: List[ScheduledEvent] = []
+        self._seq = itertools.count()
+        self._waits = QueueWaitTracker(weights, window)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def room(self, prefetch: int) -> int:
+        """Events the store should read ahead to keep `prefetch` buffered"""
+        return max(0, prefetch - len(self._buffer))
+
+    async def push(self, stream: str, event: Event) -> None:
+        size = 0
+        if self.size_estimator is not None:
+            try:
+                size = await self.size_estimator(event)
+            except Exception:
+                # Unknown size counts as small; a broken event fails fast anyway
+                size = 0
+        self._buffer.append(ScheduledEvent(
+            stream=stream,
+            event=event,
+            weight=self.weights.get(stream, 1.0),
+            size=size,
+            produced_at=message_timestamp(event.id),
+            seq=next(self._seq)
+        ))
+
+    def score(self, item: ScheduledEvent, now: float) -> float:
+        age = max(0.0, now - item.produced_at)
+        return item.weight * (1 + age / self.aging_seconds) / (1 + item.size / self.reference_size)
+
+    def peek(self) -> Optional[ScheduledEvent]:
+        """Highest scoring buffered event, oldest first on ties"""
+        if not self._buffer:
+            return None
+        now = time.time()
+        return max(self._buffer, key=lambda item: (self.score(item, now), -item.seq))
+
+    def take(self, item: ScheduledEvent) -> Tuple[str, Event]:
+        self._buffer.remove(item)
+        self._waits.record(item.stream, time.time() - item.produced_at)
+        return item.stream, item.event
+
+    async def pop(self) -> Optional[Tuple[str, Event]]:
+        """Remove and return the next event to dispatch"""
+        best = self.peek()
+        return self.take(best) if best is not None else None
+
+    async def release(self, stream: str, event: Event) -> None:
+        """Called once a dispatched event has been handled"""
+
+    def queue_wait_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Time from produce to dispatch per stream over the recent window, in seconds"""
+        return self._waits.stats()
+
+class LocalTenantAccounting(TenantAccounting):
+    """
+    Per-tenant concurrency caps and token-per-minute quotas for a single
+    process. RedisTenantAccounting enforces the same limits across processes.
+    """
+    def __init__(
+        self,
+        concurrency_caps: Optional[Dict[str, int]] = None,
+        default_concurrency: Optional[int] = None,
+        tpm_quotas: Optional[Dict[str, int]] = None,
+        default_tpm: Optional[int] = None
+    ):
+        self.concurrency_caps = concurrency_caps or {}
+        self.default_concurrency = default_concurrency
+        self.tpm_quotas = tpm_quotas or {}
+        self.default_tpm = default_tpm
+        self._leases: Dict[str, set] = {}
+        self._minute_tokens: Dict[Tuple[str, int], int] = {}
+
+    async def try_acquire(self, tenant: str, lease_id: str, tokens: int) -> bool:
+        cap = self.concurrency_caps.get(tenant, self.default_concurrency)
+        leases = self._leases.setdefault(tenant, set())
+        if cap is not None and len(leases) >= cap:
+            return False
+
+        quota = self.tpm_quotas.get(tenant, self.default_tpm)
+        minute = int(time.time() // 60)
+        used = self._minute_tokens.get((tenant, minute), 0)
+        # A job larger than the whole quota still runs, alone in its minute
+        if quota is not None and used and used + tokens > quota:
+            return False
+
+        leases.add(lease_id)
+        self._minute_tokens = {k: v for k, v in self._minute_tokens.items() if k[1] >= minute}
+        self._minute_tokens[(tenant, minute)] = used + tokens
+        return True
+
+    async def release(self, tenant: str, lease_id: str) -> None:
+        self._leases.get(tenant, set()).discard(lease_id)
+
+class FairScheduler:
+    """
+    Deficit round robin across tenants, taken from `event.meta[tenant_key]`.
+
+    Each tenant has its own PriorityScheduler queue. When the round reaches a
+    tenant its deficit grows by `quantum` tokens, and it may dispatch while its
+    next event costs no more than the deficit, so tenants share dispatch
+    capacity in proportion to tokens rather than event count. Tenants held
+    back by their concurrency cap or token quota are skipped without credit.
+
+    Input streams are FIFO, so one tenant's backlog would fill a plain prefetch
+    buffer and leave nothing to reorder. Only `tenant_prefetch` events per
+    tenant count toward the store's prefetch: the store keeps reading past a
+    backlog until it finds other tenants' events, up to `lookahead` buffered
+    events in total.
+    """
+    def __init__(
+        self,
+        weights: Dict[str, float],
+        size_estimator: Optional[Callable[[Event], Awaitable[int]]] = None,
+        accounting: Optional[TenantAccounting] = None,
+        quantum: int = 8000,
+        tenant_key: str = 'tenant',
+        default_tenant: str = 'default',
+        lookahead: int = 1000,
+        tenant_prefetch: int = 2
+    ):
+        self.weights = weights
+        self.size_estimator = size_estimator
+        self.accounting = accounting or LocalTenantAccounting()
+        self.quantum = quantum
+        self.tenant_key = tenant_key
+        self.default_tenant = default_tenant
+        self.lookahead = lookahead
+        self.tenant_prefetch = tenant_prefetch
+        self._queues: Dict[str, PriorityScheduler] = {}
+        self._deficits: Dict[str, float] = {}
+        self._round: Deque[str] = deque()
+        self._credited = False
+        self._waits = QueueWaitTracker(weights)
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def room(self, prefetch: int) -> int:
+        """Events the store should read ahead, looking past single-tenant backlogs up to `lookahead`"""
+        counted = sum(min(len(q), self.tenant_prefetch) for q in self._queues.values())
+        return max(0, min(prefetch - counted, self.lookahead - len(self)))
+
+    def tenant_of(self, event: Event) -> str:
+        # A header field when the entry has one, so the payload need not be parsed for it
+        return event_header(event, self.tenant_key) or self.default_tenant
+
+    def cost(self, item: ScheduledEvent) -> int:
+        """Estimated tokens of a job; one quantum per event when sizes are unknown"""
+        if self.size_estimator is None:
+            return self.quantum
+        return max(1, item.size // 4)
+
+    async def push(self, stream: str, event: Event) -> None:
+        tenant = self.tenant_of(event)
+        queue = self._queues.get(tenant)
+        if queue is None:
+            queue = self._queues[tenant] = PriorityScheduler(self.weights, self.size_estimator)
+            self._deficits[tenant] = 0
+            self._round.append(tenant)
+        await queue.push(stream, event)
+
+    def _next_tenant(self) -> None:
+        self._round.rotate(-1)
+        self._credited = False
+
+    def _drop_tenant(self, tenant: str) -> None:
+        # Idle tenants lose their remaining credit, as in classic DRR
+        self._round.remove(tenant)
+        del self._queues[tenant]
+        del self._deficits[tenant]
+        self._credited = False
+
+    async def pop(self) -> Optional[Tuple[str, Event]]:
+        if not self._round:
+            return None
+        max_cost = max(self.cost(q.peek()) for q in self._queues.values())
+        # Enough visits for every tenant to collect the credit its next job needs
+        visits = len(self._round) * (max_cost // self.quantum + 2)
+        blocked = set()
+
+        for _ in range(visits):
+            if len(blocked) == len(self._round):
+                return None
+            tenant = self._round[0]
+            if tenant in blocked:
+                self._next_tenant()
+                continue
+            if not self._credited:
+                self._deficits[tenant] += self.quantum
+                self._credited = True
+
+            queue = self._queues[tenant]
+            head = queue.peek()
+            cost = self.cost(head)
+            if cost > self._deficits[tenant]:
+                self._next_tenant()
+                continue
+            if not await self.accounting.try_acquire(tenant, head.event.id, cost):
+                # Blocked tenants keep only the credit their next job needs
+                self._deficits[tenant] = min(self._deficits[tenant], max(cost, self.quantum))
+                blocked.add(tenant)
+                self._next_tenant()
+                continue
+
+            self._deficits[tenant] -= cost
+            stream, event = queue.take(head)
+            self._waits.record(stream, time.time() - head.produced_at)
+            if not len(queue):
+                self._drop_tenant(tenant)
+            return stream, event
+        return None
+
+    async def release(self, stream: str, event: Event) -> None:
+        await self.accounting.release(self.tenant_of(event), event.id)
+
+    def queue_wait_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Time from produce to dispatch per stream, across all tenants"""
+        return self._waits.stats()
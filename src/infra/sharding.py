@@ -0,0 +1,161 @@
+import time
+import zlib
+import itertools
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from redis.asyncio import Redis
+from infra.stream_event import event_header
+
+logger = logging.getLogger(__name__)
+
+def shard_stream(stream: str, shard: int) -> str:
+    """
+    Physical stream of one shard. The shard number is the hash tag, so in Redis
+    Cluster every logical stream's shard i, its retry set and its dead-letter
+    stream share a slot and can be read or pipelined together.
+    """
+    return f"{stream}:{{{shard}}}"
+
+def parse_shard_stream(name: str) -> Optional[Tuple[str, int]]:
+    """Logical stream and shard number of a physical shard stream, None for unsharded names"""
+    stream, sep, tag = name.rpartition(':{')
+    if not sep or not tag.endswith('}') or not tag[:-1].isdigit():
+        return None
+    return stream, int(tag[:-1])
+
+def hash_tag(key: str) -> str:
+    """What Redis Cluster hashes a key by: its first non-empty `{...}` tag, else the whole key"""
+    start = key.find('{')
+    end = key.find('}', start + 1) if start != -1 else -1
+    return key[start + 1:end] if end > start + 1 else key
+
+def group_by_slot(streams: Iterable[str]) -> List[List[str]]:
+    """Streams that share a Cluster slot by hash tag, and so can be read in one XREADGROUP call"""
+    groups: Dict[str, List[str]] = {}
+    for stream in streams:
+        groups.setdefault(hash_tag(stream), []).append(stream)
+    return list(groups.values())
+
+def shard_for(key: str, shards: int) -> int:
+    """Stable shard of a routing key; the same key always lands on the same shard"""
+    return zlib.crc32(key.encode()) % shards
+
+def assign_shards(members: Sequence[str], shards: int, member: str) -> List[int]:
+    """
+    Shards owned by `member` when `shards` are spread round robin over the sorted
+    live members. Every member computes the same split from the same view, so no
+    coordinator is needed; with more members than shards the extra ones idle.
+    """
+    ordered = sorted(members)
+    if member not in ordered:
+        return []
+    index = ordered.index(member)
+    return [shard for shard in range(shards) if shard % len(ordered) == index]
+
+def is_cluster(redis: Any) -> bool:
+    # Cluster pipelines cannot be transactions, so callers pick the pipeline mode from this
+    return type(redis).__name__ == 'RedisCluster'
+
+class ShardRouter:
+    """
+    Splits logical streams into `shards` hash-tagged streams.
+
+    With one client, which may be a RedisCluster, every shard lives on it and
+    Cluster spreads the shards over its nodes by hash tag. With several plain
+    Redis clients, shard i lives on `clients[i % len(clients)]`. Streams that
+    are not in `sharded` (the output stream, for instance) stay whole on the
+    first client.
+    """
+    def __init__(self, clients: Sequence[Redis], shards: int, sharded: Iterable[str], route_key: str = 'tenant'):
+        if not clients:
+            raise ValueError("ShardRouter needs at least one Redis client")
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.clients = list(clients)
+        self.shards = shards
+        self.sharded = set(sharded)
+        self.route_key = route_key
+        # Events without a routing key are spread evenly instead
+        self._round_robin = itertools.count()
+
+    @property
+    def primary(self) -> Redis:
+        return self.clients[0]
+
+    def client(self, stream: str) -> Redis:
+        """Redis holding a physical stream, or any key tagged like it"""
+        parsed = parse_shard_stream(stream)
+        if parsed is None:
+            return self.primary
+        return self.clients[parsed[1] % len(self.clients)]
+
+    def streams(self, stream: str, shards: Optional[Iterable[int]] = None) -> List[str]:
+        """Physical streams of a logical stream, for all or the given shards"""
+        if stream not in self.sharded:
+            return [stream]
+        return [shard_stream(stream, shard) for shard in (range(self.shards) if shards is None else shards)]
+
+    def expand(self, weights: Dict[str, float], shards: Optional[Iterable[int]] = None) -> Dict[str, float]:
+        """Scheduling weights per physical stream"""
+        shards = list(range(self.shards) if shards is None else shards)
+        return {
+            physical: weight
+            for stream, weight in weights.items()
+            for physical in self.streams(stream, shards)
+        }
+
+    def route(self, stream: str, event: Any) -> str:
+        """Physical stream for an event, by its `route_key` header or meta field when present"""
+        if stream not in self.sharded:
+            return stream
+        key = event_header(event, self.route_key)
+        shard = shard_for(str(key), self.shards) if key else next(self._round_robin) % self.shards
+        return shard_stream(stream, shard)
+
+    def group_by_client(self, streams: Iterable[str]) -> List[List[str]]:
+        """
+        Streams that can be read in one XREADGROUP call: on the same plain
+        Redis, or in the same Cluster slot (same shard).
+        """
+        if is_cluster(self.primary):
+            return group_by_slot(streams)
+        groups: Dict[Any, List[str]] = {}
+        for stream in streams:
+            groups.setdefault(id(self.client(stream)), []).append(stream)
+        return list(groups.values())
+
+class ShardAssigner:
+    """
+    Tracks live consumers in a zset scored by heartbeat time, on the router's
+    primary Redis. Members silent for `ttl` seconds count as gone, so shards
+    move to the remaining consumers when a worker joins, leaves or dies.
+    """
+    def __init__(self, redis: Redis, key: str, member: str, shards: int, ttl: float = 30.0):
+        self.redis = redis
+        self.key = key
+        self.member = member
+        self.shards = shards
+        self.ttl = ttl
+        self.assigned: List[int] = []
+
+    async def heartbeat(self) -> Tuple[List[int], List[int]]:
+        """Refresh membership and return the (gained, lost) shards since the last call"""
+        now = time.time()
+        async with self.redis.pipeline(transaction=not is_cluster(self.redis)) as pipe:
+            pipe.zadd(self.key, {self.member: now})
+            pipe.zremrangebyscore(self.key, '-inf', now - self.ttl)
+            pipe.zrange(self.key, 0, -1)
+            *_, members = await pipe.execute()
+        members = [m.decode() if isinstance(m, bytes) else m for m in members]
+        assigned = assign_shards(members, self.shards, self.member)
+        gained = sorted(set(assigned) - set(self.assigned))
+        lost = sorted(set(self.assigned) - set(assigned))
+        if gained or lost:
+            logger.info(f"{self.member} owns shards {assigned} of {self.shards} ({len(members)} consumers)")
+        self.assigned = assigned
+        return gained, lost
+
+    async def leave(self) -> None:
+        """Hand shards over right away instead of after the heartbeat ttl"""
+        await self.redis.zrem(self.key, self.member)
+        self.assigned = []
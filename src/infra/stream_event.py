@@ -0,0 +1,97 @@
+import json
+from typing import Any, Dict, Optional
+
+# Meta keys copied into plain stream entry fields on write, so consumers can
+# route and filter on them without parsing the JSON payload
+HEADER_KEYS = ('tenant', 'priority')
+
+_UNSET: Any = object()
+
+def header_fields(meta: Any, keys: tuple = HEADER_KEYS) -> Dict[str, str]:
+    """Header fields of an entry from the scalar values of `meta`"""
+    if not isinstance(meta, dict):
+        return {}
+    return {
+        key: str(meta[key])
+        for key in keys
+        if isinstance(meta.get(key), (str, int, float)) and not isinstance(meta[key], bool)
+    }
+
+def event_header(event: Any, key: str) -> Optional[str]:
+    """A header field of any event: from the entry fields of a StreamEvent, from `meta` otherwise"""
+    if isinstance(event, StreamEvent):
+        return event.header(key)
+    meta = getattr(event, 'meta', None)
+    value = meta.get(key) if isinstance(meta, dict) else None
+    return str(value) if value is not None else None
+
+class StreamEvent:
+    """
+    Event backed by the raw fields of a stream entry. The id and name are
+    decoded on construction; `data` and `meta` are parsed from the raw bytes on
+    first access, and header fields (tenant, priority) can be read without
+    parsing either. It can stand in for `Event` wherever those attributes are
+    read or assigned. `stream` is the stream the entry was read from, since
+    ids are unique only within one stream.
+    """
+    __slots__ = ('id', 'name', 'stream', 'fields', '_data', '_meta')
+
+    def __init__(self, message_id: bytes, fields: Dict[bytes, bytes], stream: Optional[str] = None):
+        self.id = message_id.decode()
+        self.name = fields[b'name'].decode()
+        self.stream = stream
+        self.fields = fields
+        self._data = _UNSET
+        self._meta = _UNSET
+
+    @property
+    def data(self) -> Any:
+        if self._data is _UNSET:
+            self._data = json.loads(self.fields[b'data'].decode())
+        return self._data
+
+    @data.setter
+    def data(self, value: Any) -> None:
+        self._data = value
+
+    @property
+    def meta(self) -> Any:
+        if self._meta is _UNSET:
+            raw = self.fields.get(b'meta')
+            self._meta = json.loads(raw.decode()) if raw is not None else None
+        return self._meta
+
+    @meta.setter
+    def meta(self, value: Any) -> None:
+        self._meta = value
+
+    @property
+    def timestamp(self) -> Optional[str]:
+        raw = self.fields.get(b'timestamp')
+        return raw.decode() if raw is not None else None
+
+    def header(self, key: str) -> Optional[str]:
+        """A header field, falling back to `meta[key]` for entries written without headers"""
+        raw = self.fields.get(key.encode())
+        if raw is not None:
+            return raw.decode()
+        meta = self.meta
+        value = meta.get(key) if isinstance(meta, dict) else None
+        return str(value) if value is not None else None
+
+    @property
+    def tenant(self) -> Optional[str]:
+        return self.header('tenant')
+
+    @property
+    def priority(self) -> Optional[str]:
+        return self.header('priority')
+
+    def decode(self) -> 'StreamEvent':
+        """Parse `data` and `meta` now, raising on malformed payloads"""
+        self.data
+        self.meta
+        return self
+
+    def __repr__(self) -> str:
+        return f"StreamEvent(id={self.id!r}, name={self.name!r})"
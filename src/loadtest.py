@@ -0,0 +1,323 @@
+"""Record production traffic into a trace file and replay it against a local Redis.
+
+    python src/loadtest.py record --minutes 60 --output trace.jsonl
+    python src/loadtest.py replay trace.jsonl --speed 10 --redis-db 15 --flush
+
+`--speed 10` replays arrivals ten times faster, i.e. 10x load against the same
+LLM latencies; add `--latency-scale 0.1` to fast-forward the whole recording.
+
+Recording reads the input streams with XRANGE, so it does not disturb consumers.
+LLM timings come from the `<service>:llm_calls` stream, written by workers
+running with LLM_TRACE_MAXLEN set. Replays use an in-memory FileStorage holding
+synthetic transcripts of the recorded sizes and a fake LLM that sleeps for
+latencies drawn from the recording.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import resource
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+import numpy as np
+from dotenv import load_dotenv
+from redis.asyncio import Redis
+from domain.constants import ServiceConfig
+from domain.handler.get_summary import get_summary
+from infra.core_types import Event
+from infra.memory import InMemoryFileStorage
+from infra.scheduler import message_timestamp
+
+LLM_CALLS_STREAM = f"{ServiceConfig.NAME}:llm_calls"
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+def rss_mb() -> float:
+    """Current resident set size, falling back to the peak where /proc is missing"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class Trace:
+    """Recorded events with arrival offsets and object sizes, plus recorded LLM calls"""
+    def __init__(self, events: List[Dict[str, Any]], llm_calls: List[Dict[str, Any]]):
+        self.events = sorted(events, key=lambda e: e['at'])
+        self.llm_calls = llm_calls
+
+    def save(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as out:
+            for event in self.events:
+                out.write(json.dumps({'type': 'event', **event}) + '\n')
+            for call in self.llm_calls:
+                out.write(json.dumps({'type': 'llm', **call}) + '\n')
+
+    @staticmethod
+    def load(path: str) -> 'Trace':
+        events, llm_calls = [], []
+        with open(path, encoding='utf-8') as trace:
+            for line in trace:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                kind = record.pop('type')
+                (events if kind == 'event' else llm_calls).append(record)
+        return Trace(events, llm_calls)
+
+class FakeMessages:
+    """
+    Stand-in for `client.messages` that answers in the shape each prompt asks
+    for and takes as long as a recorded call with the same max_tokens.
+    """
+    def __init__(self, llm_calls: List[Dict[str, Any]], latency_scale: float, seed: int):
+        self.latency_scale = latency_scale
+        self.rng = random.Random(seed)
+        self.by_max_tokens: Dict[Any, List[Dict[str, Any]]] = {}
+        for call in llm_calls:
+            self.by_max_tokens.setdefault(call.get('max_tokens'), []).append(call)
+        self.all_calls = llm_calls or [{'seconds': 10.0, 'input_tokens': 4000, 'output_tokens': 1500}]
+        self.calls = 0
+
+    def create(self, **kwargs) -> Any:
+        call = self.rng.choice(self.by_max_tokens.get(kwargs.get('max_tokens')) or self.all_calls)
+        self.calls += 1
+        time.sleep(call['seconds'] * self.latency_scale)
+
+        prompt = kwargs['messages'][-1]['content']
+        body = "Replayed analysis. " * max(1, (call.get('output_tokens') or 400) // 4)
+        if '<section id="' in prompt:
+            sections = prompt.count('<section id="')
+            text = '\n'.join(f'<analysis id="{i}">{body}</analysis>' for i in range(1, sections + 1))
+        elif '<guide>' in prompt:
+            text = f"<analysis>{body}</analysis>\n<guide>{body}</guide>"
+        else:
+            text = body
+        return SimpleNamespace(
+            content=[SimpleNamespace(type='text', text=text)],
+            usage=SimpleNamespace(input_tokens=call.get('input_tokens'), output_tokens=call.get('output_tokens'))
+        )
+
+class FakeAnthropicClient:
+    def __init__(self, llm_calls: List[Dict[str, Any]], latency_scale: float = 1.0, seed: int = 1):
+        self.messages = FakeMessages(llm_calls, latency_scale, seed)
+
+def synthetic_transcript(size: int, rng: np.random.Generator) -> bytes:
+    """Random words in paragraphs, so chunking and dedup see realistic shapes"""
+    vocabulary = np.array([f"word{i}" for i in range(5000)])
+    words = vocabulary[rng.integers(0, len(vocabulary), size=max(1, size // 8))]
+    paragraphs = [' '.join(words[i:i + 120]) for i in range(0, len(words), 120)]
+    return '\n\n'.join(paragraphs).encode('utf-8')[:size]
+
+async def record(args: argparse.Namespace) -> int:
+    from infra.minio import MinioFileStorage
+    redis = Redis(host=os.getenv('REDIS_HOST', 'localhost'), port=int(os.getenv('REDIS_PORT', 6379)))
+    storage = MinioFileStorage(
+        endpoint=os.getenv('MINIO_ENDPOINT', 'localhost:9000'),
+        access_key=os.getenv('MINIO_ACCESS_KEY', 'minioadmin'),
+        secret_key=os.getenv('MINIO_SECRET_KEY', 'minioadmin'),
+        bucket=os.getenv('MINIO_BUCKET', 'transcriptions'),
+        secure=os.getenv('MINIO_SECURE', 'False').lower() == 'true'
+    )
+    since = f"{int((time.time() - args.minutes * 60) * 1000)}-0"
+    streams = args.streams or [ServiceConfig.EVENT_NAME]
+    try:
+        events = []
+        for stream in streams:
+            for message_id, fields in await redis.xrange(stream, min=since, max='+', count=args.limit):
+                data = json.loads(fields[b'data'])
+                paths = [t['path'] for t in data if isinstance(t, dict) and 'path' in t]
+                stats = await asyncio.gather(*(storage.stat(p) for p in paths), return_exceptions=True)
+                events.append({
+                    'at': message_timestamp(message_id.decode()),
+                    'stream': stream,
+                    'data': data,
+                    'meta': json.loads(fields.get(b'meta', b'null')),
+                    'sizes': {p: s.size for p, s in zip(paths, stats) if not isinstance(s, Exception)},
+                })
+        start = min((e['at'] for e in events), default=0)
+        for event in events:
+            event['at'] = round(event['at'] - start, 3)
+
+        llm_calls = [
+            json.loads(fields[b'call'])
+            for _, fields in await redis.xrange(LLM_CALLS_STREAM, min=since, max='+')
+        ]
+        Trace(events, llm_calls).save(args.output)
+        print(f"Recorded {len(events)} events and {len(llm_calls)} LLM calls to {args.output}")
+        if not llm_calls:
+            print(f"No LLM timings found; run workers with LLM_TRACE_MAXLEN to fill {LLM_CALLS_STREAM}")
+        return 0
+    finally:
+        await redis.aclose()
+
+class ReplayMonitor:
+    """Per-second samples of backlog and memory, and per-event end-to-end latency"""
+    def __init__(self):
+        self.produced = 0
+        self.completed = 0
+        self.failed = 0
+        self.latencies: List[float] = []
+        self.samples: List[Dict[str, float]] = []
+        self.started = time.perf_counter()
+
+    def sample(self) -> None:
+        self.samples.append({
+            'seconds': time.perf_counter() - self.started,
+            'backlog': self.produced - self.completed - self.failed,
+            'rss_mb': rss_mb(),
+        })
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        seconds = np.array([s['seconds'] for s in self.samples] or [0.0])
+        backlog = np.array([s['backlog'] for s in self.samples] or [0.0])
+        # Least-squares slope of the backlog: > 0 means the consumer falls behind
+        growth = float(np.polyfit(seconds, backlog, 1)[0]) if len(self.samples) > 1 else 0.0
+        return {
+            'elapsed_seconds': round(elapsed, 1),
+            'produced': self.produced,
+            'completed': self.completed,
+            'failed': self.failed,
+            'throughput_per_second': round(self.completed / elapsed, 3) if elapsed else 0.0,
+            'latency_p50_seconds': round(percentile(self.latencies, 0.5), 2),
+            'latency_p95_seconds': round(percentile(self.latencies, 0.95), 2),
+            'max_backlog': int(backlog.max()),
+            'backlog_growth_per_second': round(growth, 4),
+            'peak_rss_mb': round(max((s['rss_mb'] for s in self.samples), default=rss_mb()), 1),
+        }
+
+async def replay(args: argparse.Namespace) -> int:
+    from summarizer import SummarizerMicroservice
+    trace = Trace.load(args.trace)
+    if args.limit:
+        trace.events = trace.events[:args.limit]
+    # The memory transport measures the pipeline alone, without the Redis round trips
+    redis = None
+    if args.transport == 'redis':
+        redis = Redis(
+            host=os.getenv('REDIS_HOST', 'localhost'),
+            port=int(os.getenv('REDIS_PORT', 6379)),
+            db=args.redis_db
+        )
+        if args.flush:
+            await redis.flushdb()
+        elif await redis.dbsize():
+            print(f"Redis db {args.redis_db} is not empty; pass --flush to clear it first")
+            await redis.aclose()
+            return 1
+
+    rng = np.random.default_rng(args.seed)
+    storage = InMemoryFileStorage()
+    for event in trace.events:
+        for path, size in event['sizes'].items():
+            if path not in storage.files:
+                await storage.write(path, synthetic_transcript(size, rng))
+
+    service = SummarizerMicroservice(redis, storage, FakeAnthropicClient(trace.llm_calls, args.latency_scale, args.seed))
+    monitor = ReplayMonitor()
+
+    async def handler(event: Any) -> Any:
+        try:
+            result = await get_summary(service.deps, event)
+            monitor.completed += 1
+            return result
+        except Exception:
+            monitor.failed += 1
+            raise
+        finally:
+            monitor.latencies.append(time.time() - message_timestamp(event.id))
+
+    async def produce() -> None:
+        started = time.perf_counter()
+        for event in trace.events:
+            delay = event['at'] / args.speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if redis is None:
+                await service.event_store.write_event(Event(
+                    id="", name=event['stream'], meta=event['meta'], data=event['data']
+                ))
+            else:
+                await redis.xadd(event['stream'], {
+                    'name': ServiceConfig.EVENT_NAME,
+                    'data': json.dumps(event['data']),
+                    'meta': json.dumps(event['meta']),
+                })
+            monitor.produced += 1
+
+    async def watch() -> None:
+        while True:
+            monitor.sample()
+            last = monitor.samples[-1]
+            if args.verbose:
+                print(f"t={last['seconds']:.0f}s backlog={last['backlog']} rss={last['rss_mb']:.0f}MB")
+            await asyncio.sleep(1)
+
+    consumer = asyncio.create_task(service.event_store.process_events(handler))
+    watcher = asyncio.create_task(watch())
+    try:
+        await produce()
+        deadline = time.perf_counter() + args.drain_timeout
+        while monitor.completed + monitor.failed < monitor.produced and time.perf_counter() < deadline:
+            if consumer.done():
+                break
+            await asyncio.sleep(0.5)
+    finally:
+        service.event_store.stop()
+        monitor.sample()
+        watcher.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+        if redis is not None:
+            await redis.aclose()
+
+    report = monitor.report()
+    report['speed'] = args.speed
+    report['transport'] = args.transport
+    report['llm_calls'] = service.deps.anthropic_client.messages.calls
+    print(json.dumps(report, indent=2))
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as out:
+            json.dump({'report': report, 'samples': monitor.samples}, out, indent=2)
+    return 0
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Record and replay event traffic")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    rec = commands.add_parser('record', help="Write recent events and LLM timings to a trace file")
+    rec.add_argument('--output', default='trace.jsonl')
+    rec.add_argument('--minutes', type=float, default=60, help="How far back to record")
+    rec.add_argument('--streams', nargs='+', help=f"Input streams (default: {ServiceConfig.EVENT_NAME})")
+    rec.add_argument('--limit', type=int, help="At most this many events per stream")
+
+    rep = commands.add_parser('replay', help="Replay a trace against a local Redis")
+    rep.add_argument('trace')
+    rep.add_argument('--speed', type=float, default=1.0, help="Arrival rate multiplier, e.g. 10 for 10x load")
+    rep.add_argument('--latency-scale', type=float, default=1.0, help="Multiplier on recorded LLM latencies")
+    rep.add_argument('--transport', choices=['redis', 'memory'], default='redis',
+                     help="memory replays through in-process queues to isolate the Redis overhead")
+    rep.add_argument('--redis-db', type=int, default=15, help="Redis database used for the replay")
+    rep.add_argument('--flush', action='store_true', help="Clear the replay database first")
+    rep.add_argument('--limit', type=int, help="Replay only the first N events")
+    rep.add_argument('--drain-timeout', type=float, default=300, help="Seconds to wait for the backlog after the last event")
+    rep.add_argument('--report', help="Also write the report and samples to this JSON file")
+    rep.add_argument('--seed', type=int, default=1)
+    rep.add_argument('--verbose', action='store_true')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point for the load harness"""
+    load_dotenv()
+    args = parse_args(argv)
+    sys.exit(asyncio.run(record(args) if args.command == 'record' else replay(args)))
+
+if __name__ == "__main__":
+    main()
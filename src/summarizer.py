@@ -1,15 +1,128 @@
 import os
+import json
+import time
+import signal
 import asyncio
-from typing import Any
+from pathlib import Path
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 from dotenv import load_dotenv
 from redis.asyncio import Redis
-import anthropic
+from redis.asyncio.cluster import RedisCluster
 from domain.constants import ServiceConfig
+from infra.archive import StreamArchiver
 from infra.core_types import FileStorage
-from infra.minio import MinioFileStorage
+from infra.dead_letter import RetryPolicy
+from infra.local import LocalFileStorage
+from infra.memory import InMemoryEventStore
 from infra.redis import RedisEventStore
+from infra.profiling import EventProfiler
+from infra.sharding import ShardRouter, is_cluster
+from infra.redis_state import (
+    RedisCheckpointStore, RedisBoilerplateIndex, RedisTenantAccounting, RedisResultCache, RedisUsageTotals
+)
+from infra.scheduler import FairScheduler, LocalTenantAccounting
 from domain.handler.get_summary import get_summary
+from domain.micro_batcher import AnalysisMicroBatcher
+from domain.dedup import ChunkDeduplicator
+from domain.normalizer import TranscriptNormalizer
+from domain.extractive import ExtractiveCompressor
+from domain.planner import PipelinePlanner
+from domain.sizing import estimate_event_size
 from domain.dependencies import Dependencies
+from domain.llm import CallExecutor, CallSettings
+
+def parse_mapping(value: str, cast: Callable[[str], Any] = float, default: Any = 1.0) -> Optional[Dict[str, Any]]:
+    """Parse 'name=value,name=value' settings such as stream weights or tenant caps"""
+    mapping = {}
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        name, _, raw = item.partition('=')
+        mapping[name.strip()] = cast(raw) if raw else default
+    return mapping or None
+
+def optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+def build_file_storage(backend: str) -> FileStorage:
+    """MinIO by default; `local` serves a directory shared with the producers, e.g. an NFS mount"""
+    if backend == 'local':
+        return LocalFileStorage(
+            root=os.getenv('LOCAL_STORAGE_ROOT', ServiceConfig.LOCAL_STORAGE_ROOT),
+            use_mmap=os.getenv('LOCAL_STORAGE_MMAP', 'True').lower() == 'true'
+        )
+    if backend != 'minio':
+        raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+    # Imported here so local-storage workers never pay for the SDK
+    from infra.minio import MinioFileStorage
+    return MinioFileStorage(
+        endpoint=os.getenv('MINIO_ENDPOINT', 'localhost:9000'),
+        access_key=os.getenv('MINIO_ACCESS_KEY', 'minioadmin'),
+        secret_key=os.getenv('MINIO_SECRET_KEY', 'minioadmin'),
+        bucket=os.getenv('MINIO_BUCKET', 'transcriptions'),
+        secure=os.getenv('MINIO_SECURE', 'False').lower() == 'true',
+        ensure_bucket=False
+    )
+
+def tenant_prefilter(tenants: str, tenant_key: str) -> Optional[Callable[[Any], bool]]:
+    """
+    Prefilter dropping entries of the listed tenants, e.g. suspended ones, by
+    their header field. Dropped entries are acknowledged, so no consumer of the
+    group handles them.
+    """
+    dropped = {tenant.strip() for tenant in tenants.split(',') if tenant.strip()}
+    if not dropped:
+        return None
+    return lambda event: event.header(tenant_key) not in dropped
+
+def http_transport_config() -> Any:
+    """Pool limits, keep-alive, HTTP/2 and per-phase timeouts of the Anthropic client, from HTTP_* settings"""
+    from infra.http_transport import HttpTransportConfig
+    defaults = HttpTransportConfig()
+    return HttpTransportConfig(
+        max_connections=int(os.getenv('HTTP_MAX_CONNECTIONS', defaults.max_connections)),
+        max_keepalive_connections=int(os.getenv('HTTP_MAX_KEEPALIVE', defaults.max_keepalive_connections)),
+        keepalive_expiry=float(os.getenv('HTTP_KEEPALIVE_EXPIRY', defaults.keepalive_expiry)),
+        http2=os.getenv('HTTP2', 'False').lower() == 'true',
+        connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', defaults.connect_timeout)),
+        read_timeout=float(os.getenv('HTTP_READ_TIMEOUT', defaults.read_timeout)),
+        write_timeout=float(os.getenv('HTTP_WRITE_TIMEOUT', defaults.write_timeout)),
+        pool_timeout=float(os.getenv('HTTP_POOL_TIMEOUT', defaults.pool_timeout))
+    )
+
+def build_anthropic_client() -> Tuple[Any, Any]:
+    """The Anthropic client on a shared, monitored connection pool, and the pool's monitor"""
+    # The SDK takes a large share of import time, so it loads on a worker thread during startup
+    import anthropic
+    from infra.http_transport import PoolMonitor, build_http_client
+    monitor = PoolMonitor()
+    client = anthropic.Client(
+        api_key=os.getenv('ANTHROPIC_API_KEY'),
+        http_client=build_http_client(http_transport_config(), monitor)
+    )
+    return client, monitor
+
+def ping_anthropic(client: Any) -> None:
+    """Open a pooled connection to the API; any HTTP answer means it is reachable"""
+    import anthropic
+    import httpx
+    try:
+        client.with_options(max_retries=0, timeout=10).get('/v1/models', cast_to=httpx.Response)
+    except anthropic.APIStatusError:
+        pass
+
+async def warm_up(name: str, ping: Callable[[], Awaitable[Any]], connections: int) -> bool:
+    """Run `connections` pings at once so the pool holds that many open connections"""
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(ping() for _ in range(connections)))
+    except Exception as e:
+        print(f"Warm-up of {name} failed: {e}")
+        return False
+    print(f"Warmed up {connections} {name} connections in {time.perf_counter() - started:.2f}s")
+    return True
 
 class SummarizerMicroservice:
     """
@@ -18,58 +131,380 @@ class SummarizerMicroservice:
     """
     @staticmethod
     async def create() -> 'SummarizerMicroservice':
-        """Factory method to create and initialize the microservice"""
+        """
+        Factory method to create and initialize the microservice.
+        Clients are built and their connection pools warmed concurrently; SDK
+        imports and blocking calls run on worker threads, off the event loop.
+        """
         load_dotenv()
-        
-        redis = Redis(
-            host=os.getenv('REDIS_HOST', 'localhost'),
-            port=int(os.getenv('REDIS_PORT', 6379))
-        )
-        
-        file_storage = MinioFileStorage(
-            endpoint=os.getenv('MINIO_ENDPOINT', 'localhost:9000'),
-            access_key=os.getenv('MINIO_ACCESS_KEY', 'minioadmin'),
-            secret_key=os.getenv('MINIO_SECRET_KEY', 'minioadmin'),
-            bucket=os.getenv('MINIO_BUCKET', 'transcriptions'),
-            secure=os.getenv('MINIO_SECURE', 'False').lower() == 'true'
+        loop = asyncio.get_running_loop()
+        connections = int(os.getenv('CONCURRENCY', ServiceConfig.CONCURRENCY)) + 1
+
+        # The memory transport runs without Redis; events are written through service.event_store
+        redis = None
+        if os.getenv('EVENT_TRANSPORT', ServiceConfig.EVENT_TRANSPORT) == 'redis':
+            # Cluster spreads shard streams over its nodes by hash tag
+            client = RedisCluster if os.getenv('REDIS_CLUSTER', 'False').lower() == 'true' else Redis
+            redis = client(
+                host=os.getenv('REDIS_HOST', 'localhost'),
+                port=int(os.getenv('REDIS_PORT', 6379))
+            )
+        file_storage, (anthropic_client, http_monitor), _ = await asyncio.gather(
+            loop.run_in_executor(None, build_file_storage, os.getenv('STORAGE_BACKEND', ServiceConfig.STORAGE_BACKEND)),
+            loop.run_in_executor(None, build_anthropic_client),
+            warm_up("Redis", redis.ping, connections) if redis is not None else asyncio.sleep(0)
         )
-        
-        anthropic_client = anthropic.Client(
-            api_key=os.getenv('ANTHROPIC_API_KEY')
+        # A failed warm-up is not fatal: start() waits until every dependency answers
+        await asyncio.gather(
+            warm_up("storage", file_storage.ping, connections),
+            warm_up(
+                "Anthropic",
+                partial(loop.run_in_executor, None, ping_anthropic, anthropic_client),
+                int(os.getenv('HTTP_WARM_CONNECTIONS', connections))
+            )
         )
-        
-        return SummarizerMicroservice(redis, file_storage, anthropic_client)
+        return SummarizerMicroservice(redis, file_storage, anthropic_client, http_monitor)
 
     def __init__(
         self,
-        redis: Redis,
+        redis: Optional[Redis],
         file_storage: FileStorage,
-        anthropic_client: Any
+        anthropic_client: Any,
+        http_monitor: Optional[Any] = None
     ):
+        """
+        Without a Redis client the service runs in-process: events go through an
+        InMemoryEventStore, and the Redis-backed state is turned off or kept
+        local. That covers checkpoints, the boilerplate index, the result cache,
+        archiving and the LLM trace.
+        """
         self.redis = redis
-        self.event_store = RedisEventStore(
-            redis=redis,
-            event_name=ServiceConfig.EVENT_NAME,
-            service_name=ServiceConfig.NAME
+        self.http_monitor = http_monitor
+        llm_total_timeout = os.getenv('LLM_TOTAL_TIMEOUT')
+        # API calls get threads of their own, one per pooled connection, off the default executor
+        self.llm_executor = CallExecutor(http_transport_config().max_connections)
+        # Passed to every call through Deps, so services sharing a process keep their own
+        self.llm_settings = CallSettings(
+            executor=self.llm_executor,
+            total_timeout=float(llm_total_timeout) if llm_total_timeout else None
+        )
+        # Set once every dependency answered; READY_FILE mirrors it for exec readiness probes
+        self.ready = asyncio.Event()
+        self.ready_file = os.getenv('READY_FILE')
+        concurrency = int(os.getenv('CONCURRENCY', ServiceConfig.CONCURRENCY))
+        priority_streams = parse_mapping(
+            os.getenv('PRIORITY_STREAMS', ServiceConfig.PRIORITY_STREAMS)
+        ) or {ServiceConfig.EVENT_NAME: 1.0}
+        size_estimator = partial(estimate_event_size, file_storage)
+
+        # STREAM_SHARDS splits each input stream into hash-tagged shard streams, on this
+        # Redis (or Cluster) and the extra instances listed in REDIS_SHARD_URLS
+        self.router = None
+        shards = int(os.getenv('STREAM_SHARDS', 0))
+        if redis is not None and shards > 0:
+            self.router = ShardRouter(
+                clients=[redis, *(
+                    Redis.from_url(url.strip())
+                    for url in os.getenv('REDIS_SHARD_URLS', '').split(',')
+                    if url.strip()
+                )],
+                shards=shards,
+                sharded=priority_streams,
+                route_key=os.getenv('SHARD_KEY', ServiceConfig.TENANT_KEY)
+            )
+        scheduler_weights = self.router.expand(priority_streams) if self.router else priority_streams
+        scheduler = None
+        prefetch = optional_int('PREFETCH')
+        if os.getenv('TENANT_FAIR_QUEUING', 'False').lower() == 'true':
+            tenant_limits = dict(
+                concurrency_caps=parse_mapping(os.getenv('TENANT_CONCURRENCY_CAPS', ''), int),
+                default_concurrency=optional_int('TENANT_CONCURRENCY'),
+                tpm_quotas=parse_mapping(os.getenv('TENANT_TPM_QUOTAS', ''), int),
+                default_tpm=optional_int('TENANT_TPM')
+            )
+            scheduler = FairScheduler(
+                scheduler_weights,
+                size_estimator=size_estimator,
+                tenant_key=os.getenv('TENANT_KEY', ServiceConfig.TENANT_KEY),
+                lookahead=int(os.getenv('TENANT_LOOKAHEAD', ServiceConfig.TENANT_LOOKAHEAD)),
+                accounting=RedisTenantAccounting(
+                    redis=redis,
+                    prefix=f"{ServiceConfig.NAME}:tenant",
+                    **tenant_limits
+                ) if redis is not None else LocalTenantAccounting(**tenant_limits)
+            )
+            # Counted per tenant; the scheduler reads on past a backlog up to TENANT_LOOKAHEAD
+            prefetch = prefetch or concurrency * 4
+
+        # With archiving on, the archiver trims streams once entries are safely in storage;
+        # otherwise STREAM_MAXLEN / STREAM_MAX_AGE_MS trim on write and old entries are lost
+        archive_max_age_ms = optional_int('ARCHIVE_MAX_AGE_MS')
+        archive_max_entries = optional_int('ARCHIVE_MAX_ENTRIES')
+        self.archiver = None
+        archiving = archive_max_age_ms is not None or archive_max_entries is not None
+        if archiving and self.router is not None and len(self.router.clients) > 1:
+            print("Archiving is not supported across several Redis instances; set ARCHIVE_* on a single Redis or Cluster")
+        elif redis is not None and archiving:
+            self.archiver = StreamArchiver(
+                redis=redis,
+                file_storage=file_storage,
+                streams=[*scheduler_weights, ServiceConfig.OUTPUT_EVENT_NAME],
+                max_age_ms=archive_max_age_ms,
+                max_entries=archive_max_entries,
+                prefix=os.getenv('ARCHIVE_PREFIX', ServiceConfig.ARCHIVE_PREFIX),
+                interval=int(os.getenv('ARCHIVE_INTERVAL_SECONDS', ServiceConfig.ARCHIVE_INTERVAL_SECONDS))
+            )
+
+        retry_policy = RetryPolicy(
+            max_attempts=int(os.getenv('MAX_ATTEMPTS', ServiceConfig.MAX_ATTEMPTS)),
+            base_delay_ms=int(os.getenv('RETRY_BASE_DELAY_MS', ServiceConfig.RETRY_BASE_DELAY_MS))
         )
+        if redis is None:
+            self.event_store = InMemoryEventStore(
+                event_name=ServiceConfig.EVENT_NAME,
+                concurrency=concurrency,
+                priority_streams=priority_streams,
+                size_estimator=size_estimator,
+                prefetch=prefetch,
+                scheduler=scheduler,
+                maxsize=int(os.getenv('MEMORY_QUEUE_SIZE', ServiceConfig.MEMORY_QUEUE_SIZE)),
+                retry_policy=retry_policy
+            )
+        else:
+            self.event_store = RedisEventStore(
+                redis=redis,
+                event_name=ServiceConfig.EVENT_NAME,
+                service_name=ServiceConfig.NAME,
+                claim_idle_ms=int(os.getenv('CLAIM_IDLE_MS', ServiceConfig.CLAIM_IDLE_MS)),
+                concurrency=concurrency,
+                priority_streams=priority_streams,
+                size_estimator=size_estimator,
+                prefetch=prefetch,
+                scheduler=scheduler,
+                maxlen=None if self.archiver else optional_int('STREAM_MAXLEN'),
+                max_age_ms=None if self.archiver else optional_int('STREAM_MAX_AGE_MS'),
+                retry_policy=retry_policy,
+                router=self.router,
+                prefilter=tenant_prefilter(
+                    os.getenv('DROP_TENANTS', ''),
+                    os.getenv('TENANT_KEY', ServiceConfig.TENANT_KEY)
+                )
+            )
+        batch_tokens = int(os.getenv('ANALYSIS_BATCH_TOKENS', ServiceConfig.ANALYSIS_BATCH_TOKENS))
+        dedup_threshold = float(os.getenv('DEDUP_THRESHOLD', ServiceConfig.DEDUP_THRESHOLD))
+        extractive_ratio = float(os.getenv('EXTRACTIVE_RATIO', ServiceConfig.EXTRACTIVE_RATIO))
+        normalize_steps = [
+            step.strip()
+            for step in os.getenv('NORMALIZE_STEPS', ServiceConfig.NORMALIZE_STEPS).split(',')
+            if step.strip()
+        ]
+        # Per-tenant, per-day token totals, written in batches
+        self.usage_totals = RedisUsageTotals(
+            redis=redis,
+            prefix=f"{ServiceConfig.NAME}:usage",
+            interval=float(os.getenv('USAGE_FLUSH_SECONDS', ServiceConfig.USAGE_FLUSH_SECONDS)),
+            ttl=int(os.getenv('USAGE_TTL_DAYS', ServiceConfig.USAGE_TTL_DAYS)) * 24 * 60 * 60
+        ) if redis is not None and os.getenv('USAGE_TOTALS', 'True').lower() == 'true' else None
         self.deps = Dependencies(
             file_storage=file_storage,
             anthropic_client=anthropic_client,
-            event_store=self.event_store
+            event_store=self.event_store,
+            checkpoint_store=RedisCheckpointStore(
+                redis=redis,
+                prefix=f"{ServiceConfig.NAME}:checkpoint"
+            ) if redis is not None else None,
+            analysis_batcher=AnalysisMicroBatcher(
+                anthropic_client=anthropic_client,
+                token_budget=batch_tokens,
+                max_linger=int(os.getenv('ANALYSIS_BATCH_LINGER_MS', ServiceConfig.ANALYSIS_BATCH_LINGER_MS)) / 1000,
+                llm_settings=self.llm_settings
+            ) if batch_tokens > 0 else None,
+            deduplicator=ChunkDeduplicator(
+                boilerplate_index=RedisBoilerplateIndex(
+                    redis=redis,
+                    key=f"{ServiceConfig.NAME}:boilerplate"
+                ) if redis is not None else None,
+                threshold=dedup_threshold
+            ) if dedup_threshold > 0 else None,
+            normalizer=TranscriptNormalizer(normalize_steps) if normalize_steps else None,
+            compressor=ExtractiveCompressor(
+                ratio=extractive_ratio,
+                min_tokens=int(os.getenv('EXTRACTIVE_MIN_TOKENS', ServiceConfig.EXTRACTIVE_MIN_TOKENS))
+            ) if extractive_ratio > 0 else None,
+            planner=PipelinePlanner(
+                parallelism=int(os.getenv('ANALYSIS_PARALLELISM', ServiceConfig.ANALYSIS_PARALLELISM)),
+                fan_in=int(os.getenv('MERGE_FAN_IN', ServiceConfig.MERGE_FAN_IN))
+            ) if os.getenv('PIPELINE_PLANNER', 'True').lower() == 'true' else None,
+            result_cache=RedisResultCache(
+                redis=redis,
+                prefix=f"{ServiceConfig.NAME}:result",
+                ttl=int(os.getenv('RESULT_CACHE_TTL_SECONDS', ServiceConfig.RESULT_CACHE_TTL_SECONDS)),
+                max_entries=int(os.getenv('RESULT_CACHE_MAX_ENTRIES', ServiceConfig.RESULT_CACHE_MAX_ENTRIES))
+            ) if redis is not None and os.getenv('RESULT_CACHE', 'True').lower() == 'true' else None,
+            deadline_policy=os.getenv('DEADLINE_POLICY', ServiceConfig.DEADLINE_POLICY),
+            incremental=os.getenv('INCREMENTAL', 'False').lower() == 'true',
+            usage_totals=self.usage_totals,
+            summary_prefix=os.getenv('SUMMARY_OUTPUT_PREFIX') or None,
+            llm_settings=self.llm_settings
+        )
+
+        # Timings and token counts of every LLM call, for load test recordings
+        self.llm_trace_maxlen = optional_int('LLM_TRACE_MAXLEN')
+        self._trace_writes: set = set()
+        if self.llm_trace_maxlen and redis is not None:
+            self.llm_settings.observers.append(self.record_llm_call)
+
+        # Per-event memory and CPU reports, and cProfile captures triggered by
+        # SIGUSR2 or a message to <service>:profile; the handler is not wrapped when both are off
+        self.profile_capture = os.getenv('PROFILE_CAPTURE', 'False').lower() == 'true'
+        self.profile_maxlen = int(os.getenv('PROFILE_MAXLEN', ServiceConfig.PROFILE_MAXLEN))
+        self.profiler = None
+        track_events = os.getenv('PROFILE_EVENTS', 'False').lower() == 'true'
+        if track_events or self.profile_capture:
+            self.profiler = EventProfiler(
+                file_storage=file_storage,
+                track_events=track_events,
+                top_sites=int(os.getenv('PROFILE_TOP_SITES', ServiceConfig.PROFILE_TOP_SITES)),
+                capture_events=int(os.getenv('PROFILE_CAPTURE_EVENTS', ServiceConfig.PROFILE_CAPTURE_EVENTS)),
+                prefix=os.getenv('PROFILE_PREFIX', ServiceConfig.PROFILE_PREFIX),
+                name=ServiceConfig.NAME,
+                report=self.record_profile
+            )
+
+    def record_llm_call(self, call: Dict[str, Any]) -> None:
+        """Append a call to the capped LLM trace stream without waiting for Redis"""
+        task = asyncio.create_task(self.redis.xadd(
+            f"{ServiceConfig.NAME}:llm_calls",
+            {'call': json.dumps(call)},
+            maxlen=self.llm_trace_maxlen,
+            approximate=True
+        ))
+        self._trace_writes.add(task)
+        task.add_done_callback(self._trace_writes.discard)
+
+    def record_profile(self, stats: Dict[str, Any]) -> None:
+        """Print an event's profile and keep it in a capped stream for later inspection"""
+        print(
+            f"Profile {stats['event_id']}: {stats['seconds']}s wall, {stats['cpu_seconds']}s CPU, "
+            f"traced peak {stats['traced_peak_mb']}MB, max RSS {stats['max_rss_mb']}MB "
+            f"(+{stats['max_rss_growth_mb']}MB), {stats['concurrent']} concurrent"
         )
+        if self.redis is None:
+            return
+        task = asyncio.create_task(self.redis.xadd(
+            f"{ServiceConfig.NAME}:profiles",
+            {'profile': json.dumps(stats)},
+            maxlen=self.profile_maxlen,
+            approximate=True
+        ))
+        self._trace_writes.add(task)
+        task.add_done_callback(self._trace_writes.discard)
+
+    async def report_queue_waits(self, interval: float = 60.0) -> None:
+        """Periodically print produce-to-dispatch wait per priority stream"""
+        while True:
+            await asyncio.sleep(interval)
+            for stream, stats in self.event_store.queue_wait_stats().items():
+                if stats['count']:
+                    print(
+                        f"Queue wait {stream}: mean {stats['mean']:.1f}s, "
+                        f"p95 {stats['p95']:.1f}s, max {stats['max']:.1f}s over {stats['count']} events"
+                    )
+
+    async def report_http_pool(self, interval: float = 60.0) -> None:
+        """Periodically print the Anthropic connection pool's use and churn, and the API call threads"""
+        while True:
+            await asyncio.sleep(interval)
+            stats = self.http_monitor.stats()
+            print(
+                f"HTTP pool: {stats['active']} active, {stats['idle']} idle, {stats['waiting']} waiting "
+                f"(max {stats['max_connections']}); {stats['requests']} requests opened "
+                f"{stats['connections_opened']} connections, {stats['tls_handshakes']} TLS handshakes"
+            )
+            threads = self.llm_executor.stats()
+            print(f"LLM threads: {threads['running']} running, {threads['queued']} queued (max {threads['threads']})")
+
+    async def check_dependencies(self) -> Dict[str, bool]:
+        """Whether Redis, file storage and the Anthropic API each answer right now"""
+        loop = asyncio.get_running_loop()
+        checks = {
+            'storage': self.deps.file_storage.ping(),
+            'anthropic': loop.run_in_executor(None, ping_anthropic, self.deps.anthropic_client),
+        }
+        if self.redis is not None:
+            checks['redis'] = self.redis.ping()
+        if self.router is not None:
+            for i, client in enumerate(self.router.clients[1:], 1):
+                checks[f'redis_shard_{i}'] = client.ping()
+        results = await asyncio.gather(*checks.values(), return_exceptions=True)
+        return {name: not isinstance(result, BaseException) for name, result in zip(checks, results)}
+
+    async def wait_until_ready(self, interval: float = 5.0) -> None:
+        """Block until every dependency is reachable, then raise the readiness signal"""
+        while True:
+            status = await self.check_dependencies()
+            if all(status.values()):
+                break
+            print(f"Waiting for {', '.join(name for name, ok in status.items() if not ok)}...")
+            await asyncio.sleep(interval)
+        self.ready.set()
+        if self.ready_file:
+            Path(self.ready_file).touch()
+        print(f"{ServiceConfig.NAME} service is ready")
+
+    def _clear_ready(self) -> None:
+        self.ready.clear()
+        if self.ready_file:
+            Path(self.ready_file).unlink(missing_ok=True)
 
     async def start(self) -> None:
         """Main execution loop of the summarizer service"""
+        reporter = asyncio.create_task(self.report_queue_waits())
+        pool_reporter = asyncio.create_task(self.report_http_pool()) if self.http_monitor else None
+        archiver = asyncio.create_task(self.archiver.run()) if self.archiver else None
+        usage_writer = asyncio.create_task(self.usage_totals.run()) if self.usage_totals else None
+        handler = lambda event: get_summary(self.deps, event)
+        profile_control = None
+        if self.profiler is not None:
+            self.profiler.start()
+            handler = self.profiler.wrap(handler)
+            if self.profile_capture:
+                asyncio.get_running_loop().add_signal_handler(signal.SIGUSR2, self.profiler.request_capture)
+                # Cluster clients have no pub/sub here; use the signal there
+                if self.redis is not None and not is_cluster(self.redis):
+                    profile_control = asyncio.create_task(
+                        self.profiler.listen(self.redis, f"{ServiceConfig.NAME}:profile")
+                    )
         try:
             print(f"Starting {ServiceConfig.NAME} service...")
-            await self.event_store.process_events(
-                lambda event: get_summary(self.deps, event)
-            )
+            await self.wait_until_ready()
+            await self.event_store.process_events(handler)
         except Exception as e:
             print(f"Fatal error in {ServiceConfig.NAME} service: {e}")
             raise
         finally:
-            await self.redis.aclose()
+            self._clear_ready()
+            reporter.cancel()
+            if pool_reporter:
+                pool_reporter.cancel()
+            if archiver:
+                self.archiver.stop()
+                archiver.cancel()
+            if profile_control:
+                profile_control.cancel()
+            if usage_writer:
+                usage_writer.cancel()
+                try:
+                    await self.usage_totals.flush()
+                except Exception as e:
+                    print(f"Failed to flush token usage: {e}")
+            if self.profiler is not None:
+                await self.profiler.flush()
+            if self.router is not None:
+                for client in self.router.clients[1:]:
+                    await client.aclose()
+            if self.redis is not None:
+                await self.redis.aclose()
 
 def main():
     """Entry point for the summarizer microservice"""
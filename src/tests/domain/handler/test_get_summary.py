@@ -12,7 +12,19 @@ def mock_deps():
     return Mock(
         file_storage=AsyncMock(),
         anthropic_client=Mock(messages=AsyncMock()),
-        event_store=AsyncMock()
+        event_store=AsyncMock(),
+        checkpoint_store=None,
+        analysis_batcher=None,
+        deduplicator=None,
+        normalizer=None,
+        planner=None,
+        result_cache=None,
+        compressor=None,
+        deadline_policy=None,
+        incremental=False,
+        usage_totals=None,
+        summary_prefix=None,
+        llm_settings=None
     )
 
 @pytest.fixture
@@ -193,3 +205,417 @@ async def test_get_summary_utf8_decode_error(mock_deps, valid_event):
 
     with pytest.raises(UnicodeDecodeError):
         await get_summary(mock_deps, valid_event)
+
+@pytest.mark.asyncio
+async def test_get_summary_resumes_from_checkpoint(mock_deps):
+    event = TranscriptionCreatedEvent(
+        name="transcriptions_created",
+        data=[{"title": "Talk", "path": "test/path.txt"}],
+        id="1-0"
+    )
+    mock_deps.file_storage.read.return_value = b"First paragraph\n\n" + b"x" * 20000
+    mock_deps.anthropic_client.messages = Mock()
+    mock_deps.anthropic_client.messages.create.return_value = Mock(content=[Mock(text="Fresh")])
+    mock_deps.checkpoint_store = AsyncMock()
+    mock_deps.checkpoint_store.load.return_value = {"analysis:0:0": "Saved analysis"}
+
+    result = await get_summary(mock_deps, event)
+
+    # Only the second chunk and the guide are requested again
+    assert mock_deps.anthropic_client.messages.create.call_count == 2
+    assert "Saved analysis" in result.data['summary']
+    saved_steps = [c.args[1] for c in mock_deps.checkpoint_store.save.call_args_list]
+    assert saved_steps == ["analysis:0:1", "guide"]
+    key = mock_deps.checkpoint_store.load.call_args.args[0]
+    assert key.startswith("1-0:")
+    mock_deps.checkpoint_store.complete.assert_called_once_with(key)
+
+@pytest.mark.asyncio
+async def test_events_sharing_an_id_do_not_share_checkpoints(mock_deps):
+    from domain.handler.get_summary import checkpoint_key
+    first = TranscriptionCreatedEvent(name="transcriptions_created", data=[{"title": "A", "path": "a.txt"}], id="1-0")
+    other = TranscriptionCreatedEvent(name="transcriptions_created", data=[{"title": "B", "path": "b.txt"}], id="1-0")
+    redelivered = TranscriptionCreatedEvent(name="transcriptions_created", data=[{"title": "A", "path": "a.txt"}], id="1-0")
+
+    assert checkpoint_key(first) != checkpoint_key(other)
+    assert checkpoint_key(first) == checkpoint_key(redelivered)
+    assert checkpoint_key(TranscriptionCreatedEvent(name="transcriptions_created", data=[])) is None
+
+@pytest.mark.asyncio
+async def test_get_summary_skips_guide_from_checkpoint(mock_deps):
+    event = TranscriptionCreatedEvent(
+        name="transcriptions_created",
+        data=[{"title": "Talk", "path": "test/path.txt"}],
+        id="1-0"
+    )
+    mock_deps.file_storage.read.return_value = b"Short content"
+    mock_deps.anthropic_client.messages = Mock()
+    mock_deps.checkpoint_store = AsyncMock()
+    mock_deps.checkpoint_store.load.return_value = {
+        "analysis:0:0": "Saved analysis",
+        "guide": "Saved guide"
+    }
+
+    result = await get_summary(mock_deps, event)
+
+    mock_deps.anthropic_client.messages.create.assert_not_called()
+    assert "Saved guide" in result.data['summary']
+
+@pytest.mark.asyncio
+async def test_get_summary_single_shot_plan(mock_deps):
+    from domain.planner import PipelinePlanner
+    event = TranscriptionCreatedEvent(
+        name="transcriptions_created",
+        data=[{"title": "Talk", "path": "test/path.txt"}]
+    )
+    mock_deps.file_storage.read.return_value = b"First paragraph\n\n" + b"x" * 20000
+    mock_deps.anthropic_client.messages = Mock()
+    mock_deps.anthropic_client.messages.create.return_value = Mock(
+        content=[Mock(text="<analysis>Whole analysis</analysis>\n<guide>Whole guide</guide>")]
+    )
+    mock_deps.planner = PipelinePlanner()
+
+    result = await get_summary(mock_deps, event)
+
+    mock_deps.anthropic_client.messages.create.assert_called_once()
+    assert "Whole analysis" in result.data['summary']
+    assert "Whole guide" in result.data['summary']
+    assert result.meta['plan']['strategy'] == "single_shot"
+    assert 'actual_seconds' in result.meta['plan']
+
+@pytest.mark.asyncio
+async def test_get_summary_tree_reduce_plan(mock_deps):
+    from domain.planner import PipelinePlanner
+    event = TranscriptionCreatedEvent(
+        name="transcriptions_created",
+        data=[{"title": "Talk", "path": "test/path.txt"}]
+    )
+    # 10 chunks of ~3000 tokens; a small context rules out single-shot and a flat guide
+    mock_deps.file_storage.read.return_value = "\n\n".join(["y" * 12000] * 10).encode()
+    mock_deps.anthropic_client.messages = Mock()
+    mock_deps.anthropic_client.messages.create.return_value = Mock(content=[Mock(text="Part")])
+    mock_deps.planner = PipelinePlanner(context_tokens=16000, fan_in=4)
+
+    result = await get_summary(mock_deps, event)
+
+    assert result.meta['plan']['strategy'] == "tree_reduce"
+    # 10 analyses, 3 merges, 1 guide
+    assert mock_deps.anthropic_client.messages.create.call_count == 14
+    guide_prompt = mock_deps.anthropic_client.messages.create.call_args.kwargs['messages'][0]['content']
+    assert guide_prompt.count("Analysis ") == 3
+
+@pytest.mark.asyncio
+async def test_get_summary_memo_hit_skips_reads_and_llm(mock_deps, valid_event):
+    from domain.memo import encode_result
+    from infra.core_types import ObjectStat
+    mock_deps.file_storage.stat.return_value = ObjectStat(size=10, etag="abc")
+    mock_deps.anthropic_client.messages = Mock()
+    mock_deps.result_cache = AsyncMock()
+    mock_deps.result_cache.get.return_value = encode_result(
+        {'title': "Test Talk", 'summary': "Stored summary"},
+        {'dedup': None, 'plan': {'strategy': "single_shot"}}
+    )
+
+    result = await get_summary(mock_deps, valid_event)
+
+    mock_deps.file_storage.read.assert_not_called()
+    mock_deps.anthropic_client.messages.create.assert_not_called()
+    assert result.data['summary'] == "Stored summary"
+    assert result.meta == {'plan': {'strategy': "single_shot"}, 'memo': {'hit': True}}
+    mock_deps.event_store.write_event.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_get_summary_memo_miss_stores_result(mock_deps):
+    from domain.memo import decode_result
+    from infra.core_types import ObjectStat
+    event = TranscriptionCreatedEvent(
+        name="transcriptions_created",
+        data=[{"title": "Talk", "path": "test/path.txt"}]
+    )
+    mock_deps.file_storage.stat.return_value = ObjectStat(size=13, etag="abc")
+    mock_deps.file_storage.read.return_value = b"Short content"
+    mock_deps.anthropic_client.messages = Mock()
+    mock_deps.anthropic_client.messages.create.return_value = Mock(content=[Mock(text="Fresh")])
+    mock_deps.result_cache = AsyncMock()
+    mock_deps.result_cache.get.return_value = None
+
+    result = await get_summary(mock_deps, event)
+
+    key, value = mock_deps.result_cache.put.call_args.args
+    assert key == mock_deps.result_cache.get.call_args.args[0]
+    assert decode_result(value)['data'] == result.data
+
+@pytest.mark.asyncio
+async def test_get_summary_tight_deadline_degrades(mock_deps):
+    import time
+    from domain.planner import PipelinePlanner
+    event = TranscriptionCreatedEvent(
+        name="transcriptions_created",
+        data=[{"title": "Talk", "path": "test/path.txt"}],
+        meta={'deadline': time.time() + 5}
+    )
+    mock_deps.file_storage.read.return_value = "\n\n".join(
+        f"Sentence {i} about topic {i % 7}. Another remark {i}." * 40 for i in range(40)
+    ).encode()
+    mock_deps.anthropic_client.messages = Mock()
+    mock_deps.anthropic_client.messages.create.return_value = Mock(content=[Mock(text="Part")])
+    mock_deps.planner = PipelinePlanner()
+
+    result = await get_summary(mock_deps, event)
+
+    deadline = result.meta['deadline']
+    assert deadline['degradations'] == ["fast_model", "extractive", "skip_guide"]
+    models = {call.kwargs['model'] for call in mock_deps.anthropic_client.messages.create.call_args_list}
+    assert models == {"claude-3-5-haiku-20241022"}
+    assert "Practical Implementation Guide" not in result.data['summary']
+    # Degraded runs do not skew the latency model
+    assert mock_deps.planner.corrections['map_reduce'] == 1.0
+
+@pytest.mark.asyncio
+async def test_get_summary_expired_deadline_dropped(mock_deps):
+    from domain.deadline import DeadlineExceeded
+    event = TranscriptionCreatedEvent(
+        name="transcriptions_created",
+        data=[{"title": "Talk", "path": "test/path.txt"}],
+        meta={'deadline': "2020-01-01T00:00:00Z"}
+    )
+    mock_deps.file_storage.read.return_value = b"Short content"
+    mock_deps.anthropic_client.messages = Mock()
+    mock_deps.deadline_policy = "drop"
+
+    with pytest.raises(DeadlineExceeded):
+        await get_summary(mock_deps, event)
+    mock_deps.anthropic_client.messages.create.assert_not_called()
+    # Dropped before the transcripts are read
+    mock_deps.file_storage.read.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_get_summary_incremental_reuses_part_analyses(mock_deps):
+    from infra.memory import InMemoryFileStorage
+
+    class DictResultCache:
+        def __init__(self):
+            self.values = {}
+
+        async def get(self, key):
+            return self.values.get(key)
+
+        async def put(self, key, value):
+            self.values[key] = value
+
+    mock_deps.file_storage = InMemoryFileStorage({
+        f"live/part{i}.txt": f"Content of part {i}".encode() for i in range(1, 5)
+    })
+    mock_deps.anthropic_client.messages = Mock()
+    mock_deps.anthropic_client.messages.create.return_value = Mock(content=[Mock(text="Analysis")])
+    mock_deps.result_cache = DictResultCache()
+    mock_deps.incremental = True
+
+    def parts(count):
+        return TranscriptionCreatedEvent(
+            name="transcriptions_created",
+            data=[{"title": f"Live {i}", "path": f"live/part{i}.txt"} for i in range(1, count + 1)],
+            meta={'group': "live-show"}
+        )
+
+    first = await get_summary(mock_deps, parts(3))
+    assert mock_deps.anthropic_client.messages.create.call_count == 4
+    assert first.meta['incremental']['extends_previous'] is False
+
+    mock_deps.anthropic_client.messages.create.reset_mock()
+    second = await get_summary(mock_deps, parts(4))
+
+    # One map call for the new part plus one guide call
+    assert mock_deps.anthropic_client.messages.create.call_count == 2
+    assert second.meta['incremental'] == {
+        'parts': 4, 'reused': 3, 'analyzed': 1, 'extends_previous': True, 'guide_reused': False
+    }
+    # Cached analyses of parts 1-3 plus the new one
+    assert "Analysis---Analysis---Analysis" in second.data['summary']
+
+@pytest.mark.asyncio
+async def test_get_summary_incremental_reuses_group_merges_and_guide(mock_deps):
+    import itertools
+    from infra.memory import InMemoryFileStorage
+    from domain.planner import PipelinePlanner
+
+    class DictResultCache:
+        def __init__(self):
+            self.values = {}
+
+        async def get(self, key):
+            return self.values.get(key)
+
+        async def put(self, key, value):
+            self.values[key] = value
+
+    outputs = itertools.count()
+    mock_deps.file_storage = InMemoryFileStorage({
+        f"live/part{i}.txt": f"Content of part {i}".encode() for i in range(1, 6)
+    })
+    mock_deps.anthropic_client.messages = Mock()
+    mock_deps.anthropic_client.messages.create.side_effect = lambda **kwargs: Mock(content=[Mock(text=f"Output {next(outputs)}")])
+    mock_deps.result_cache = DictResultCache()
+    mock_deps.planner = PipelinePlanner(parallelism=1, fan_in=2)
+    mock_deps.incremental = True
+
+    def parts(count, title="Live"):
+        return TranscriptionCreatedEvent(
+            name="transcriptions_created",
+            data=[{"title": f"{title} {i}", "path": f"live/part{i}.txt"} for i in range(1, count + 1)],
+            meta={'group': "live-show"}
+        )
+
+    calls = mock_deps.anthropic_client.messages.create
+    await get_summary(mock_deps, parts(4))
+    # Four analyses, two merges, the guide
+    assert calls.call_count == 7
+
+    calls.reset_mock()
+    second = await get_summary(mock_deps, parts(5))
+    # The new analysis, a merge of it, two merges on the second level and the guide;
+    # the first-level merges of parts 1-4 come from the group's entry instead of two more calls
+    assert calls.call_count == 5
+    assert second.meta['plan']['chunks'] == 1
+
+    calls.reset_mock()
+    renamed = await get_summary(mock_deps, parts(5, title="Live show"))
+    # Same parts under other titles: every analysis, merge and the guide are reused
+    assert calls.call_count == 0
+    assert renamed.meta['incremental']['guide_reused'] is True
+
+@pytest.mark.asyncio
+async def test_get_summary_reports_token_usage(mock_deps):
+    event = TranscriptionCreatedEvent(
+        name="transcriptions_created",
+        data=[{"title": "Talk", "path": "test/path.txt"}],
+        meta={'tenant': "acme"}
+    )
+    mock_deps.file_storage.read.return_value = b"Short content"
+    mock_deps.anthropic_client.messages = Mock()
+    mock_deps.anthropic_client.messages.create.return_value = Mock(
+        content=[Mock(text="Part")], usage=Mock(input_tokens=100, output_tokens=20)
+    )
+    mock_deps.usage_totals = Mock()
+
+    result = await get_summary(mock_deps, event)
+
+    assert result.meta['usage'] == {
+        'calls': 2, 'input_tokens': 200, 'output_tokens': 40, 'budget': None,
+        'stages': {
+            'analysis': {'calls': 1, 'input_tokens': 100, 'output_tokens': 20},
+            'guide': {'calls': 1, 'input_tokens': 100, 'output_tokens': 20}
+        }
+    }
+    tenant, counters = mock_deps.usage_totals.add.call_args.args
+    assert tenant == "acme"
+    assert counters['input_tokens'] == 200 and counters['guide:output_tokens'] == 20
+
+@pytest.mark.asyncio
+async def test_get_summary_enforces_token_budget(mock_deps):
+    from domain.usage import TokenBudgetExceeded
+    event = TranscriptionCreatedEvent(
+        name="transcriptions_created",
+        data=[{"title": "Talk", "path": "test/path.txt"}],
+        meta={'token_budget': 3000}
+    )
+    mock_deps.file_storage.read.return_value = b"Short content"
+    mock_deps.anthropic_client.messages = Mock()
+    mock_deps.anthropic_client.messages.create.return_value = Mock(
+        content=[Mock(text="Part")], usage=Mock(input_tokens=500, output_tokens=400)
+    )
+    mock_deps.usage_totals = Mock()
+
+    # The analysis fits, the guide's 4000 max_tokens cannot
+    with pytest.raises(TokenBudgetExceeded):
+        await get_summary(mock_deps, event)
+    assert mock_deps.anthropic_client.messages.create.call_count == 1
+    # Tokens of the failed attempt still reach the totals
+    assert mock_deps.usage_totals.add.call_args.args[1]['input_tokens'] == 500
+
+@pytest.mark.asyncio
+async def test_get_summary_streams_output_to_storage(mock_deps):
+    import hashlib
+    from infra.memory import InMemoryFileStorage
+    from domain.handler.get_summary import render_summary
+
+    mock_deps.file_storage = InMemoryFileStorage({"talk.txt": b"Short content"})
+    mock_deps.anthropic_client.messages = Mock()
+    mock_deps.anthropic_client.messages.create.return_value = Mock(content=[Mock(text="Part")])
+    mock_deps.summary_prefix = "summaries"
+    event = TranscriptionCreatedEvent(
+        name="transcriptions_created",
+        data=[{"title": "Talk", "path": "talk.txt"}],
+        id="1-0"
+    )
+
+    result = await get_summary(mock_deps, event)
+
+    path = result.data['summary_path']
+    assert path.startswith("summaries/transcriptions_created/1-0-") and path.endswith(".md")
+    stored = mock_deps.file_storage.files[path]
+    assert result.data == {
+        'title': "Talk",
+        'summary_path': path,
+        'summary_sha256': hashlib.sha256(stored).hexdigest(),
+        'summary_bytes': len(stored)
+    }
+    assert stored.decode() == render_summary(["Talk"], ["Part"], "Part")['summary']
+    mock_deps.event_store.write_event.assert_called_once_with(result)
+
+def test_summary_objects_are_per_stream_and_attempt():
+    from infra.memory import InMemoryFileStorage
+    from infra.stream_event import StreamEvent
+    from domain.summary_output import SummaryAssembler
+
+    storage = InMemoryFileStorage({})
+    fields = {b'name': b"transcriptions_created", b'data': b"[]"}
+    high = StreamEvent(b"1-0", fields, "transcriptions_created:high")
+    normal = StreamEvent(b"1-0", fields, "transcriptions_created")
+    paths = [SummaryAssembler.for_event(storage, "summaries", event).path for event in (high, normal, normal)]
+
+    assert paths[0].startswith("summaries/transcriptions_created:high/1-0-")
+    assert paths[1].startswith("summaries/transcriptions_created/1-0-")
+    # A redelivery writes a new object instead of rewriting the published one
+    assert len(set(paths)) == 3
+
+@pytest.mark.asyncio
+async def test_get_summary_leaves_no_partial_output(mock_deps):
+    from infra.memory import InMemoryFileStorage
+
+    mock_deps.file_storage = InMemoryFileStorage({"talk.txt": b"Short content"})
+    mock_deps.anthropic_client.messages = Mock()
+    # The analysis succeeds and is uploaded, then the guide call fails
+    mock_deps.anthropic_client.messages.create.side_effect = [Mock(content=[Mock(text="Part")]), Exception("API down")]
+    mock_deps.summary_prefix = "summaries"
+    event = TranscriptionCreatedEvent(name="transcriptions_created", data=[{"title": "Talk", "path": "talk.txt"}], id="1-0")
+
+    with pytest.raises(Exception, match="API down"):
+        await get_summary(mock_deps, event)
+    assert list(mock_deps.file_storage.files) == ["talk.txt"]
+
+@pytest.mark.asyncio
+async def test_analyze_chunks_bounds_batcher_calls_by_parallelism(mock_deps):
+    import asyncio
+    from domain.handler.get_summary import KnowledgeExtractorPromptBuilder, analyze_chunks
+
+    class CountingBatcher:
+        running = 0
+        peak = 0
+
+        async def analyze(self, chunk):
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            await asyncio.sleep(0.01)
+            self.running -= 1
+            return f"analysis of {chunk}"
+
+    mock_deps.analysis_batcher = CountingBatcher()
+    mock_deps.checkpoint_store = None
+    event = TranscriptionCreatedEvent(name="transcriptions_created", data=[])
+    steps = [(f"analysis_{i}", i + 1, f"chunk {i}") for i in range(10)]
+
+    analyses = await analyze_chunks(mock_deps, event, KnowledgeExtractorPromptBuilder(), steps, {}, parallelism=3)
+
+    assert analyses == [f"analysis of chunk {i}" for i in range(10)]
+    assert mock_deps.analysis_batcher.peak == 3
@@ -0,0 +1,53 @@
+import time
+import pytest
+from domain.deadline import (
+    DeadlineExceeded, parse_deadline, budget_deadline, extractive_chunk_tokens,
+    DROP, FAST_TRACK, FAST_MODEL, EXTRACTIVE, SKIP_GUIDE
+)
+from domain.planner import PipelinePlanner
+
+def test_parse_deadline_formats():
+    assert parse_deadline(None) is None
+    assert parse_deadline({'other': 1}) is None
+    assert parse_deadline({'deadline': 1700000000}) == 1700000000.0
+    assert parse_deadline({'deadline': 1700000000000}) == 1700000000.0
+    assert parse_deadline({'deadline': "1700000000"}) == 1700000000.0
+    assert parse_deadline({'deadline': "1700000000000"}) == 1700000000.0
+    assert parse_deadline({'deadline': "1700000000000.0"}) == 1700000000.0
+    assert parse_deadline({'deadline': "2023-11-14T22:13:20Z"}) == 1700000000.0
+
+def test_parse_deadline_ignores_malformed_values():
+    assert parse_deadline({'deadline': {'at': 1700000000}}) is None
+    assert parse_deadline({'deadline': [1700000000]}) is None
+    assert parse_deadline({'deadline': True}) is None
+    assert parse_deadline({'deadline': "next tuesday"}) is None
+
+def test_extractive_chunk_tokens_rechunks_kept_share():
+    assert extractive_chunk_tokens([4000] * 5, 0.4) == [4000, 4000]
+    assert extractive_chunk_tokens([1000], 0.5) == [500]
+
+def test_loose_deadline_keeps_full_pipeline():
+    budget = budget_deadline(PipelinePlanner(), [4000] * 3, time.time() + 3600)
+    assert budget.degradations == []
+    assert budget.plan.with_guide
+
+def test_tighter_deadline_degrades_gradually():
+    planner = PipelinePlanner()
+    full = planner.plan([4000] * 3).predicted_seconds
+    budget = budget_deadline(planner, [4000] * 3, time.time() + full * 0.6)
+    assert budget.degradations == [FAST_MODEL]
+    assert budget.model != budget_deadline(planner, [4000] * 3, time.time() + 3600).model
+
+def test_impossible_deadline_degrades_fully():
+    budget = budget_deadline(PipelinePlanner(), [4000] * 10, time.time() + 1)
+    assert budget.degradations == [FAST_MODEL, EXTRACTIVE, SKIP_GUIDE]
+    assert not budget.plan.with_guide
+    assert not budget.expired
+
+def test_expired_deadline_follows_policy():
+    with pytest.raises(DeadlineExceeded):
+        budget_deadline(PipelinePlanner(), [4000], time.time() - 10, policy=DROP)
+    budget = budget_deadline(PipelinePlanner(), [4000], time.time() - 10, policy=FAST_TRACK)
+    assert budget.expired
+    assert budget.degradations == [FAST_MODEL, EXTRACTIVE, SKIP_GUIDE]
+    assert budget.to_dict()['met'] is False
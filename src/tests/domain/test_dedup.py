@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from domain.dedup import ChunkDeduplicator
+
+INTRO = "This episode is brought to you by our sponsor who makes the best coffee in town, use code PODCAST for ten percent off"
+
+def words(n, offset=0):
+    return " ".join(f"word{i}" for i in range(offset, offset + n))
+
+def test_signature_is_stable_across_instances():
+    text = words(200)
+    assert (ChunkDeduplicator().signature(text) == ChunkDeduplicator().signature(text)).all()
+
+def test_similarity_tracks_overlap():
+    dedup = ChunkDeduplicator()
+    base = dedup.signature(words(400))
+    near = dedup.signature(words(400, offset=10))
+    far = dedup.signature(words(400, offset=1000))
+    assert dedup.similarity(base, near[None, :])[0] > 0.85
+    assert dedup.similarity(base, far[None, :])[0] < 0.1
+
+@pytest.mark.asyncio
+async def test_dedup_drops_near_duplicate_chunks():
+    dedup = ChunkDeduplicator()
+    chunks = [words(400), words(400, offset=5000), words(400, offset=5)]
+
+    result, report = await dedup.dedup(chunks)
+
+    assert result == [chunks[0], chunks[1], None]
+    assert report.chunks_dropped == 1
+    assert report.tokens_saved == len(chunks[2]) // 4
+
+@pytest.mark.asyncio
+async def test_dedup_strips_known_boilerplate():
+    index = AsyncMock()
+    dedup = ChunkDeduplicator(boilerplate_index=index)
+    index.signatures.return_value = [dedup.signature(INTRO).tobytes()]
+    chunk = f"{INTRO}\n\n{words(300)}"
+
+    result, report = await dedup.dedup([chunk])
+
+    assert result == [words(300)]
+    assert report.boilerplate_paragraphs == 1
+    assert report.tokens_saved == len(chunk) // 4 - len(words(300)) // 4
+
+@pytest.mark.asyncio
+async def test_register_boilerplate_writes_signature():
+    index = AsyncMock()
+    dedup = ChunkDeduplicator(boilerplate_index=index)
+
+    await dedup.register_boilerplate(INTRO)
+
+    index.add.assert_called_once_with(dedup.signature(INTRO).tobytes())
@@ -0,0 +1,54 @@
+import time
+import pytest
+
+from domain.extractive import ExtractiveCompressor, split_sentences
+
+TOPIC = "The index uses a btree. Btree pages split on insert. Page splits cause write amplification in the btree index."
+
+def test_split_sentences_keeps_separators():
+    sentences, separators = split_sentences("One. Two!\n\nThree")
+    assert sentences == ["One.", "Two!", "Three"]
+    assert separators == [" ", "\n\n", ""]
+
+def test_short_text_is_left_alone():
+    compressor = ExtractiveCompressor(min_tokens=1000)
+    text, report = compressor.compress(TOPIC)
+    assert text == TOPIC
+    assert report.tokens_out == report.tokens_in
+
+def test_keeps_central_sentences_in_original_order():
+    text = " ".join([
+        "Okay so anyway.",
+        TOPIC,
+        "Weather was nice yesterday.",
+        "Btree index pages and write amplification matter for the btree.",
+    ])
+    compressor = ExtractiveCompressor(ratio=0.6, min_tokens=0)
+    compressed, report = compressor.compress(text)
+
+    assert "btree" in compressed.lower()
+    assert "Weather" not in compressed
+    assert report.sentences_out < report.sentences_in
+    assert report.tokens_out <= report.tokens_in * 0.6 + 1
+    kept = compressed.split(". ")
+    assert kept == sorted(kept, key=text.index)
+
+def test_paragraph_breaks_survive():
+    paragraph = "Btree pages split. Splits cause write amplification."
+    text = "\n\n".join([paragraph] * 4)
+    compressed, _ = ExtractiveCompressor(ratio=0.9, min_tokens=0).compress(text)
+    assert "\n\n" in compressed
+
+def test_one_megabyte_in_under_a_second():
+    sentence = "Sentence {} talks about btree index number {} and write amplification."
+    text = " ".join(sentence.format(i, i % 500) for i in range(15000))
+    assert len(text) > 1_000_000
+
+    started = time.perf_counter()
+    _, report = ExtractiveCompressor(ratio=0.4, min_tokens=0).compress(text)
+    assert time.perf_counter() - started < 1.0
+    assert report.tokens_out <= report.tokens_in * 0.4 + 1
+
+def test_invalid_ratio():
+    with pytest.raises(ValueError):
+        ExtractiveCompressor(ratio=0)
@@ -0,0 +1,65 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from types import SimpleNamespace
+from domain.memo import event_memo_key, pipeline_settings, pipeline_version
+from domain.types import TranscriptionCreatedEvent
+from infra.core_types import ObjectStat
+
+def make_event(*paths):
+    return TranscriptionCreatedEvent(
+        name="transcriptions_created",
+        data=[{"title": "Talk", "path": path} for path in paths]
+    )
+
+def storage_with(stats):
+    storage = AsyncMock()
+    storage.stat.side_effect = lambda path: stats[path]
+    return storage
+
+@pytest.mark.asyncio
+async def test_key_depends_on_etags_not_order():
+    storage = storage_with({"a": ObjectStat(1, "e1"), "b": ObjectStat(2, "e2")})
+    key = await event_memo_key(storage, make_event("a", "b"))
+
+    assert key.startswith(f"{pipeline_version()}:")
+    assert key == await event_memo_key(storage, make_event("b", "a"))
+    storage.read.assert_not_called()
+
+    changed = storage_with({"a": ObjectStat(1, "e1"), "b": ObjectStat(2, "e3")})
+    assert key != await event_memo_key(changed, make_event("a", "b"))
+
+@pytest.mark.asyncio
+async def test_no_key_without_etag():
+    storage = storage_with({"a": ObjectStat(1, None)})
+    assert await event_memo_key(storage, make_event("a")) is None
+
+def settings(**overrides):
+    deps = SimpleNamespace(
+        normalizer=SimpleNamespace(steps=['whitespace']),
+        deduplicator=SimpleNamespace(threshold=0.8),
+        compressor=None,
+        planner=object(),
+        summary_prefix=None,
+        incremental=False
+    )
+    for name, value in overrides.items():
+        setattr(deps, name, value)
+    return pipeline_settings(deps)
+
+@pytest.mark.asyncio
+async def test_key_depends_on_output_settings():
+    storage = storage_with({"a": ObjectStat(1, "e1")})
+    event = make_event("a")
+    key = await event_memo_key(storage, event, pipeline_version(settings()))
+
+    assert key == await event_memo_key(storage, event, pipeline_version(settings()))
+    for changed in (
+        settings(normalizer=SimpleNamespace(steps=['whitespace', 'stutters'])),
+        settings(deduplicator=SimpleNamespace(threshold=0.9)),
+        settings(compressor=SimpleNamespace(ratio=0.5, min_tokens=1000)),
+        settings(planner=None),
+        settings(summary_prefix="summaries"),
+        settings(incremental=True),
+    ):
+        assert key != await event_memo_key(storage, event, pipeline_version(changed))
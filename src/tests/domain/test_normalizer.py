@@ -0,0 +1,70 @@
+import time
+import pytest
+
+from domain.normalizer import TranscriptNormalizer
+
+RAW = """{"language": "en"}
+{"duration": 3600}
+[00:00:01] SPEAKER_00: Um, so today we we we talk about, uh, caching.
+[00:00:05] SPEAKER_00: It is   really important.
+
+
+[00:00:09] SPEAKER_01: I- I agree, hmm, completely.
+[00:00:12] SPEAKER_01: Since 10:30 this morning."""
+
+def test_default_pipeline_cleans_transcript():
+    text, report = TranscriptNormalizer().normalize(RAW)
+
+    assert text == (
+        "SPEAKER_00: so today we we we talk about, caching.\n"
+        "It is really important.\n\n"
+        "SPEAKER_01: I- I agree, completely.\n"
+        "Since 10:30 this morning."
+    )
+    assert report.bytes_out < report.bytes_in
+    assert report.to_dict()['tokens_saved'] == report.tokens_in - report.tokens_out
+
+def test_steps_are_configurable():
+    text, _ = TranscriptNormalizer(steps=['timestamps', 'whitespace']).normalize(
+        "[00:01] Um, the the point"
+    )
+    assert text == "Um, the the point"
+
+def test_srt_ranges_are_removed():
+    text, _ = TranscriptNormalizer(steps=['timestamps', 'whitespace']).normalize(
+        "00:00:01,000 --> 00:00:04,500\nHello there"
+    )
+    assert text == "Hello there"
+
+def test_stutters_are_opt_in():
+    text, _ = TranscriptNormalizer(steps=['stutters', 'whitespace']).normalize("we we we talk, I- I agree")
+    assert text == "we talk, I agree"
+
+def test_only_json_lines_are_stripped_as_header():
+    text, _ = TranscriptNormalizer(steps=['json_header']).normalize(
+        '{"language": "en"}\n"Hello," she said.\n{"not": "a header"}'
+    )
+    assert text == '"Hello," she said.\n{"not": "a header"}'
+
+def test_times_in_speech_are_kept():
+    text, _ = TranscriptNormalizer(steps=['timestamps', 'whitespace']).normalize(
+        "00:01 We met at 10:30 (00:02:15) and left by 11:45."
+    )
+    assert text == "We met at 10:30 and left by 11:45."
+
+def test_one_off_labels_are_not_speakers():
+    text, _ = TranscriptNormalizer(steps=['speaker_tags']).normalize(
+        "Alice: Hi.\nAlice: Note the point.\nNote: this stays.\nAlice: Bye."
+    )
+    assert text == "Alice: Hi.\nNote the point.\nNote: this stays.\nBye."
+
+def test_unknown_step_is_rejected():
+    with pytest.raises(ValueError, match="Unknown normalization steps: typo"):
+        TranscriptNormalizer(steps=['typo'])
+
+def test_throughput_is_megabytes_per_second():
+    line = "[00:00:01] SPEAKER_00: Um, so we we talk about, uh, the the system design here.\n"
+    text = line * (1_000_000 // len(line))
+    started = time.perf_counter()
+    TranscriptNormalizer().normalize(text)
+    assert time.perf_counter() - started < 1.0
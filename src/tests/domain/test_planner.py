@@ -0,0 +1,36 @@
+from domain.constants import ServiceConfig
+from domain.planner import PipelinePlanner, LatencyModel, SINGLE_SHOT, MAP_REDUCE, TREE_REDUCE
+
+def test_content_that_fits_goes_single_shot():
+    plan = PipelinePlanner().plan([4000, 4000, 2000])
+    assert plan.strategy == SINGLE_SHOT
+    assert plan.calls == 1
+    assert set(plan.alternatives) == {SINGLE_SHOT, MAP_REDUCE}
+
+def test_defaults_follow_the_service_config():
+    planner = PipelinePlanner()
+    assert (planner.parallelism, planner.fan_in) == (ServiceConfig.ANALYSIS_PARALLELISM, ServiceConfig.MERGE_FAN_IN)
+
+def test_content_beyond_context_is_mapped():
+    plan = PipelinePlanner(context_tokens=20000).plan([4000] * 5)
+    assert plan.strategy == MAP_REDUCE
+    assert plan.calls == 6
+
+def test_guide_input_beyond_context_is_tree_reduced():
+    planner = PipelinePlanner(context_tokens=20000, fan_in=4)
+    plan = planner.plan([4000] * 20)
+    assert plan.strategy == TREE_REDUCE
+    assert planner.merge_levels(20) == [5, 2]
+    assert plan.calls == 20 + 7 + 1
+
+def test_fast_decode_favours_map_reduce():
+    # With many parallel calls and cheap output, splitting the prefill wins
+    latency = LatencyModel(input_tokens_per_second=500, output_tokens_per_second=100000)
+    plan = PipelinePlanner(latency=latency, parallelism=8).plan([4000] * 8)
+    assert plan.strategy == MAP_REDUCE
+
+def test_observed_time_corrects_later_predictions():
+    planner = PipelinePlanner()
+    plan = planner.plan([4000])
+    planner.observe(plan, plan.predicted_seconds * 3)
+    assert planner.plan([4000]).predicted_seconds > plan.predicted_seconds
@@ -0,0 +1,105 @@
+import re
+import asyncio
+import threading
+import pytest
+from unittest.mock import Mock
+from domain.llm import CallExecutor, CallSettings, create_message
+from domain.micro_batcher import AnalysisMicroBatcher
+from domain.usage import TokenBudgetExceeded, UsageLedger, current_ledger, parse_token_budget, track_usage
+
+def response(text, input_tokens, output_tokens):
+    return Mock(content=[Mock(text=text)], usage=Mock(input_tokens=input_tokens, output_tokens=output_tokens))
+
+def test_parse_token_budget():
+    assert parse_token_budget(None) is None
+    assert parse_token_budget({'token_budget': "5000"}) == 5000
+
+def test_ledger_reserves_worst_case_and_records_actual():
+    ledger = UsageLedger(budget=1000)
+    reserved = ledger.reserve('analysis', 300, 500)
+    # Concurrent calls count against the budget while in flight
+    with pytest.raises(TokenBudgetExceeded):
+        ledger.reserve('analysis', 100, 200)
+    ledger.record('analysis', 280, 120, reserved)
+    assert ledger.reserved == 0 and ledger.total_tokens == 400
+    assert ledger.counters() == {
+        'events': 1, 'calls': 1, 'input_tokens': 280, 'output_tokens': 120,
+        'analysis:calls': 1, 'analysis:input_tokens': 280, 'analysis:output_tokens': 120
+    }
+
+@pytest.mark.asyncio
+async def test_calls_are_charged_to_the_current_ledger():
+    client = Mock(messages=Mock())
+    client.messages.create.return_value = response("ok", 50, 10)
+    ledger = UsageLedger()
+    with track_usage(ledger):
+        await asyncio.gather(
+            create_message(client, stage='analysis', max_tokens=100, messages=[{'role': 'user', 'content': "x"}]),
+            create_message(client, stage='guide', max_tokens=100, messages=[])
+        )
+    assert current_ledger() is None
+    await create_message(client, stage='analysis', max_tokens=100, messages=[])
+    assert ledger.to_dict()['stages'] == {
+        'analysis': {'calls': 1, 'input_tokens': 50, 'output_tokens': 10},
+        'guide': {'calls': 1, 'input_tokens': 50, 'output_tokens': 10}
+    }
+    # Stage names are not passed on to the API
+    assert 'stage' not in client.messages.create.call_args.kwargs
+
+@pytest.mark.asyncio
+async def test_batched_call_is_split_between_events():
+    client = Mock(messages=Mock())
+    def respond(**kwargs):
+        fence = re.search(r'<section-(\w+) id=', kwargs['messages'][0]['content']).group(1)
+        return response(f'<analysis-{fence} id="1">A</analysis-{fence}><analysis-{fence} id="2">B</analysis-{fence}>', 900, 300)
+    client.messages.create.side_effect = respond
+    observed = []
+    batcher = AnalysisMicroBatcher(
+        client, token_budget=1000, max_linger=0.01, llm_settings=CallSettings(observers=[observed.append])
+    )
+    ledgers = [UsageLedger(), UsageLedger()]
+
+    async def submit(ledger, chunk):
+        with track_usage(ledger):
+            return await batcher.analyze(chunk)
+
+    # The second chunk is twice as long, so it pays two thirds
+    assert await asyncio.gather(submit(ledgers[0], "a" * 400), submit(ledgers[1], "b" * 800)) == ["A", "B"]
+    assert [l.to_dict()['stages']['analysis'] for l in ledgers] == [
+        {'calls': 1, 'input_tokens': 300, 'output_tokens': 100},
+        {'calls': 1, 'input_tokens': 600, 'output_tokens': 200}
+    ]
+    assert all(l.reserved == 0 for l in ledgers)
+    # Observers see the shared call under the analysis stage
+    assert [call['stage'] for call in observed] == ['analysis']
+
+@pytest.mark.asyncio
+async def test_calls_run_on_the_dedicated_executor():
+    release = threading.Event()
+    client = Mock(messages=Mock())
+    client.messages.create.side_effect = lambda **kwargs: release.wait(5) and response("ok", 1, 1)
+    executor = CallExecutor(max_workers=1)
+    settings = CallSettings(executor=executor)
+    try:
+        calls = asyncio.gather(*(create_message(client, settings=settings, max_tokens=10, messages=[]) for _ in range(3)))
+        for _ in range(100):
+            if executor.stats()['running']:
+                break
+            await asyncio.sleep(0.01)
+        assert executor.stats() == {'threads': 1, 'running': 1, 'queued': 2}
+        release.set()
+        await calls
+        assert executor.stats() == {'threads': 1, 'running': 0, 'queued': 0}
+    finally:
+        executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_call_settings_are_per_service():
+    client = Mock(messages=Mock())
+    client.messages.create.return_value = response("ok", 5, 1)
+    seen, other = [], []
+    await create_message(client, stage='guide', settings=CallSettings(observers=[seen.append]), max_tokens=10, messages=[])
+    await create_message(client, settings=CallSettings(observers=[other.append]), max_tokens=10, messages=[])
+    assert [call['stage'] for call in seen] == ['guide']
+    assert [call['stage'] for call in other] == [None]
+    assert 'settings' not in client.messages.create.call_args.kwargs
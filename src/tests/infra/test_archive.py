@@ -0,0 +1,115 @@
+import json
+import time
+import pytest
+from redis.asyncio import Redis
+from infra.archive import StreamArchiver, ArchiveReader, encode_batch, partition_prefix
+from infra.local import LocalFileStorage
+
+HOUR_MS = 3600 * 1000
+
+def entry(ms, seq=0, title="Test"):
+    return (f"{ms}-{seq}", {
+        'name': 'summary_created',
+        'meta': json.dumps({'tenant': 'a'}),
+        'data': json.dumps({'title': title}),
+        'timestamp': '2024-01-01T00:00:00+00:00'
+    })
+
+@pytest.fixture
+async def redis_client():
+    client = Redis(host='0.0.0.0', port=6379, decode_responses=False)
+    yield client
+    await client.flushall()
+    await client.aclose()
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalFileStorage(str(tmp_path))
+
+def test_partition_prefix_is_hourly():
+    assert partition_prefix("archive", "s", 1704067200000 + 90 * 60 * 1000) == "archive/s/2024/01/01/01/"
+
+@pytest.mark.asyncio
+async def test_replay_returns_range_in_id_order(storage):
+    base = 1704067200000
+    first = [entry(base), entry(base + 1000)]
+    second = [entry(base + HOUR_MS), entry(base + HOUR_MS + 1)]
+    await storage.write(f"{partition_prefix('archive', 's', base + HOUR_MS)}{second[0][0]}_{second[-1][0]}.jsonl.gz", encode_batch(second))
+    await storage.write(f"{partition_prefix('archive', 's', base)}{first[0][0]}_{first[-1][0]}.jsonl.gz", encode_batch(first))
+
+    reader = ArchiveReader(storage)
+    ids = [event.id async for event in reader.replay("s")]
+    assert ids == [e[0] for e in first + second]
+
+    ids = [event.id async for event in reader.replay("s", start_id=first[1][0], end_id=second[0][0])]
+    assert ids == [first[1][0], second[0][0]]
+
+    event = [event async for event in reader.replay("s", end_id=first[0][0])][0]
+    assert event.data == {'title': 'Test'}
+    assert event.meta == {'tenant': 'a'}
+
+@pytest.mark.asyncio
+async def test_replay_lists_long_ranges_once(storage):
+    base = 1704067200000
+    batch = [entry(base), entry(base + HOUR_MS)]
+    await storage.write(f"{partition_prefix('archive', 's', base)}{batch[0][0]}_{batch[-1][0]}.jsonl.gz", encode_batch(batch))
+    await storage.write(f"{partition_prefix('archive', 's2', base)}{batch[0][0]}_{batch[-1][0]}.jsonl.gz", encode_batch(batch))
+    listed = []
+    list_objects = storage.list
+
+    async def counting_list(prefix):
+        listed.append(prefix)
+        return await list_objects(prefix)
+    storage.list = counting_list
+
+    reader = ArchiveReader(storage)
+    assert [event.id async for event in reader.replay("s")] == [e[0] for e in batch]
+    assert listed == ["archive/s/"]
+
+    listed.clear()
+    assert [event.id async for event in reader.replay("s", start_id=f"{base}-0", end_id=f"{base + HOUR_MS}-0")] == [e[0] for e in batch]
+    assert listed == ["archive/s/2024/01/01/00/", "archive/s/2024/01/01/01/"]
+
+@pytest.mark.asyncio
+async def test_archiver_moves_expired_entries(redis_client, storage):
+    old_ms = int(time.time() * 1000) - 2 * HOUR_MS
+    for i in range(5):
+        entry_id, fields = entry(old_ms, i, title=f"t{i}")
+        await redis_client.xadd("summary_created", fields, id=entry_id)
+    await redis_client.xadd("summary_created", entry(int(time.time() * 1000))[1])
+
+    archiver = StreamArchiver(redis_client, storage, ["summary_created"], max_age_ms=HOUR_MS, batch_size=2)
+    assert await archiver.archive_once("summary_created") == 5
+    assert await redis_client.xlen("summary_created") == 1
+
+    titles = [e.data['title'] async for e in ArchiveReader(storage).replay("summary_created")]
+    assert titles == [f"t{i}" for i in range(5)]
+
+    # Nothing left to move on the next pass
+    assert await archiver.archive_once("summary_created") == 0
+
+@pytest.mark.asyncio
+async def test_archiver_keeps_unacknowledged_entries(redis_client, storage):
+    old_ms = int(time.time() * 1000) - 2 * HOUR_MS
+    for i in range(4):
+        entry_id, fields = entry(old_ms, i)
+        await redis_client.xadd("transcriptions_created", fields, id=entry_id)
+    await redis_client.xgroup_create("transcriptions_created", "summarizer", id='0')
+
+    messages = await redis_client.xreadgroup("summarizer", "c1", {"transcriptions_created": '>'}, count=3)
+    delivered = [message_id for message_id, _ in messages[0][1]]
+    await redis_client.xack("transcriptions_created", "summarizer", delivered[0])
+
+    archiver = StreamArchiver(redis_client, storage, ["transcriptions_created"], max_age_ms=HOUR_MS)
+    # Only the acknowledged entry is safe; the pending and undelivered ones stay
+    assert await archiver.archive_once("transcriptions_created") == 1
+    assert await redis_client.xlen("transcriptions_created") == 3
+
+@pytest.mark.asyncio
+async def test_archiver_max_entries(redis_client, storage):
+    for i in range(10):
+        await redis_client.xadd("summary_created", entry(0)[1])
+
+    archiver = StreamArchiver(redis_client, storage, ["summary_created"], max_entries=4)
+    assert await archiver.archive_once("summary_created") == 6
+    assert await redis_client.xlen("summary_created") == 4
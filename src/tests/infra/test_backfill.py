@@ -0,0 +1,102 @@
+import json
+import asyncio
+import pytest
+from redis.asyncio import Redis
+from infra.backfill import Backfill, BackfillProgress, StreamOutput, Watermark, parse_bound, read_range
+from infra.core_types import Event
+from infra.scheduler import LocalTenantAccounting
+
+@pytest.fixture
+async def redis_client():
+    client = Redis(host='0.0.0.0', port=6379, decode_responses=False)
+    yield client
+    await client.flushall()
+    await client.aclose()
+
+async def add_events(redis, stream, count):
+    return [
+        (await redis.xadd(stream, {
+            'name': stream,
+            'meta': json.dumps({'tenant': 'a'}),
+            'data': json.dumps([{'title': f"t{i}", 'path': f"p{i}"}])
+        })).decode()
+        for i in range(count)
+    ]
+
+def test_parse_bound_accepts_ids_and_times():
+    assert parse_bound(None, '-') == '-'
+    assert parse_bound('1704067200000-3', '-') == '1704067200000-3'
+    assert parse_bound('1704067200000', '+') == '1704067200000'
+    assert parse_bound('2024-01-01T00:00:00Z', '-') == '1704067200000'
+    with pytest.raises(ValueError):
+        parse_bound('last tuesday', '-')
+
+def test_watermark_waits_for_oldest_running_event():
+    watermark = Watermark()
+    for event_id in ['1-0', '2-0', '3-0']:
+        watermark.dispatch(event_id)
+    assert watermark.finish('2-0') is None
+    assert watermark.finish('1-0') == '2-0'
+    assert watermark.finish('3-0') == '3-0'
+
+@pytest.mark.asyncio
+async def test_read_range_pages_in_id_order(redis_client):
+    ids = await add_events(redis_client, "s", 7)
+    pages = [page async for page in read_range(redis_client, "s", '-', '+', page_size=3)]
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [event.id for page in pages for event in page] == ids
+    assert pages[0][0].data == [{'title': 't0', 'path': 'p0'}]
+
+@pytest.mark.asyncio
+async def test_backfill_writes_output_and_resumes_from_checkpoint(redis_client):
+    ids = await add_events(redis_client, "transcriptions_created", 6)
+    output = StreamOutput(redis_client, "summary_created:backfill")
+    handled = []
+
+    async def handler(event):
+        if event.id == ids[4]:
+            raise ValueError("bad payload")
+        handled.append(event.id)
+        await output.write_event(Event(id='', name='summary_created', data={'source': event.id}, meta=None))
+
+    progress = BackfillProgress(redis_client, "test")
+    backfill = Backfill(redis_client, progress, handler, concurrency=3, page_size=2)
+    assert await backfill.run("transcriptions_created", start=ids[0], end=ids[4], output=output.stream) == 5
+
+    state = await progress.load()
+    assert state['last_id'] == ids[4]
+    assert (state['processed'], state['failed']) == ('4', '1')
+    assert list(await progress.failures()) == [ids[4]]
+    assert await redis_client.xlen("summary_created:backfill") == 4
+    # Consumer groups of the input stream are never touched
+    assert await redis_client.xinfo_groups("transcriptions_created") == []
+
+    # A second run of the same name resumes after the checkpoint, within the original range
+    handled.clear()
+    await progress.redis.hset(progress.key, 'last_id', ids[1])
+    assert await Backfill(redis_client, progress, handler, page_size=2).run("ignored") == 3
+    assert handled == ids[2:4]
+
+@pytest.mark.asyncio
+async def test_backfill_waits_for_budget(redis_client):
+    await add_events(redis_client, "transcriptions_created", 4)
+    running = 0
+    peak = 0
+
+    async def handler(event):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    backfill = Backfill(
+        redis_client,
+        BackfillProgress(redis_client, "budget"),
+        handler,
+        concurrency=4,
+        accounting=LocalTenantAccounting(default_concurrency=1),
+        retry_wait=0.005
+    )
+    assert await backfill.run("transcriptions_created") == 4
+    assert peak == 1
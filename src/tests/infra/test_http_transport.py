@@ -0,0 +1,107 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import anthropic
+import pytest
+from infra.http_transport import HttpTransportConfig, PoolMonitor, build_http_client
+
+MESSAGE = {
+    'id': 'msg_1',
+    'type': 'message',
+    'role': 'assistant',
+    'model': 'claude-3-5-sonnet-20241022',
+    'content': [{'type': 'text', 'text': 'ok'}],
+    'stop_reason': 'end_turn',
+    'stop_sequence': None,
+    'usage': {'input_tokens': 3, 'output_tokens': 1}
+}
+
+class Handler(BaseHTTPRequestHandler):
+    """Messages API stand-in that keeps connections alive and counts them"""
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.server.delay:
+            self.server.delay.wait(1)
+        body = json.dumps(MESSAGE).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.delay = None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_sequential_requests_reuse_one_connection(server):
+    monitor = PoolMonitor()
+    client = build_http_client(HttpTransportConfig(), monitor)
+    for _ in range(5):
+        assert client.post(f"{url(server)}/v1/messages", json={}).status_code == 200
+    assert server.connections == 1
+    stats = monitor.stats()
+    assert (stats['requests'], stats['connections_opened'], stats['tls_handshakes']) == (5, 1, 0)
+    assert (stats['connections'], stats['idle'], stats['active']) == (1, 1, 0)
+    client.close()
+
+def test_concurrent_requests_stay_within_pool_limit(server):
+    monitor = PoolMonitor()
+    client = build_http_client(HttpTransportConfig(max_connections=2), monitor)
+    server.delay = threading.Event()
+    with ThreadPoolExecutor(6) as executor:
+        responses = [executor.submit(client.post, f"{url(server)}/v1/messages", json={}) for _ in range(6)]
+        # Wait until the pool is saturated and the rest queue for a connection
+        for _ in range(100):
+            stats = monitor.stats()
+            if stats['active'] == 2 and stats['waiting'] == 4:
+                break
+            threading.Event().wait(0.01)
+        server.delay.set()
+        assert all(response.result().status_code == 200 for response in responses)
+    assert (stats['active'], stats['waiting'], stats['max_connections']) == (2, 4, 2)
+    assert server.connections == 2
+    assert monitor.stats()['connections_opened'] == 2
+    client.close()
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    monkeypatch.setattr('infra.http_transport.http2_available', lambda: False)
+    client = build_http_client(HttpTransportConfig(http2=True))
+    assert client._transport._pool._http2 is False
+    client.close()
+
+def test_anthropic_client_shares_the_pool(server):
+    monitor = PoolMonitor()
+    config = HttpTransportConfig(connect_timeout=1, read_timeout=2)
+    client = anthropic.Client(api_key="test", base_url=url(server), http_client=build_http_client(config, monitor))
+    for _ in range(3):
+        message = client.with_options(max_retries=0).messages.create(
+            model=MESSAGE['model'],
+            max_tokens=10,
+            messages=[{'role': 'user', 'content': 'hi'}]
+        )
+        assert message.content[0].text == 'ok'
+    assert server.connections == 1
+    assert monitor.stats()['requests'] == 3
+    assert client.timeout.connect == 1 and client.timeout.read == 2
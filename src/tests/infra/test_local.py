@@ -0,0 +1,86 @@
+import pytest
+
+from infra.local import LocalFileStorage
+
+@pytest.mark.asyncio
+async def test_read_maps_file(tmp_path):
+    storage = LocalFileStorage(str(tmp_path))
+    await storage.write("a/b.txt", "héllo".encode())
+
+    data = await storage.read("a/b.txt")
+    assert isinstance(data, memoryview)
+    assert str(data, 'utf-8') == "héllo"
+    assert await storage.read("a/b.txt") == "héllo".encode()
+
+@pytest.mark.asyncio
+async def test_empty_and_unmapped_reads(tmp_path):
+    (tmp_path / "empty.txt").write_bytes(b"")
+    assert await LocalFileStorage(str(tmp_path)).read("empty.txt") == b""
+
+    storage = LocalFileStorage(str(tmp_path), use_mmap=False)
+    await storage.write("c.txt", b"copy")
+    assert await storage.read("c.txt") == b"copy"
+    with pytest.raises(Exception, match="Failed to read"):
+        await storage.read("missing.txt")
+
+@pytest.mark.asyncio
+async def test_write_replaces_without_touching_mapped_readers(tmp_path):
+    storage = LocalFileStorage(str(tmp_path))
+    await storage.write("doc.txt", b"first version")
+    mapped = await storage.read("doc.txt")
+
+    await storage.write("doc.txt", b"second")
+
+    assert bytes(mapped) == b"first version"
+    assert await storage.read("doc.txt") == b"second"
+    # The temporary file was renamed away
+    assert await storage.list("") == ["doc.txt"]
+
+@pytest.mark.asyncio
+async def test_stream_yields_chunks(tmp_path):
+    storage = LocalFileStorage(str(tmp_path))
+    await storage.write("big.bin", bytes(range(256)) * 10)
+
+    chunks = [chunk async for chunk in storage.stream("big.bin", chunk_size=1000)]
+
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 560]
+    assert b"".join(chunks) == bytes(range(256)) * 10
+
+@pytest.mark.asyncio
+async def test_ping_checks_root(tmp_path):
+    await LocalFileStorage(str(tmp_path)).ping()
+    with pytest.raises(Exception, match="not accessible"):
+        await LocalFileStorage(str(tmp_path / "unmounted")).ping()
+
+@pytest.mark.asyncio
+async def test_writer_appears_on_close_only(tmp_path):
+    storage = LocalFileStorage(str(tmp_path))
+    writer = storage.open_writer("out/summary.md")
+    await writer.write(b"# Head\n")
+    await writer.write(b"body\n")
+    assert not (tmp_path / "out" / "summary.md").exists()
+    await writer.close()
+    assert (tmp_path / "out" / "summary.md").read_bytes() == b"# Head\nbody\n"
+
+    aborted = storage.open_writer("out/other.md")
+    await aborted.write(b"partial")
+    await aborted.abort()
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["summary.md"]
+
+@pytest.mark.asyncio
+async def test_paths_outside_the_root_are_rejected(tmp_path):
+    (tmp_path / "secret.txt").write_bytes(b"secret")
+    storage = LocalFileStorage(str(tmp_path / "root"))
+    await storage.write("inside.txt", b"ok")
+
+    for path in [str(tmp_path / "secret.txt"), "../secret.txt", "a/../../secret.txt"]:
+        with pytest.raises(ValueError, match="escapes the storage root"):
+            await storage.read(path)
+        with pytest.raises(ValueError, match="escapes the storage root"):
+            await storage.stat(path)
+        with pytest.raises(ValueError, match="escapes the storage root"):
+            await storage.write(path, b"overwrite")
+        with pytest.raises(ValueError, match="escapes the storage root"):
+            await storage.delete(path)
+    assert (tmp_path / "secret.txt").read_bytes() == b"secret"
+    assert await storage.read("a/../inside.txt") == b"ok"
@@ -0,0 +1,115 @@
+import asyncio
+import pytest
+
+from infra.core_types import Event
+from infra.dead_letter import RetryPolicy
+from domain.deadline import DeadlineExceeded
+from infra.memory import InMemoryFileStorage, InMemoryEventStore
+
+@pytest.mark.asyncio
+async def test_write_read_stat():
+    storage = InMemoryFileStorage()
+    await storage.write("a/b.txt", b"hello")
+
+    assert await storage.read("a/b.txt") == b"hello"
+    stat = await storage.stat("a/b.txt")
+    assert stat.size == 5
+    assert stat.etag
+
+@pytest.mark.asyncio
+async def test_etag_changes_with_content():
+    storage = InMemoryFileStorage({"a.txt": b"one"})
+    before = (await storage.stat("a.txt")).etag
+    await storage.write("a.txt", b"two")
+    assert (await storage.stat("a.txt")).etag != before
+
+@pytest.mark.asyncio
+async def test_list_and_delete():
+    storage = InMemoryFileStorage({"x/1": b"1", "x/2": b"2", "y/1": b"3"})
+    assert await storage.list("x/") == ["x/1", "x/2"]
+
+    await storage.delete("x/1")
+    assert await storage.list("x/") == ["x/2"]
+    with pytest.raises(Exception, match="not found"):
+        await storage.read("x/1")
+
+def make_event(name="input", data=None):
+    return Event(id="", name=name, meta={'tenant': "a"}, data=data)
+
+@pytest.mark.asyncio
+async def test_event_store_processes_with_bounded_concurrency():
+    store = InMemoryEventStore("input", concurrency=2)
+    running, peak, seen = 0, 0, []
+
+    async def handler(event):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        seen.append(event.data)
+        running -= 1
+        await store.write_event(make_event("output", event.data))
+
+    for i in range(6):
+        await store.write_event(make_event(data=i))
+    consumer = asyncio.create_task(store.process_events(handler))
+    await asyncio.wait_for(store.join(), 5)
+    store.stop()
+    await consumer
+
+    assert sorted(seen) == list(range(6))
+    assert peak == 2
+    assert store.acked == 6
+    assert [e.data for e in store.published["output"]] == seen
+
+@pytest.mark.asyncio
+async def test_event_store_retries_then_dead_letters():
+    store = InMemoryEventStore("input", retry_policy=RetryPolicy(max_attempts=3, base_delay_ms=1))
+    attempts = []
+
+    async def handler(event):
+        attempts.append(event.id)
+        if event.data == "flaky" and attempts.count(event.id) < 2:
+            raise ConnectionError("transient")
+        if event.data == "broken":
+            raise ConnectionError("still down")
+
+    await store.write_event(make_event(data="flaky"))
+    await store.write_event(make_event(data="broken"))
+    consumer = asyncio.create_task(store.process_events(handler))
+    await asyncio.wait_for(store.join(), 5)
+    store.stop()
+    await consumer
+
+    assert store.acked == 1
+    [letter] = store.dead_letters["input:dlq"]
+    assert letter.attempts == 3
+    assert letter.error_type == "ConnectionError"
+    assert len(attempts) == 5
+
+@pytest.mark.asyncio
+async def test_event_store_acks_dropped_events_without_dead_lettering():
+    store = InMemoryEventStore("input", retry_policy=RetryPolicy(max_attempts=3, base_delay_ms=1))
+    attempts = []
+
+    async def handler(event):
+        attempts.append(event.id)
+        raise DeadlineExceeded("expired")
+
+    await store.write_event(make_event())
+    consumer = asyncio.create_task(store.process_events(handler))
+    await asyncio.wait_for(store.join(), 5)
+    store.stop()
+    await consumer
+
+    assert (store.dropped, store.acked) == (1, 0)
+    assert not store.dead_letters
+    assert len(attempts) == 1
+
+@pytest.mark.asyncio
+async def test_event_store_write_blocks_when_queue_is_full():
+    store = InMemoryEventStore("input", maxsize=1)
+    await store.write_event(make_event(data=1))
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(store.write_event(make_event(data=2)), 0.05)
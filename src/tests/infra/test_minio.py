@@ -47,3 +47,18 @@ async def test_delete_non_existent_file(minio_storage):
         await minio_storage.delete("non-existent-file.txt")
     except Exception as e:
         pytest.fail(f"Unexpected exception: {e}")
+
+@pytest.mark.asyncio
+async def test_writer_uploads_parts(minio_storage):
+    from infra.minio import MIN_PART_SIZE
+    path = "test-multipart.md"
+    writer = minio_storage.open_writer(path)
+    chunk = b"x" * (1024 * 1024)
+    for _ in range(6):
+        await writer.write(chunk)
+    # One full part is uploaded, the rest stays buffered
+    assert len(writer.parts) == 1 and len(writer.buffer) == 6 * len(chunk) - MIN_PART_SIZE
+    await writer.write(b"tail")
+    await writer.close()
+    assert await minio_storage.read(path) == chunk * 6 + b"tail"
+    await minio_storage.delete(path)
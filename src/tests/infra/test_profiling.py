@@ -0,0 +1,77 @@
+import pstats
+import asyncio
+import marshal
+import tracemalloc
+import pytest
+from infra.core_types import Event
+from infra.memory import InMemoryFileStorage
+from infra.profiling import EventProfiler
+
+def event(i):
+    return Event(id=f"{i}-0", name="transcriptions_created", data=[], meta=None)
+
+@pytest.fixture
+def storage():
+    return InMemoryFileStorage()
+
+@pytest.mark.asyncio
+async def test_disabled_profiler_passes_events_through(storage):
+    async def handler(e):
+        return e.id
+
+    profiler = EventProfiler(storage)
+    profiler.start()
+    assert await profiler.wrap(handler)(event(1)) == "1-0"
+    assert not tracemalloc.is_tracing()
+    assert storage.files == {}
+
+@pytest.mark.asyncio
+async def test_tracked_events_report_memory_and_cpu(storage):
+    reports = []
+    profiler = EventProfiler(storage, track_events=True, sample_interval=0.01, report=reports.append)
+    profiler.start()
+
+    async def handler(e):
+        blocks = [bytearray(1 << 20) for _ in range(8)]
+        await asyncio.sleep(0.05)
+        if e.id == "2-0":
+            raise ValueError("bad")
+        return len(blocks)
+
+    try:
+        wrapped = profiler.wrap(handler)
+        assert await wrapped(event(1)) == 8
+        with pytest.raises(ValueError):
+            await wrapped(event(2))
+    finally:
+        tracemalloc.stop()
+
+    assert [r['event_id'] for r in reports] == ["1-0", "2-0"]
+    assert reports[0]['traced_peak_mb'] >= 8
+    assert reports[0]['top_sites'][0]['mb'] >= 7
+    assert 'test_profiling.py' in reports[0]['top_sites'][0]['site']
+    assert reports[0]['cpu_seconds'] >= 0 and reports[0]['max_rss_mb'] > 0
+    assert (reports[0]['error'], reports[1]['error']) == (None, 'ValueError')
+
+@pytest.mark.asyncio
+async def test_capture_profiles_next_events_and_stores_stats(storage):
+    profiler = EventProfiler(storage, capture_events=2)
+
+    async def handler(e):
+        await asyncio.sleep(0.01)
+        return sum(range(1000))
+
+    wrapped = profiler.wrap(handler)
+    await wrapped(event(0))
+    profiler.request_capture()
+    await asyncio.gather(wrapped(event(1)), wrapped(event(2)))
+    await wrapped(event(3))
+    await profiler.flush()
+
+    paths = sorted(storage.files)
+    assert [p.rsplit('.', 1)[1] for p in paths] == ['prof', 'txt']
+    assert paths[0].startswith("profiles/summarizer/")
+    stats = pstats.Stats()
+    stats.stats = marshal.loads(storage.files[paths[0]])
+    assert any(func[2] == 'handler' for func in stats.stats)
+    assert storage.files[paths[1]].decode().startswith("Events: 1-0, 2-0")
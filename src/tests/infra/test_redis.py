@@ -4,6 +4,7 @@ import asyncio
 from redis.asyncio import Redis
 from redis.exceptions import RedisError
 from infra.redis import RedisEventStore
+from infra.dead_letter import RetryPolicy, DeadLetterQueue
 from infra.core_types import Event
 
 @pytest.fixture
@@ -141,13 +142,73 @@ async def test_event_acknowledgment(event_store, test_event):
 # Error cases
 @pytest.mark.asyncio
 async def test_handler_error(event_store, test_event):
+    # Fatal errors go straight to the dead-letter stream and the consumer keeps running
+    processed = []
+    async def failing_handler(event):
+        if event.data["title"] == "Bad":
+            raise ValueError("Handler failed")
+        processed.append(event)
+        event_store._running = False
+
+    await event_store.write_event(Event(id="bad", name="transcriptions_created", data={"title": "Bad"}, meta=None))
+    await event_store.write_event(test_event)
+
+    await asyncio.wait_for(event_store.process_events(failing_handler), timeout=5.0)
+
+    assert [e.data["title"] for e in processed] == ["Test Title"]
+    dead = await event_store.redis.xrange("transcriptions_created:dlq")
+    assert len(dead) == 1
+    assert dead[0][1][b'dlq_error_type'] == b'ValueError'
+    assert dead[0][1][b'dlq_error'] == b'Handler failed'
+    pending = await event_store.redis.xpending("transcriptions_created", "test_service")
+    assert pending['pending'] == 0
+
+@pytest.mark.asyncio
+async def test_retryable_error_is_retried_then_dead_lettered(redis_client, test_event):
+    store = RedisEventStore(
+        redis=redis_client,
+        event_name="transcriptions_created",
+        service_name="test_service",
+        retry_policy=RetryPolicy(max_attempts=3, base_delay_ms=10, max_delay_ms=10)
+    )
+    attempts = []
+    async def flaky_handler(event):
+        attempts.append(event.id)
+        raise ConnectionError("Upstream unavailable")
+
+    await store.write_event(test_event)
+    task = asyncio.create_task(store.process_events(flaky_handler))
+    for _ in range(50):
+        if await redis_client.xlen("transcriptions_created:dlq"):
+            break
+        await asyncio.sleep(0.1)
+    store._running = False
+    await asyncio.wait_for(task, timeout=6.0)
+
+    assert len(attempts) == 3
+    assert len(set(attempts)) == 1
+    dead = await redis_client.xrange("transcriptions_created:dlq")
+    assert dead[0][1][b'dlq_attempts'] == b'3'
+    assert dead[0][1][b'dlq_error_type'] == b'ConnectionError'
+
+@pytest.mark.asyncio
+async def test_redrive_dead_letters(event_store, test_event):
     async def failing_handler(event):
+        event_store._running = False
         raise ValueError("Handler failed")
-    
+
     await event_store.write_event(test_event)
-    
-    with pytest.raises(ValueError, match="Handler failed"):
-        await event_store.process_events(failing_handler)
+    await asyncio.wait_for(event_store.process_events(failing_handler), timeout=5.0)
+
+    dlq = DeadLetterQueue(event_store.redis, "transcriptions_created")
+    letters = await dlq.entries(error_type="ValueError")
+    assert len(letters) == 1
+    assert json.loads(letters[0].fields['data']) == test_event.data
+
+    assert await dlq.redrive(letters) == 1
+    assert await dlq.size() == 0
+    # Two entries now: the original (acknowledged) and the redriven copy
+    assert await event_store.redis.xlen("transcriptions_created") == 2
 
 @pytest.mark.asyncio
 async def test_missing_group_creation(event_store, test_event):
@@ -325,9 +386,80 @@ async def test_process_events_with_invalid_json(event_store):
     processed = []
     async def handler(event):
         processed.append(event)
-        event_store._running = False
-    
+
     task = asyncio.create_task(event_store.process_events(handler))
-    
-    with pytest.raises(json.JSONDecodeError):
-        await asyncio.wait_for(task, timeout=2.0)
+    # The undecodable entry is dead-lettered without reaching the handler
+    for _ in range(20):
+        if await event_store.redis.xlen("transcriptions_created:dlq"):
+            break
+        await asyncio.sleep(0.1)
+    event_store._running = False
+    await asyncio.wait_for(task, timeout=6.0)
+
+    assert processed == []
+    dead = await event_store.redis.xrange("transcriptions_created:dlq")
+    assert dead[0][1][b'data'] == b'invalid{json'
+    assert dead[0][1][b'dlq_error_type'] == b'JSONDecodeError'
+
+@pytest.mark.asyncio
+async def test_usage_totals_are_batched_per_tenant_and_day(redis_client):
+    from datetime import datetime, timezone
+    from infra.redis_state import RedisUsageTotals
+    totals = RedisUsageTotals(redis_client, prefix="test:usage")
+    totals.add("acme", {'events': 1, 'input_tokens': 100, 'analysis:input_tokens': 100})
+    totals.add("acme", {'events': 1, 'input_tokens': 50, 'guide:input_tokens': 50})
+    totals.add("other", {'events': 1, 'input_tokens': 7})
+
+    assert await redis_client.keys("test:usage:*") == []
+    assert await totals.flush() == 2
+    assert await totals.flush() == 0
+
+    day = f"{datetime.now(timezone.utc):%Y-%m-%d}"
+    assert await totals.totals("acme", day) == {
+        'events': 2, 'input_tokens': 150, 'analysis:input_tokens': 100, 'guide:input_tokens': 50
+    }
+    assert await redis_client.ttl(totals.key("acme")) > 0
+
+@pytest.mark.asyncio
+async def test_prefilter_acks_rejected_events_on_headers(redis_client):
+    store = RedisEventStore(
+        redis=redis_client,
+        event_name="transcriptions_created",
+        service_name="test_service",
+        prefilter=lambda event: event.tenant != "muted"
+    )
+    for tenant in ["muted", "acme", "muted"]:
+        await store.write_event(Event(id="", name="transcriptions_created", data={"t": tenant}, meta={"tenant": tenant}))
+
+    processed = []
+    async def handler(event):
+        processed.append(event.data["t"])
+        store.stop()
+
+    await asyncio.wait_for(store.process_events(handler), timeout=6.0)
+    assert processed == ["acme"]
+    pending = await redis_client.xpending("transcriptions_created", "test_service")
+    assert pending['pending'] == 0
+
+@pytest.mark.asyncio
+async def test_long_running_events_keep_their_lease(redis_client):
+    stores = [
+        RedisEventStore(redis=redis_client, event_name="transcriptions_created", service_name="test_service", claim_idle_ms=300)
+        for _ in range(2)
+    ]
+    await stores[0].write_event(Event(id="", name="transcriptions_created", data={"t": 1}, meta=None))
+    handled = []
+
+    async def slow_handler(event):
+        handled.append(event.id)
+        # Several lease periods; without renewal the idle peer would claim it
+        await asyncio.sleep(1.2)
+
+    tasks = [asyncio.create_task(store.process_events(slow_handler)) for store in stores]
+    await asyncio.sleep(1.6)
+    for store in stores:
+        store.stop()
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=10.0)
+
+    assert len(handled) == 1
+    assert (await redis_client.xpending("transcriptions_created", "test_service"))['pending'] == 0
@@ -0,0 +1,209 @@
+import asyncio
+import pytest
+from redis.asyncio import Redis
+from infra.core_types import Event
+from infra.redis import RedisEventStore
+from infra.stream_event import StreamEvent
+from infra.sharding import (
+    ShardRouter, ShardAssigner, assign_shards, group_by_slot, hash_tag, parse_shard_stream, shard_for, shard_stream
+)
+
+STREAM = "transcriptions_created"
+
+def test_shard_stream_names_round_trip():
+    assert shard_stream(STREAM, 3) == "transcriptions_created:{3}"
+    assert parse_shard_stream("transcriptions_created:high:{12}") == ("transcriptions_created:high", 12)
+    assert parse_shard_stream(STREAM) is None
+    assert parse_shard_stream("transcriptions_created:{3}:dlq") is None
+
+def test_streams_are_grouped_by_cluster_hash_tag():
+    assert hash_tag("transcriptions_created:{3}") == "3"
+    assert hash_tag("{live}:high") == "live"
+    assert hash_tag("transcriptions_created:{}") == "transcriptions_created:{}"
+    assert group_by_slot([STREAM, f"{STREAM}:high"]) == [[STREAM], [f"{STREAM}:high"]]
+    assert group_by_slot(["{live}", "{live}:high", shard_stream(STREAM, 1), shard_stream(f"{STREAM}:high", 1)]) == [
+        ["{live}", "{live}:high"],
+        [shard_stream(STREAM, 1), shard_stream(f"{STREAM}:high", 1)],
+    ]
+
+def test_assignment_covers_every_shard_once():
+    members = ["c", "a", "b"]
+    owned = [assign_shards(members, 8, member) for member in members]
+    assert sorted(shard for shards in owned for shard in shards) == list(range(8))
+    assert assign_shards(members, 8, "a") == [0, 3, 6]
+    assert assign_shards(["a", "b", "c"], 2, "c") == []
+    assert assign_shards(members, 8, "gone") == []
+
+def test_router_routes_by_key_and_spreads_the_rest():
+    clients = [object(), object()]
+    router = ShardRouter(clients, shards=4, sharded=[STREAM])
+
+    acme = Event(id="", name=STREAM, meta={'tenant': "acme"}, data={})
+    routed = {router.route(STREAM, acme) for _ in range(5)}
+    assert routed == {shard_stream(STREAM, shard_for("acme", 4))}
+    # Entries read back route by their header field, without parsing meta
+    entry = StreamEvent(b"1-0", {b'name': STREAM.encode(), b'tenant': b"acme", b'meta': b"not json", b'data': b"{}"})
+    assert router.route(STREAM, entry) in routed
+    unkeyed = Event(id="", name=STREAM, meta={}, data={})
+    assert {router.route(STREAM, unkeyed) for _ in range(4)} == set(router.streams(STREAM))
+    assert router.route("summary_created", acme) == "summary_created"
+
+    assert router.client(shard_stream(STREAM, 1)) is clients[1]
+    assert router.client(shard_stream(STREAM, 2)) is clients[0]
+    assert router.client("summary_created") is clients[0]
+    groups = router.group_by_client(router.streams(STREAM))
+    assert sorted(map(sorted, groups)) == [
+        [shard_stream(STREAM, 0), shard_stream(STREAM, 2)],
+        [shard_stream(STREAM, 1), shard_stream(STREAM, 3)],
+    ]
+
+def test_expand_weights_per_shard():
+    router = ShardRouter([object()], shards=2, sharded=[STREAM, f"{STREAM}:high"])
+    assert router.expand({STREAM: 1.0, f"{STREAM}:high": 4.0}, shards=[1]) == {
+        shard_stream(STREAM, 1): 1.0,
+        shard_stream(f"{STREAM}:high", 1): 4.0,
+    }
+
+# Several databases of one local Redis stand in for separate instances
+@pytest.fixture
+async def redis_instances():
+    clients = [Redis(host='0.0.0.0', port=6379, db=db) for db in (1, 2, 3)]
+    yield clients
+    for client in clients:
+        await client.flushdb()
+        await client.aclose()
+
+def sharded_store(clients, shards=6):
+    return RedisEventStore(
+        redis=None,
+        event_name=STREAM,
+        service_name="test_service",
+        concurrency=2,
+        router=ShardRouter(clients, shards=shards, sharded=[STREAM]),
+        rebalance_interval=0.1
+    )
+
+@pytest.mark.asyncio
+async def test_events_land_on_their_shard_instance(redis_instances):
+    store = sharded_store(redis_instances)
+    for tenant in ["a", "b", "c", "d"]:
+        await store.write_event(Event(id="", name=STREAM, meta={'tenant': tenant}, data={}))
+
+    for tenant in ["a", "b", "c", "d"]:
+        shard = shard_for(tenant, 6)
+        entries = await redis_instances[shard % 3].xrange(shard_stream(STREAM, shard))
+        assert entries
+
+@pytest.mark.asyncio
+async def test_consumers_split_shards_and_rebalance(redis_instances):
+    first, second = sharded_store(redis_instances), sharded_store(redis_instances)
+    seen = []
+
+    async def handler(event):
+        seen.append(event.meta['n'])
+
+    for n in range(30):
+        await first.write_event(Event(id="", name=STREAM, meta={'tenant': f"t{n}", 'n': n}, data={}))
+    consumers = [asyncio.create_task(store.process_events(handler)) for store in (first, second)]
+    await asyncio.sleep(1)
+
+    assert sorted(first.assigner.assigned + second.assigner.assigned) == list(range(6))
+    # Once the second consumer leaves, the first takes over every shard
+    second.stop()
+    await consumers[1]
+    await first.write_event(Event(id="", name=STREAM, meta={'tenant': "late", 'n': 30}, data={}))
+    await asyncio.sleep(1)
+    first.stop()
+    await consumers[0]
+
+    assert first.assigner.assigned == []
+    assert sorted(seen) == list(range(31))
+
+@pytest.mark.asyncio
+async def test_assigner_drops_silent_members(redis_instances):
+    redis = redis_instances[0]
+    alive = ShardAssigner(redis, "test:consumers", "alive", shards=4, ttl=1)
+    await redis.zadd("test:consumers", {"silent": 0})
+
+    gained, lost = await alive.heartbeat()
+
+    assert gained == [0, 1, 2, 3]
+    assert lost == []
+
+@pytest.mark.asyncio
+async def test_backfill_reads_every_shard_on_its_instance(redis_instances):
+    from infra.backfill import Backfill, BackfillProgress
+    store = sharded_store(redis_instances)
+    for n in range(12):
+        await store.write_event(Event(id="", name=STREAM, meta={'tenant': f"t{n}", 'n': n}, data={}))
+    seen = []
+
+    async def handler(event):
+        seen.append(event.meta['n'])
+
+    progress = BackfillProgress(redis_instances[0], "sharded")
+    backfill = Backfill(redis_instances[0], progress, handler, concurrency=3, router=store.router)
+    assert await backfill.run(STREAM) == 12
+    assert sorted(seen) == list(range(12))
+
+    state = await progress.load()
+    for physical in store.router.streams(STREAM):
+        entries = await store.router.client(physical).xrange(physical)
+        if entries:
+            assert state[progress.last_id_field(physical)] == entries[-1][0].decode()
+
+class RedisCluster:
+    """Records pipelines the way a cluster client would see them"""
+    def __init__(self):
+        self.pipelines = []
+
+    def pipeline(self, transaction=True):
+        commands = []
+        self.pipelines.append((transaction, commands))
+
+        class Pipeline:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def __getattr__(self, name):
+                return lambda key, *args, **kwargs: commands.append((name, key))
+
+            async def execute(self):
+                return [0] * len(commands)
+        return Pipeline()
+
+@pytest.mark.asyncio
+async def test_state_pipelines_are_plain_and_single_slot_on_cluster():
+    from redis.crc import key_slot
+    from infra.backfill import BackfillProgress
+    from infra.redis_state import RedisCheckpointStore, RedisResultCache
+
+    cluster = RedisCluster()
+    await RedisCheckpointStore(cluster).save("1-0", "analysis_0", "text")
+    await RedisResultCache(cluster).put("v1:abc", "{}")
+    progress = BackfillProgress(cluster, "nightly")
+    await progress.record(processed=2, last_id="1-0")
+
+    assert [transaction for transaction, _ in cluster.pipelines] == [False, False, False]
+    for _, commands in cluster.pipelines:
+        assert len({key_slot(key.encode()) for _, key in commands}) == 1
+    assert key_slot(progress.key.encode()) == key_slot(progress.failed_key.encode())
+
+@pytest.mark.asyncio
+async def test_tenant_accounting_keys_share_a_slot():
+    from redis.crc import key_slot
+    from infra.redis_state import RedisTenantAccounting
+    calls = []
+
+    class ScriptRedis:
+        def register_script(self, script):
+            async def run(keys, args):
+                calls.append(keys)
+                return 1
+            return run
+
+    assert await RedisTenantAccounting(ScriptRedis()).try_acquire("acme", "1-0", 100)
+    assert len({key_slot(key.encode()) for key in calls[0]}) == 1
@@ -0,0 +1,29 @@
+import json
+import pytest
+from infra.core_types import Event
+from infra.redis import encode_event
+from infra.stream_event import StreamEvent
+
+def entry(event):
+    return {key.encode(): value.encode() for key, value in encode_event(event).items()}
+
+def test_headers_are_read_without_parsing_the_payload():
+    fields = entry(Event(id="", name="transcriptions_created", data=[1], meta={'tenant': 'acme', 'priority': 2}))
+    fields[b'data'] = b'not json'
+    event = StreamEvent(b"1-0", fields)
+    assert (event.id, event.name, event.tenant, event.priority) == ("1-0", "transcriptions_created", "acme", "2")
+    with pytest.raises(json.JSONDecodeError):
+        event.data
+
+def test_payload_is_parsed_once_and_assignable():
+    event = StreamEvent(b"1-0", entry(Event(id="", name="n", data={'a': 1}, meta=None, timestamp="2024-01-01T00:00:00Z")))
+    assert event.data is event.data
+    assert (event.meta, event.tenant, event.timestamp) == (None, None, "2024-01-01T00:00:00Z")
+    event.meta = {'tenant': 'x'}
+    assert event.meta == {'tenant': 'x'}
+    assert not hasattr(event, '__dict__')
+
+def test_headers_fall_back_to_meta_for_older_entries():
+    event = StreamEvent(b"1-0", {b'name': b'n', b'data': b'[]', b'meta': b'{"tenant": "old"}'})
+    assert event.tenant == "old" and event.priority is None
+    assert StreamEvent(b"2-0", {b'name': b'n', b'data': b'[]'}).decode().meta is None
@@ -0,0 +1,98 @@
+import asyncio
+from pathlib import Path
+import pytest
+import batch
+from batch import BatchContext, Manifest, collect_inputs, extract_common_title, group_by_title, run, parse_args
+from domain.types import SummaryCreatedEvent
+from infra.local import LocalFileStorage
+
+def write(directory: Path, name: str, text: str = "transcript") -> Path:
+    path = directory / name
+    path.write_text(text, encoding='utf-8')
+    return path
+
+def test_collect_inputs_expands_directories_and_globs(tmp_path):
+    a = write(tmp_path, "a.txt")
+    b = write(tmp_path, "b.txt")
+    nested = tmp_path / "nested"
+    nested.mkdir()
+    c = write(nested, "c.txt")
+    write(tmp_path, "notes.md")
+
+    paths = collect_inputs([str(tmp_path), str(tmp_path / "**" / "*.txt"), str(a)])
+    assert paths == [a.resolve(), b.resolve(), c.resolve()]
+    with pytest.raises(FileNotFoundError):
+        collect_inputs([str(tmp_path / "missing.txt")])
+
+def test_parts_are_grouped_under_their_common_title(tmp_path):
+    parts = [
+        write(tmp_path, "2024-05-01_talk_Deep-Work 2.txt"),
+        write(tmp_path, "2024-05-01_talk_Deep-Work 1.txt"),
+        write(tmp_path, "2024-05-02_lecture_Systems_101.txt"),
+    ]
+    assert extract_common_title([parts[0]]) == "Deep Work"
+
+    groups = group_by_title(parts)
+    assert list(groups) == ["Deep Work", "Systems"]
+    assert [p.name for p in groups["Deep Work"]] == ["2024-05-01_talk_Deep-Work 1.txt", "2024-05-01_talk_Deep-Work 2.txt"]
+
+def test_manifest_skips_finished_groups_until_their_files_change(tmp_path):
+    files = [write(tmp_path, "a.txt")]
+    manifest = Manifest(tmp_path / "out" / "manifest.json")
+    assert not manifest.is_done("a", files)
+    manifest.record("a", files, "a.md", 1.0)
+
+    resumed = Manifest(tmp_path / "out" / "manifest.json")
+    assert resumed.is_done("a", files)
+    write(tmp_path, "a.txt", "edited transcript")
+    assert not resumed.is_done("a", files)
+
+def fake_summary(peak: list):
+    running = 0
+
+    async def summarize(deps, event):
+        nonlocal running
+        running += 1
+        peak.append(running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return SummaryCreatedEvent(name="summary_created", meta=None, data={'summary': f"summary of {event.data[0]['title']}"})
+    return summarize
+
+@pytest.mark.asyncio
+async def test_groups_run_concurrently_up_to_the_limit(tmp_path, monkeypatch):
+    peak = []
+    monkeypatch.setattr(batch, 'get_summary', fake_summary(peak))
+    files = {f"talk {name}": [write(tmp_path, f"talk_{name}.txt")] for name in "abcdef"}
+    ctx = BatchContext(
+        anthropic_client=None,
+        output=LocalFileStorage(str(tmp_path / "out")),
+        output_prefix='',
+        manifest=Manifest(tmp_path / "out" / "manifest.json"),
+        semaphore=asyncio.Semaphore(2),
+        total=len(files)
+    )
+
+    await asyncio.gather(*(batch.summarize_group(ctx, title, paths) for title, paths in files.items()))
+
+    assert max(peak) == 2
+    assert (ctx.finished, ctx.failed) == (6, 0)
+    assert (tmp_path / "out" / "talk a.md").read_text(encoding='utf-8') == "summary of talk a"
+
+@pytest.mark.asyncio
+async def test_run_resumes_from_the_manifest(tmp_path, monkeypatch):
+    peak = []
+    monkeypatch.setattr(batch, 'get_summary', fake_summary(peak))
+    monkeypatch.setattr(batch.anthropic, 'Client', lambda api_key: None)
+    inputs = tmp_path / "in"
+    inputs.mkdir()
+    write(inputs, "x_talk_Alpha.txt")
+    write(inputs, "x_talk_Beta.txt")
+    args = parse_args([str(inputs), '--output', str(tmp_path / "out")])
+
+    assert await run(args) == 0
+    assert len(peak) == 2
+    assert await run(args) == 0
+    assert len(peak) == 2
+    assert await run(parse_args([str(inputs), '--output', str(tmp_path / "out"), '--force'])) == 0
+    assert len(peak) == 4